@@ -8,22 +8,29 @@ from flask_cors import CORS
 import os
 import logging
 
+from utils.db_utils import get_sqlalchemy_engine_options
+from .cache import ResponseCache
+
 # Initialize the logging configuration for the entire application
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
 db = SQLAlchemy()
 bcrypt = Bcrypt()
 csrf = CSRFProtect()
+response_cache = ResponseCache()  # Analytics endpoint cache, invalidated by the ETL (see app/cache.py)
 
 def create_app():
     app = Flask(__name__, static_folder='static', template_folder='templates')
     CORS(app)
     app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DATABASE_URL")
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    # Pooled engine (size, pre-ping, recycle) shared with the ETL's psycopg2 pool settings
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = get_sqlalchemy_engine_options()
     app.config["SECRET_KEY"] = os.getenv("FLASK_SECRET_KEY")
 
     db.init_app(app)
     bcrypt.init_app(app)
+    response_cache.init_app(app)
 
     # ADD THIS LINE: Make the db instance directly accessible via the app object
     app.db = db
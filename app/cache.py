@@ -0,0 +1,210 @@
+"""
+Server-side response cache for the read-mostly analytics endpoints.
+
+Responses are stored under keys that include a cache generation number kept
+in the 'cache_generations' table. The ETL bumps the generation after every
+load that inserted gigs (invalidate_api_cache), which makes all cached
+responses stale at once without the ETL having to reach the web workers.
+Each worker re-reads the generation at most every
+API_CACHE_GENERATION_CHECK_SECONDS.
+
+Backends (API_CACHE_BACKEND):
+    memory  in-process LRU with per-entry TTL (default)
+    redis   shared across workers; needs the `redis` package and REDIS_URL.
+            RedisCache accepts any client with get/set/scan_iter/delete;
+            the tests pass in tests/fake_redis.py.
+    none    caching disabled (ETag/Cache-Control headers are still sent)
+"""
+import os
+import time
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import request, make_response
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+API_CACHE_BACKEND = os.getenv("API_CACHE_BACKEND", "memory")  # "memory", "redis" or "none"
+API_CACHE_TTL_SECONDS = int(os.getenv("API_CACHE_TTL_SECONDS", 300))  # Upper bound on staleness without an ETL bump
+API_CACHE_MAX_ENTRIES = int(os.getenv("API_CACHE_MAX_ENTRIES", 256))  # memory backend only
+API_CACHE_MAX_AGE_SECONDS = int(os.getenv("API_CACHE_MAX_AGE_SECONDS", 60))  # Cache-Control max-age for clients
+API_CACHE_GENERATION_CHECK_SECONDS = int(os.getenv("API_CACHE_GENERATION_CHECK_SECONDS", 10))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+CACHE_GENERATION_NAME = "api"
+
+BUMP_GENERATION_SQL = """
+    INSERT INTO cache_generations (name, generation, updated_at)
+    VALUES (%s, 1, CURRENT_TIMESTAMP)
+    ON CONFLICT (name) DO UPDATE
+    SET generation = cache_generations.generation + 1,
+        updated_at = EXCLUDED.updated_at;
+"""
+
+
+class InProcessLRUCache:
+    """Thread-safe LRU mapping with a TTL per entry."""
+
+    def __init__(self, max_entries=API_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCache:
+    """Stores entries as JSON in Redis under `prefix`; expiry is left to Redis."""
+
+    def __init__(self, client, prefix="streamlance:api:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, json.dumps(value), ex=int(ttl))
+
+    def clear(self):
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+
+class NullCache:
+    """Backend used when caching is disabled."""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def clear(self):
+        pass
+
+
+def create_cache_backend(name=API_CACHE_BACKEND):
+    """Builds the configured backend, falling back to the in-process cache if Redis is unavailable."""
+    if name == "none":
+        return NullCache()
+    if name == "redis":
+        try:
+            import redis  # Optional dependency, only needed for this backend
+            return RedisCache(redis.Redis.from_url(REDIS_URL))
+        except ImportError:
+            logger.warning("API_CACHE_BACKEND=redis but the 'redis' package is not installed; using the in-process cache.")
+    elif name != "memory":
+        logger.warning(f"Unknown API_CACHE_BACKEND '{name}'; using the in-process cache.")
+    return InProcessLRUCache()
+
+
+class ResponseCache:
+    """
+    Caches JSON endpoint responses per cache generation and answers
+    conditional requests (If-None-Match) with 304 Not Modified.
+    """
+
+    def __init__(self, backend=None, ttl=API_CACHE_TTL_SECONDS, max_age=API_CACHE_MAX_AGE_SECONDS,
+                 generation_check_seconds=API_CACHE_GENERATION_CHECK_SECONDS):
+        self.backend = backend
+        self.ttl = ttl
+        self.max_age = max_age
+        self.generation_check_seconds = generation_check_seconds
+        self._generation = None
+        self._generation_checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        if self.backend is None:
+            self.backend = create_cache_backend()
+        app.extensions["response_cache"] = self
+
+    def _current_generation(self, db):
+        """The stored cache generation, re-read at most every generation_check_seconds."""
+        now = time.monotonic()
+        with self._lock:
+            if self._generation is not None and now - self._generation_checked_at < self.generation_check_seconds:
+                return self._generation
+        try:
+            generation = db.session.execute(
+                text("SELECT generation FROM cache_generations WHERE name = :name"),
+                {"name": CACHE_GENERATION_NAME}
+            ).scalar() or 0
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"Could not read the API cache generation: {e}")
+            generation = self._generation or 0
+        with self._lock:
+            self._generation, self._generation_checked_at = generation, now
+        return generation
+
+    def _respond(self, entry):
+        """Builds the response for a cached entry, or a 304 if the client already has it."""
+        if entry["etag"] in request.if_none_match:
+            response = make_response("", 304)
+        else:
+            response = make_response(entry["body"], entry["status"])
+            response.mimetype = "application/json"
+        response.set_etag(entry["etag"])
+        response.cache_control.public = True
+        response.cache_control.max_age = self.max_age
+        return response
+
+    def cached(self, name, db):
+        """
+        Decorator caching a JSON view's successful (200) responses under
+        `name` and the current cache generation.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                key = f"{name}:{self._current_generation(db)}"
+                entry = self.backend.get(key)
+                if entry is None:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    body = response.get_data(as_text=True)
+                    entry = {"body": body, "status": 200,
+                             "etag": hashlib.md5(body.encode("utf-8")).hexdigest()}
+                    self.backend.set(key, entry, self.ttl)
+                return self._respond(entry)
+            return wrapper
+        return decorator
+
+
+def invalidate_api_cache(conn):
+    """
+    Makes every cached API response stale by bumping the cache generation.
+    Called by the ETL (psycopg2 connection) after loading new gigs.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(BUMP_GENERATION_SQL, (CACHE_GENERATION_NAME,))
+    conn.commit()
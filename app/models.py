@@ -1,4 +1,5 @@
 from datetime import datetime
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from .__init__ import db # Import the SQLAlchemy instance from __init__.py
 
 class User(db.Model):
@@ -11,6 +12,7 @@ class User(db.Model):
 
 
     preferences = db.relationship('UserPreference', backref='user', lazy=True, cascade="all, delete-orphan")
+    keyword_subscriptions = db.relationship('UserKeywordSubscription', backref='user', lazy=True, cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<User {self.email}>"
@@ -27,32 +29,99 @@ class UserPreference(db.Model):
     def __repr__(self):
         return f"<UserPreference User:{self.user_id} Category:{self.category_name}>"
 
-class Gig(db.Model):
-    __tablename__ = 'gigs' # Link to the existing 'gigs' table
+class UserKeywordSubscription(db.Model):
+    __tablename__ = 'user_keyword_subscriptions' # Skill/keyword alert terms, normalized by etl.keyword_matcher.normalize_term
     id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    term = db.Column(db.String(100), nullable=False)
+    created_at = db.Column(db.TIMESTAMP(timezone=True), default=datetime.utcnow)
+
+    __table_args__ = (db.UniqueConstraint('user_id', 'term', name='_user_keyword_uc'),)
+
+    def __repr__(self):
+        return f"<UserKeywordSubscription User:{self.user_id} Term:{self.term}>"
+
+class Gig(db.Model):
+    __tablename__ = 'gigs' # Link to the existing 'gigs' table, partitioned by month of published_at
+    # Primary key (id, published_at): a partitioned table's key must include the partition key
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     title = db.Column(db.String(512), nullable=False)
-    link = db.Column(db.Text, unique=True, nullable=False)
+    link = db.Column(db.Text, nullable=False) # Unique through gig_links
     description = db.Column(db.Text)
-    published_at = db.Column(db.TIMESTAMP(timezone=True))
+    published_at = db.Column(db.TIMESTAMP(timezone=True), primary_key=True)
     category = db.Column(db.String(100))
     budget_amount = db.Column(db.Numeric(10, 2))
     budget_currency = db.Column(db.String(10))
     skills = db.Column(db.ARRAY(db.Text)) # PostgreSQL array type
     source_platform = db.Column(db.String(50))
     created_at = db.Column(db.TIMESTAMP(timezone=True), default=datetime.utcnow)
+    # Generated full-text search column (see db/init_db.sql); deferred so ORM loads skip it
+    search_vector = db.deferred(db.Column(
+        TSVECTOR, db.Computed("gig_search_document(title, description, skills)", persisted=True)
+    ))
+
+    __table_args__ = {'postgresql_partition_by': 'RANGE (published_at)'}
 
     def __repr__(self):
         return f"<Gig {self.title[:50]}...>"
 
+class GigLink(db.Model):
+    __tablename__ = 'gig_links' # Every link ever loaded; the ETL loader's duplicate check
+    link = db.Column(db.Text, primary_key=True)
+    first_seen_at = db.Column(db.TIMESTAMP(timezone=True), server_default=db.func.now())
+
+    def __repr__(self):
+        return f"<GigLink {self.link}>"
+
+class GigKeywordMatch(db.Model):
+    __tablename__ = 'gig_keyword_matches' # Written by the ETL loader (etl/keyword_matcher.py)
+    gig_id = db.Column(db.Integer, primary_key=True) # No foreign key into the partitioned gigs
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+
+    def __repr__(self):
+        return f"<GigKeywordMatch Gig:{self.gig_id} User:{self.user_id}>"
+
 class SentNotification(db.Model):
-    __tablename__ = 'sent_notifications' # Link to the existing 'sent_notifications' table
-    id = db.Column(db.Integer, primary_key=True)
+    __tablename__ = 'sent_notifications' # Link to the existing 'sent_notifications' table, partitioned by month of sent_at
+    # Primary key (id, sent_at), as the partition key must be part of it
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
-    gig_id = db.Column(db.Integer, db.ForeignKey('gigs.id', ondelete='CASCADE'), nullable=False)
-    sent_at = db.Column(db.TIMESTAMP(timezone=True), default=datetime.utcnow)
+    gig_id = db.Column(db.Integer, nullable=False) # No foreign key into the partitioned gigs
+    sent_at = db.Column(db.TIMESTAMP(timezone=True), primary_key=True, default=datetime.utcnow)
 
-    __table_args__ = (db.UniqueConstraint('user_id', 'gig_id', name='_user_gig_notification_uc'),)
+    __table_args__ = {'postgresql_partition_by': 'RANGE (sent_at)'}
 
     def __repr__(self):
         return f"<SentNotification User:{self.user_id} Gig:{self.gig_id}>"
 
+
+class NotificationOutbox(db.Model):
+    __tablename__ = 'notification_outbox' # Rendered emails waiting for (or done with) delivery
+    id = db.Column(db.BigInteger, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    recipient_email = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    body_html = db.Column(db.Text, nullable=False)
+    gig_ids = db.Column(db.ARRAY(db.Integer), nullable=False) # Gigs recorded in sent_notifications once delivered
+    status = db.Column(db.String(20), nullable=False, server_default='pending')
+    attempts = db.Column(db.Integer, nullable=False, server_default='0')
+    next_attempt_at = db.Column(db.TIMESTAMP(timezone=True), nullable=False, server_default=db.func.now())
+    locked_at = db.Column(db.TIMESTAMP(timezone=True))
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.TIMESTAMP(timezone=True), server_default=db.func.now())
+    delivered_at = db.Column(db.TIMESTAMP(timezone=True))
+
+    def __repr__(self):
+        return f"<NotificationOutbox {self.id} User:{self.user_id} {self.status}>"
+
+class GigCategoryHourly(db.Model):
+    __tablename__ = 'gig_category_hourly' # Hourly rollup maintained by the ETL (etl/category_rollup.py)
+    category = db.Column(db.String(100), primary_key=True) # '' for uncategorized gigs
+    hour_bucket = db.Column(db.TIMESTAMP(timezone=True), primary_key=True)
+    source_platform = db.Column(db.String(50), primary_key=True)
+    gig_count = db.Column(db.BigInteger, nullable=False, default=0)
+    budget_sum = db.Column(db.Numeric(18, 2), nullable=False, default=0)
+    budget_count = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<GigCategoryHourly {self.category} {self.hour_bucket} {self.source_platform}: {self.gig_count}>"
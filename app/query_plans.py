@@ -0,0 +1,214 @@
+"""
+EXPLAIN ANALYZE regression check for the hot read paths: the notifier's
+pending-notification sweep (whole window and a just-loaded batch), the
+recommended-gigs page and the raw edge-hour counts behind the stats and
+trending endpoints.
+
+The statements are built by the same functions the notifier and the API
+use, run with EXPLAIN ANALYZE against a seeded dataset, and every plan must
+reach 'gigs' and 'sent_notifications' through an index: a sequential scan
+that reads rows of either table fails the check.
+
+The dataset is inserted (and the tables analyzed) inside one transaction
+that is always rolled back, so the check can run against a development or
+CI database without leaving rows behind; it does take write locks on the
+seeded tables while it runs, so do not point it at production:
+    python -m app.query_plans [--gigs 200000] [--users 2000] [--days 30]
+Exits with status 1 if any plan regressed.
+"""
+import argparse
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy.dialects import postgresql
+
+from app.routes import ALL_CATEGORIES, RECOMMENDED_GIG_FIELDS, _recommended_gigs_query, _category_count_queries
+from notification.notifier import NOTIFICATION_WINDOW_HOURS, _pending_notifications_query
+from utils.db_utils import get_db_connection, close_db_connection, close_db_pool
+
+CHECKED_TABLES = ("gigs", "sent_notifications")  # Tables that must only be read through indexes
+INDEX_SCAN_NODES = {"Index Scan", "Index Only Scan", "Bitmap Heap Scan"}
+EVENT_BATCH_SIZE = 100  # Gigs in the simulated just-loaded batch
+
+_ENSURE_PARTITIONS_SQL = """
+    SELECT ensure_monthly_partition(parent, month::date)
+    FROM unnest(ARRAY['gigs', 'sent_notifications']) AS parent,
+         generate_series(date_trunc('month', now() AT TIME ZONE 'UTC' - %(days)s * interval '1 day'),
+                         date_trunc('month', now() AT TIME ZONE 'UTC'), interval '1 month') AS month;
+"""
+
+_SEED_GIGS_SQL = """
+    INSERT INTO gigs (title, link, description, published_at, category,
+                      budget_amount, budget_currency, skills, source_platform)
+    SELECT 'Plan check gig ' || i,
+           'https://plan-check.invalid/gig/' || i,
+           'Seeded by app.query_plans',
+           now() - random() * %(days)s * interval '1 day',
+           (%(categories)s::text[])[1 + i %% cardinality(%(categories)s::text[])],
+           CASE WHEN i %% 3 = 0 THEN NULL ELSE 50 + i %% 950 END,
+           'USD',
+           ARRAY['python', 'sql'],
+           'Freelancer'
+    FROM generate_series(1, %(gigs)s) AS i
+    RETURNING id;
+"""
+
+_SEED_USERS_SQL = """
+    INSERT INTO users (email, password_hash, is_active)
+    SELECT 'plan-check-' || i || '@example.invalid', 'x', i %% 10 <> 0
+    FROM generate_series(1, %(users)s) AS i
+    RETURNING id;
+"""
+
+# One to three categories per user
+_SEED_PREFERENCES_SQL = """
+    INSERT INTO user_preferences (user_id, category_name)
+    SELECT user_id, (%(categories)s::text[])[1 + (user_id * step) %% cardinality(%(categories)s::text[])]
+    FROM unnest(%(user_ids)s::int[]) AS user_id, generate_series(1, 1 + user_id %% 3) AS step
+    ON CONFLICT (user_id, category_name) DO NOTHING;
+"""
+
+# Notifications for one in fifty seeded gigs, sent shortly after publication
+_SEED_SENT_SQL = """
+    INSERT INTO sent_notifications (user_id, gig_id, sent_at)
+    SELECT p.user_id, g.id, g.published_at + interval '5 minutes'
+    FROM gigs g
+    JOIN user_preferences p ON p.category_name = g.category
+    WHERE g.id = ANY(%(gig_ids)s) AND g.id %% 50 = 0 AND p.user_id = ANY(%(user_ids)s)
+      AND g.published_at < now() - interval '5 minutes';
+"""
+
+_SEED_KEYWORD_MATCHES_SQL = """
+    INSERT INTO gig_keyword_matches (gig_id, user_id)
+    SELECT gig_id, (%(user_ids)s::int[])[1 + gig_id %% cardinality(%(user_ids)s::int[])]
+    FROM unnest(%(gig_ids)s::int[]) AS gig_id
+    WHERE gig_id %% 7 = 0
+    ON CONFLICT (gig_id, user_id) DO NOTHING;
+"""
+
+_NEWEST_GIG_IDS_SQL = "SELECT id FROM gigs ORDER BY published_at DESC LIMIT %s;"
+
+_PARTITION_PARENTS_SQL = "SELECT inhrelid::regclass::text, inhparent::regclass::text FROM pg_inherits;"
+
+
+def seed_dataset(cursor, gigs, users, days):
+    """Inserts the check's gigs, users, preferences, sent notifications and keyword matches, then analyzes."""
+    params = {"days": days, "gigs": gigs, "users": users, "categories": ALL_CATEGORIES}
+    cursor.execute(_ENSURE_PARTITIONS_SQL, params)
+    cursor.execute(_SEED_GIGS_SQL, params)
+    params["gig_ids"] = [row[0] for row in cursor.fetchall()]
+    cursor.execute(_SEED_USERS_SQL, params)
+    params["user_ids"] = [row[0] for row in cursor.fetchall()]
+    cursor.execute(_SEED_PREFERENCES_SQL, params)
+    cursor.execute(_SEED_SENT_SQL, params)
+    cursor.execute(_SEED_KEYWORD_MATCHES_SQL, params)
+    cursor.execute("ANALYZE gigs, users, user_preferences, sent_notifications, gig_keyword_matches;")
+
+
+def plan_checks(cursor):
+    """(name, SQLAlchemy statement) pairs of the queries to check, with parameters as the app uses them."""
+    now = datetime.utcnow()
+    cursor.execute(_NEWEST_GIG_IDS_SQL, (EVENT_BATCH_SIZE,))
+    batch_gig_ids = [row[0] for row in cursor.fetchall()]
+    window_start = now - timedelta(hours=NOTIFICATION_WINDOW_HOURS)
+    checks = [
+        ("notifier sweep", _pending_notifications_query(window_start)),
+        ("notifier new-gig batch", _pending_notifications_query(window_start, batch_gig_ids)),
+        ("recommended gigs", _recommended_gigs_query(
+            list(RECOMMENDED_GIG_FIELDS), ["Web Development", "Design & Creative"], now - timedelta(hours=6))),
+    ]
+    # Stats (last 30 days) and trending (last 2 days vs. the 2 before): the rollup plus the raw edge hours
+    for name, start, end in (("stats", now - timedelta(days=30), None),
+                             ("trending current", now - timedelta(days=2), None),
+                             ("trending previous", now - timedelta(days=4), now - timedelta(days=2))):
+        for number, query in enumerate(_category_count_queries(start, end), start=1):
+            checks.append((f"{name} counts {number}", query))
+    return checks
+
+
+def explain(cursor, statement):
+    """Runs `statement` under EXPLAIN ANALYZE and returns the JSON plan of the top node and the execution time."""
+    # psycopg2's dialect, so the SQL explained is the SQL the app sends (no added bind casts)
+    compiled = statement.compile(dialect=postgresql.psycopg2.dialect(), compile_kwargs={"render_postcompile": True})
+    cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + str(compiled), compiled.params)
+    result = cursor.fetchone()[0][0]
+    return result["Plan"], result["Execution Time"]
+
+
+def _scan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from _scan_nodes(child)
+
+
+def check_plan(plan, parents):
+    """
+    Sequential scans in a plan that read rows of a checked table or of one
+    of its partitions. Returns (problems, {table: [index scan node types]}).
+    """
+    problems = []
+    index_scans = {}
+    for node in _scan_nodes(plan):
+        relation = node.get("Relation Name")
+        table = parents.get(relation, relation)
+        if table not in CHECKED_TABLES:
+            continue
+        if node["Node Type"] in INDEX_SCAN_NODES:
+            index_scans.setdefault(table, []).append(node["Node Type"])
+        elif node["Node Type"] == "Seq Scan":
+            rows_read = (node.get("Actual Rows", 0) + node.get("Rows Removed by Filter", 0)) * node.get("Actual Loops", 1)
+            if rows_read:
+                problems.append(f"Seq Scan on {relation} read {rows_read:.0f} rows")
+    return problems, index_scans
+
+
+def run_plan_checks(conn, gigs, users, days):
+    """Seeds, explains every check and rolls back. Returns a list of (name, ms, problems, index_scans)."""
+    results = []
+    try:
+        with conn.cursor() as cursor:
+            seed_dataset(cursor, gigs, users, days)
+            cursor.execute(_PARTITION_PARENTS_SQL)
+            parents = dict(cursor.fetchall())
+            for name, statement in plan_checks(cursor):
+                plan, execution_ms = explain(cursor, statement)
+                problems, index_scans = check_plan(plan, parents)
+                results.append((name, execution_ms, problems, index_scans))
+    finally:
+        conn.rollback()  # Never keep the seeded rows
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that the hot queries use index scans on a seeded dataset.")
+    parser.add_argument("--gigs", type=int, default=200_000, help="Gigs to seed (default 200000).")
+    parser.add_argument("--users", type=int, default=2_000, help="Users to seed (default 2000).")
+    parser.add_argument("--days", type=int, default=30, help="Days the seeded gigs are spread over (default 30).")
+    args = parser.parse_args(argv)
+
+    conn = get_db_connection()
+    if not conn:
+        print("Failed to get database connection. Aborting plan check.")
+        return 1
+    try:
+        results = run_plan_checks(conn, args.gigs, args.users, args.days)
+    except Exception as e:
+        print(f"Plan check failed: {e}")
+        return 1
+    finally:
+        close_db_connection(conn)
+        close_db_pool()
+
+    failed = 0
+    for name, execution_ms, problems, index_scans in results:
+        scans = "; ".join(f"{table}: {', '.join(sorted(set(nodes)))}" for table, nodes in index_scans.items())
+        print(f"{'FAIL' if problems else 'ok':4s}  {name:32s} {execution_ms:9.1f} ms  {scans}")
+        for problem in problems:
+            print(f"      {problem}")
+        failed += bool(problems)
+    print(f"{len(results) - failed} of {len(results)} plans use index scans.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
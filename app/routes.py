@@ -1,12 +1,19 @@
 from flask import Blueprint, request, jsonify
-from .__init__ import db, bcrypt
-from .models import User, Gig, UserPreference, SentNotification
+from .__init__ import db, bcrypt, response_cache
+from .models import User, Gig, UserPreference, SentNotification, GigCategoryHourly, UserKeywordSubscription
+from .cache import BUMP_GENERATION_SQL
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timedelta
 from flask import session
-from sqlalchemy import func
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.dialects.postgresql import array as pg_array
+import base64
+import json
 import logging
 
+from etl.keyword_matcher import KEYWORD_MATCHER_GENERATION, MAX_TERM_TOKENS, normalize_term
+from notification.subscriber_index import PREFERENCES_CHANGED_CHANNEL
+
 # Configure logging for this blueprint
 logger = logging.getLogger(__name__)
 
@@ -22,6 +29,8 @@ ALL_CATEGORIES = [
     "Admin & Data Entry", "Other"
 ]
 MAX_CATEGORIES_PER_USER = 3
+MAX_KEYWORDS_PER_USER = 20
+MAX_KEYWORD_LENGTH = 100  # Matches user_keyword_subscriptions.term
 
 @bp.route('/register', methods=['POST'])
 def register():
@@ -121,6 +130,8 @@ def set_user_preferences(user_id):
             new_pref = UserPreference(user_id=user_id, category_name=cat_name)
             db.session.add(new_pref)
 
+        # Delivered on commit; lets the notifier's subscriber index refresh just this user
+        db.session.execute(select(func.pg_notify(PREFERENCES_CHANGED_CHANNEL, str(user_id))))
         db.session.commit()
 
         updated_prefs = [p.category_name for p in user.preferences]
@@ -145,11 +156,150 @@ def get_user_preferences(user_id):
     logger.info(f"Retrieved preferences for user {user_id}: {prefs}")
     return jsonify({"user_id": user_id, "preferences": prefs}), 200
 
+@bp.route("/users/<int:user_id>/keywords", methods=["PUT"])
+def set_user_keywords(user_id):
+    """
+    API endpoint for replacing a user's skill/keyword alert terms.
+    Expects JSON: {"keywords": ["pytorch", "shopify", "react native"]} (an empty list clears them)
+    Terms are stored normalized (lower-case word tokens) and matched against
+    the title, skills and description of every newly loaded gig.
+    """
+    user = User.query.get(user_id)
+    if not user:
+        return jsonify({"message": "User not found"}), 404
+
+    data = request.get_json()
+    if not data or 'keywords' not in data:
+        return jsonify({"message": "Keywords data is required in the request body."}), 400
+
+    keywords = data['keywords']
+    if not isinstance(keywords, list) or not all(isinstance(term, str) for term in keywords):
+        return jsonify({"message": "Keywords must be a list of strings."}), 400
+
+    terms = []
+    for keyword in keywords:
+        term = normalize_term(keyword)
+        if term is None or len(term) > MAX_KEYWORD_LENGTH:
+            return jsonify({"message": f"Invalid keyword '{keyword}': use 1 to {MAX_TERM_TOKENS} words "
+                                       f"and at most {MAX_KEYWORD_LENGTH} characters."}), 400
+        if term not in terms:
+            terms.append(term)
+
+    if len(terms) > MAX_KEYWORDS_PER_USER:
+        return jsonify({"message": f"You can subscribe to a maximum of {MAX_KEYWORDS_PER_USER} keywords."}), 400
+
+    try:
+        UserKeywordSubscription.query.filter_by(user_id=user_id).delete()
+        for term in terms:
+            db.session.add(UserKeywordSubscription(user_id=user_id, term=term))
+
+        # Makes the ETL recompile its keyword matcher before the next load
+        db.session.connection().exec_driver_sql(BUMP_GENERATION_SQL, (KEYWORD_MATCHER_GENERATION,))
+        db.session.commit()
+
+        logger.info(f"Keyword subscriptions updated for user {user_id}: {terms}")
+        return jsonify({"message": "Keywords updated successfully.", "keywords": terms}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"An error occurred while updating keywords for user {user_id}: {str(e)}", exc_info=True)
+        return jsonify({"message": f"An error occurred while updating keywords: {str(e)}"}), 500
+
+@bp.route("/users/<int:user_id>/keywords", methods=["GET"])
+def get_user_keywords(user_id):
+    """
+    API endpoint for retrieving a user's skill/keyword alert terms.
+    """
+    user = User.query.get(user_id)
+    if not user:
+        return jsonify({"message": "User not found"}), 404
+
+    terms = sorted(s.term for s in user.keyword_subscriptions)
+    return jsonify({"user_id": user_id, "keywords": terms}), 200
+
+# Columns a client may request through ?fields=; published_at and id are always read for the cursor
+RECOMMENDED_GIG_FIELDS = {
+    "id": Gig.id,
+    "title": Gig.title,
+    "link": Gig.link,
+    "description": Gig.description,
+    "category": Gig.category,
+    "budget_amount": Gig.budget_amount,
+    "budget_currency": Gig.budget_currency,
+    "skills": Gig.skills,
+    "source_platform": Gig.source_platform,
+    "published_at": Gig.published_at,
+}
+RECOMMENDED_DEFAULT_PAGE_SIZE = 50
+RECOMMENDED_MAX_PAGE_SIZE = 200
+
+
+def _encode_gig_cursor(published_at, gig_id):
+    """Opaque keyset cursor for the (published_at, id) position of the last returned gig."""
+    raw = json.dumps([published_at.isoformat(), gig_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def _decode_gig_cursor(cursor):
+    """Returns (published_at, id) from a cursor; raises ValueError if it is malformed."""
+    try:
+        published_at, gig_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return datetime.fromisoformat(published_at), int(gig_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor.") from e
+
+
+def _requested_gig_fields():
+    """
+    Gig field names from the ?fields= parameter (all fields if absent), or
+    a 400 response tuple naming the unknown ones.
+    """
+    fields = request.args.get("fields")
+    field_names = [name.strip() for name in fields.split(",") if name.strip()] if fields else list(RECOMMENDED_GIG_FIELDS)
+    unknown_fields = [name for name in field_names if name not in RECOMMENDED_GIG_FIELDS]
+    if unknown_fields:
+        return jsonify({"message": f"Unknown fields: {', '.join(unknown_fields)}. "
+                                   f"Choose from: {', '.join(RECOMMENDED_GIG_FIELDS)}."}), 400
+    return field_names
+
+
+def _recommended_gigs_query(field_names, categories, time_cutoff, cursor_position=None, limit=RECOMMENDED_DEFAULT_PAGE_SIZE):
+    """
+    Core select of the requested gig columns (plus the cursor columns) in
+    `categories` published since `time_cutoff`, newest first, one row more
+    than `limit` to detect a next page. `cursor_position` is a decoded
+    (published_at, id) cursor.
+    """
+    query = select(
+        *[RECOMMENDED_GIG_FIELDS[name] for name in field_names],
+        Gig.published_at.label("_cursor_published_at"),
+        Gig.id.label("_cursor_id")
+    ).where(
+        Gig.category.in_(categories),
+        Gig.published_at >= time_cutoff
+    )
+    if cursor_position is not None:
+        query = query.where(tuple_(Gig.published_at, Gig.id) < tuple_(*cursor_position))
+    return query.order_by(Gig.published_at.desc(), Gig.id.desc()).limit(limit + 1)
+
+
+def _serialize_gig_field(name, value):
+    if name == "budget_amount":
+        return str(value) if value else None
+    if name == "published_at":
+        return value.isoformat() if value else None
+    return value
+
+
 @bp.route("/gigs/recommended/<int:user_id>", methods=["GET"])
 def get_recommended_gigs(user_id):
     """
     API endpoint for retrieving gigs recommended to a user based on their preferences
     and published within the last 6 hours.
+    Query parameters:
+        limit   page size (default 50, at most 200)
+        cursor  `next_cursor` from the previous page; pages follow (published_at, id) descending
+        fields  comma-separated subset of the gig fields, e.g. "id,title,link,published_at"
     """
     user = User.query.get(user_id)
     if not user:
@@ -160,57 +310,197 @@ def get_recommended_gigs(user_id):
         logger.info(f"User {user_id} has no preferences set for recommended gigs.")
         return jsonify({
             "message": "Please set your preferences first to get recommendations.",
-            "gigs": []
+            "gigs": [],
+            "next_cursor": None
         }), 200
 
+    limit = request.args.get("limit", RECOMMENDED_DEFAULT_PAGE_SIZE, type=int)
+    if limit < 1:
+        return jsonify({"message": "limit must be a positive integer."}), 400
+    limit = min(limit, RECOMMENDED_MAX_PAGE_SIZE)
+
+    field_names = _requested_gig_fields()
+    if isinstance(field_names, tuple):
+        return field_names  # 400 response for unknown fields
+
     time_cutoff = datetime.utcnow() - timedelta(hours=6)
 
     try:
-        recommended_gigs = Gig.query.filter(
-            Gig.category.in_(user_preferences),
-            Gig.published_at >= time_cutoff
-        ).order_by(Gig.published_at.desc()).all()
-
-        gigs_data = []
-        if recommended_gigs:
-            for gig in recommended_gigs:
-                gigs_data.append({
-                    "id": gig.id,
-                    "title": gig.title,
-                    "link": gig.link,
-                    "description": gig.description,
-                    "category": gig.category,
-                    "budget_amount": str(gig.budget_amount) if gig.budget_amount else None,
-                    "budget_currency": gig.budget_currency,
-                    "skills": gig.skills,
-                    "source_platform": gig.source_platform,
-                    "published_at": gig.published_at.isoformat() if gig.published_at else None
-                })
+        # Core select of only the requested columns; no ORM objects are built
+        cursor = request.args.get("cursor")
+        cursor_position = _decode_gig_cursor(cursor) if cursor else None
+        query = _recommended_gigs_query(field_names, user_preferences, time_cutoff, cursor_position, limit)
+
+        rows = db.session.execute(query).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_gig_cursor(rows[-1]._cursor_published_at, rows[-1]._cursor_id)
+
+        gigs_data = [
+            {name: _serialize_gig_field(name, value) for name, value in zip(field_names, row)}
+            for row in rows
+        ]
+        if gigs_data:
             logger.info(f"Found {len(gigs_data)} recommended gigs for user {user_id}.")
-            return jsonify({"message": "Recommended gigs found", "gigs": gigs_data}), 200
+            return jsonify({"message": "Recommended gigs found", "gigs": gigs_data, "next_cursor": next_cursor}), 200
         else:
             logger.info(f"No new gigs matching preferences for user {user_id} in last 6 hours.")
             return jsonify({
                 "message": "No new gigs matching your preferences found in the last 6 hours. We will send newer ones to your email!",
-                "gigs": []
+                "gigs": [],
+                "next_cursor": None
             }), 200
 
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
     except Exception as e:
         logger.error(f"Error fetching recommended gigs for user {user_id}: {str(e)}", exc_info=True)
         return jsonify({"message": "Internal server error"}), 500
 
 
+SEARCH_DEFAULT_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+SEARCH_MAX_PAGE = 50  # Deeper offset pages cost a full ranking pass each; refine the query instead
+
+
+def _search_gigs_query(field_names, q=None, skills=(), category=None, page=1, limit=SEARCH_DEFAULT_PAGE_SIZE):
+    """
+    Core select of the requested gig columns matching the search text `q`
+    (web-search syntax) and listing all `skills`, ranked by text relevance
+    and then recency; page `page` (1-based) plus one row to detect a next page.
+    """
+    query = select(*[RECOMMENDED_GIG_FIELDS[name] for name in field_names])
+    order_by = []
+    if q:
+        # Served by the GIN index on the generated search_vector column
+        ts_query = func.websearch_to_tsquery('english', q)
+        query = query.where(Gig.search_vector.op('@@')(ts_query))
+        order_by.append(func.ts_rank(Gig.search_vector, ts_query).desc())
+    if skills:
+        query = query.where(Gig.skills.op('@>')(pg_array(skills)))  # GIN-indexed containment
+    if category:
+        query = query.where(Gig.category == category)
+    return (
+        query.order_by(*order_by, Gig.published_at.desc().nulls_last(), Gig.id.desc())
+        .offset((page - 1) * limit)
+        .limit(limit + 1)
+    )
+
+
+@bp.route("/gigs/search", methods=["GET"])
+def search_gigs():
+    """
+    API endpoint for full-text and skill search over all gigs.
+    Query parameters (at least one of q / skills is required):
+        q         search text in web-search syntax ("react native", -wordpress, "a or b"),
+                  matched against title, skills and description
+        skills    comma-separated skills the gig must all list, exactly as tagged (e.g. "Python,Django")
+        category  optional category filter
+        limit     page size (default 20, at most 100)
+        page      1-based page number (at most 50)
+        fields    comma-separated subset of the gig fields, as for recommended gigs
+    Results are ranked by text relevance (title and skills weigh more than the
+    description), then by recency; without `q` they are ordered by recency.
+    """
+    q = (request.args.get("q") or "").strip()
+    skills = [skill.strip() for skill in request.args.get("skills", "").split(",") if skill.strip()]
+    if not q and not skills:
+        return jsonify({"message": "Provide a search text (q) and/or skills."}), 400
+
+    limit = request.args.get("limit", SEARCH_DEFAULT_PAGE_SIZE, type=int)
+    page = request.args.get("page", 1, type=int)
+    if limit < 1 or page < 1:
+        return jsonify({"message": "limit and page must be positive integers."}), 400
+    if page > SEARCH_MAX_PAGE:
+        return jsonify({"message": f"page must be at most {SEARCH_MAX_PAGE}; narrow the search instead."}), 400
+    limit = min(limit, SEARCH_MAX_PAGE_SIZE)
+
+    field_names = _requested_gig_fields()
+    if isinstance(field_names, tuple):
+        return field_names
+
+    try:
+        query = _search_gigs_query(field_names, q, skills, request.args.get("category"), page, limit)
+        rows = db.session.execute(query).all()
+        has_more = len(rows) > limit
+        gigs_data = [
+            {name: _serialize_gig_field(name, value) for name, value in zip(field_names, row)}
+            for row in rows[:limit]
+        ]
+        logger.info(f"Gig search q={q!r} skills={skills} page {page}: {len(gigs_data)} results.")
+        return jsonify({
+            "gigs": gigs_data,
+            "page": page,
+            "next_page": page + 1 if has_more and page < SEARCH_MAX_PAGE else None
+        }), 200
+
+    except Exception as e:
+        logger.error(f"Error searching gigs for q={q!r} skills={skills}: {str(e)}", exc_info=True)
+        return jsonify({"message": "Internal server error"}), 500
+
+
+def _hour_floor(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def _category_count_queries(start, end=None):
+    """
+    Selects of (category, count) rows that add up to the gig counts per
+    category published in [start, end] (no upper bound when `end` is None):
+    whole hours come from the hourly rollup, only the partial hours at the
+    edges of the window from raw gigs.
+    """
+    first_full_hour = _hour_floor(start)
+    if first_full_hour < start:
+        first_full_hour += timedelta(hours=1)
+    end_hour = _hour_floor(end) if end is not None else None
+
+    queries = []
+    raw_filters = []
+    if end_hour is not None and first_full_hour >= end_hour:
+        raw_filters.append(Gig.published_at.between(start, end))  # Window shorter than the rollup's resolution
+    else:
+        rollup = select(GigCategoryHourly.category, func.sum(GigCategoryHourly.gig_count)) \
+            .where(GigCategoryHourly.hour_bucket >= first_full_hour)
+        if end_hour is not None:
+            rollup = rollup.where(GigCategoryHourly.hour_bucket < end_hour)
+            raw_filters.append(Gig.published_at.between(end_hour, end))
+        queries.append(rollup.group_by(GigCategoryHourly.category))
+        raw_filters.append((Gig.published_at >= start) & (Gig.published_at < first_full_hour))
+
+    for raw_filter in raw_filters:
+        queries.append(select(Gig.category, func.count(Gig.id)).where(raw_filter).group_by(Gig.category))
+    return queries
+
+
+def _category_counts(start, end=None):
+    """
+    Gig counts per category published in [start, end] (no upper bound when
+    `end` is None); equals a GROUP BY over 'gigs' (see _category_count_queries).
+    """
+    counts = {}
+    for query in _category_count_queries(start, end):
+        for category, count in db.session.execute(query).all():
+            counts[category or None] = counts.get(category or None, 0) + int(count)  # The rollup stores NULL as ''
+    return counts
+
+
+def _average_budget_query():
+    """Select of the average budget of all gigs with a budget, from the rollup's budget totals."""
+    return select(func.sum(GigCategoryHourly.budget_sum) / func.nullif(func.sum(GigCategoryHourly.budget_count), 0))
+
+
 @bp.route('/stats', methods=['GET'])
+@response_cache.cached("stats", db)
 def get_stats():
     try:
         # Count active gigs (published in last 30 days)
         time_cutoff = datetime.utcnow() - timedelta(days=30)
-        active_gigs = Gig.query.filter(Gig.published_at >= time_cutoff).count()
+        active_gigs = sum(_category_counts(time_cutoff).values())
 
-        # Calculate average budget (exclude nulls)
-        avg_budget = db.session.query(func.avg(Gig.budget_amount)) \
-                          .filter(Gig.budget_amount.isnot(None)) \
-                          .scalar() or 0
+        # Calculate average budget (exclude nulls), from the rollup's budget totals
+        avg_budget = db.session.execute(_average_budget_query()).scalar() or 0
 
         # Count active freelancers
         freelancers = User.query.count()
@@ -230,26 +520,18 @@ def get_stats():
 
 
 @bp.route('/trending_categories', methods=['GET'])
+@response_cache.cached("trending_categories", db)
 def get_trending_categories():
     try:
         # Time windows: last 2 days vs. previous 2 days
         current_window = datetime.utcnow() - timedelta(days=2)
         previous_window = datetime.utcnow() - timedelta(days=4)
 
-        # Fetch gig counts
-        current_counts = db.session.query(Gig.category, func.count(Gig.id)) \
-            .filter(Gig.published_at >= current_window) \
-            .group_by(Gig.category) \
-            .all()
-        previous_counts = db.session.query(Gig.category, func.count(Gig.id)) \
-            .filter(Gig.published_at.between(previous_window, current_window)) \
-            .group_by(Gig.category) \
-            .all()
-
-        current_dict = dict(current_counts)
-        previous_dict = dict(previous_counts)
+        # Fetch gig counts (hourly rollup plus the partial edge hours)
+        current_dict = _category_counts(current_window)
+        previous_dict = _category_counts(previous_window, current_window)
         trending_data = []
-        total_current_gigs = sum(count for _, count in current_counts) or 1
+        total_current_gigs = sum(current_dict.values()) or 1
 
         # Calculate trends (skip "Other" and low-activity categories)
         for category in ALL_CATEGORIES:
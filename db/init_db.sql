@@ -1,22 +1,86 @@
--- Gigs Table
+-- Full-text search document of a gig: title and skills weigh more than the description.
+-- Wrapped in an IMMUTABLE function because array_to_string is only STABLE, and generated columns need IMMUTABLE expressions.
+CREATE OR REPLACE FUNCTION gig_search_document(title TEXT, description TEXT, skills TEXT[])
+RETURNS tsvector
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT setweight(to_tsvector('english', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(array_to_string(skills, ' '), '')), 'A')
+        || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+$$;
+
+-- Creates the monthly range partition of `parent` (partitioned by a timestamp column) for the month
+-- containing `month_start` if it does not exist yet, named <prefix>_pYYYYMM (prefix defaults to the
+-- parent's name). Month bounds are UTC. Used by the ETL loader for the months of each batch, by
+-- etl/partition_maintenance.py ahead of time and by the partitioning migration. Returns the
+-- partition name, or NULL if `parent` is not a partitioned table (database not migrated yet).
+CREATE OR REPLACE FUNCTION ensure_monthly_partition(parent TEXT, month_start DATE, prefix TEXT DEFAULT NULL)
+RETURNS TEXT
+LANGUAGE plpgsql AS $$
+DECLARE
+    lower_bound DATE := date_trunc('month', month_start)::date;
+    partition_name TEXT := format('%s_p%s', coalesce(prefix, parent), to_char(lower_bound, 'YYYYMM'));
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(parent)) THEN
+        RETURN NULL;
+    END IF;
+    IF to_regclass(partition_name) IS NULL THEN
+        BEGIN
+            EXECUTE format('CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                           partition_name, parent,
+                           lower_bound::timestamp AT TIME ZONE 'UTC',
+                           (lower_bound + interval '1 month')::timestamp AT TIME ZONE 'UTC');
+        EXCEPTION WHEN duplicate_table THEN
+            NULL; -- Created concurrently by another session
+        END;
+    END IF;
+    -- A table of that name that is not attached (e.g. detached by hand) would leave the month without a partition
+    IF NOT EXISTS (SELECT 1 FROM pg_inherits
+                   WHERE inhrelid = to_regclass(partition_name) AND inhparent = to_regclass(parent)) THEN
+        RAISE EXCEPTION 'Table % exists but is not a partition of %', partition_name, parent;
+    END IF;
+    RETURN partition_name;
+END;
+$$;
+
+-- Gigs Table, range-partitioned by month of published_at (see etl/partition_maintenance.py).
+-- Links are unique through gig_links, since a unique index on a partitioned table must include the partition key.
 CREATE TABLE IF NOT EXISTS gigs (
-    id SERIAL PRIMARY KEY,
+    id SERIAL,
     title VARCHAR(512) NOT NULL,
-    link TEXT UNIQUE NOT NULL,
+    link TEXT NOT NULL,
     description TEXT,
-    published_at TIMESTAMP WITH TIME ZONE,
+    published_at TIMESTAMP WITH TIME ZONE NOT NULL, -- Partition key; the loader uses the load time when a feed has no date
     category VARCHAR(100),
     budget_amount DECIMAL(10, 2),
     budget_currency VARCHAR(10),
     skills TEXT[], -- PostgreSQL array type for skills
     source_platform VARCHAR(50),
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    -- Filled by PostgreSQL on every insert/update, so both ETL load paths populate it
+    search_vector tsvector GENERATED ALWAYS AS (gig_search_document(title, description, skills)) STORED,
+    PRIMARY KEY (id, published_at)
+) PARTITION BY RANGE (published_at);
+
+-- Databases created before full-text search: add the search column (rewrites the table once;
+-- a no-op on partitioned tables, which are created with it)
+ALTER TABLE gigs ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (gig_search_document(title, description, skills)) STORED;
+
+-- Links of all stored gigs: the loader's duplicate check. A link is removed when its gig's partition
+-- is retired (etl/partition_maintenance.py); the loader refuses gigs dated before the retention
+-- period, so retired gigs are not loaded again.
+CREATE TABLE IF NOT EXISTS gig_links (
+    link TEXT PRIMARY KEY,
+    first_seen_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
--- Indexes for gigs table
-CREATE UNIQUE INDEX IF NOT EXISTS idx_gigs_link ON gigs (link);
+-- Indexes for gigs table (created on every partition)
 CREATE INDEX IF NOT EXISTS idx_gigs_published_at ON gigs (published_at DESC);
-CREATE INDEX IF NOT EXISTS idx_gigs_category ON gigs (category);
+-- Notifier and recommendations: category IN (...) AND published_at >= window, newest first;
+-- the notifier's candidate join reads only this index (also serves category-only lookups)
+CREATE INDEX IF NOT EXISTS idx_gigs_category_published_at ON gigs (category, published_at DESC) INCLUDE (id);
+CREATE INDEX IF NOT EXISTS idx_gigs_search_vector ON gigs USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_gigs_skills ON gigs USING GIN (skills); -- skills @> ARRAY[...] containment
 
 -- Users Table
 CREATE TABLE IF NOT EXISTS users (
@@ -39,14 +103,104 @@ CREATE TABLE IF NOT EXISTS user_preferences (
 CREATE INDEX IF NOT EXISTS idx_user_preferences_user_id ON user_preferences (user_id);
 CREATE INDEX IF NOT EXISTS idx_user_preferences_category_name ON user_preferences (category_name);
 
--- Table to track sent notifications (to prevent sending duplicates)
-CREATE TABLE IF NOT EXISTS sent_notifications (
+-- Skill/keyword alert terms per user, stored normalized (lower-case tokens, see etl/keyword_matcher.py)
+CREATE TABLE IF NOT EXISTS user_keyword_subscriptions (
     id SERIAL PRIMARY KEY,
     user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
-    gig_id INTEGER NOT NULL REFERENCES gigs(id) ON DELETE CASCADE,
-    sent_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-    UNIQUE(user_id, gig_id) -- A user gets one notification per gig
+    term VARCHAR(100) NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(user_id, term)
+);
+
+-- (gig, user) pairs found by the ETL keyword matcher when the gig was loaded
+CREATE TABLE IF NOT EXISTS gig_keyword_matches (
+    gig_id INTEGER NOT NULL, -- No foreign key into the partitioned gigs; removed when the gig's partition is archived
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    PRIMARY KEY (gig_id, user_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_gig_keyword_matches_user_id ON gig_keyword_matches (user_id);
+
+-- Table to track sent notifications (to prevent sending duplicates), range-partitioned by month of sent_at.
+-- One notification per (user, gig) is enforced by the notifier (see notification/outbox.py), since a
+-- unique constraint would have to include sent_at.
+CREATE TABLE IF NOT EXISTS sent_notifications (
+    id SERIAL,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    gig_id INTEGER NOT NULL, -- No foreign key into the partitioned gigs
+    sent_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, sent_at)
+) PARTITION BY RANGE (sent_at);
+
+-- (gig, user) lookups: the notifier's per-batch check and the outbox's duplicate check
+CREATE INDEX IF NOT EXISTS idx_sent_notifications_gig_user ON sent_notifications (gig_id, user_id);
+-- The notifier sweep's anti-join reads only the pairs sent since its window (minus SENT_AT_SKEW_MARGIN)
+CREATE INDEX IF NOT EXISTS idx_sent_notifications_sent_at ON sent_notifications (sent_at);
+
+-- Partitions for the current and the next three months; etl/partition_maintenance.py keeps creating them ahead
+SELECT ensure_monthly_partition(parent, month::date)
+FROM unnest(ARRAY['gigs', 'sent_notifications']) AS parent,
+     generate_series(date_trunc('month', now() AT TIME ZONE 'UTC'),
+                     date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months',
+                     interval '1 month') AS month;
+
+-- Progress markers for resumable ETL maintenance jobs (e.g. etl/recategorize_gigs.py)
+CREATE TABLE IF NOT EXISTS etl_job_progress (
+    job_name VARCHAR(100) PRIMARY KEY,
+    last_id INTEGER NOT NULL,
+    rows_scanned BIGINT NOT NULL DEFAULT 0,
+    rows_updated BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- HTTP validators per RSS feed, used for conditional GET (ETag / Last-Modified)
+CREATE TABLE IF NOT EXISTS feed_state (
+    feed_url TEXT PRIMARY KEY,
+    etag TEXT,
+    modified TEXT,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Outbox of rendered notification emails, claimed by delivery workers with FOR UPDATE SKIP LOCKED
+CREATE TABLE IF NOT EXISTS notification_outbox (
+    id BIGSERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    recipient_email VARCHAR(255) NOT NULL,
+    subject VARCHAR(255) NOT NULL,
+    body_html TEXT NOT NULL,
+    gig_ids INTEGER[] NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending', -- pending, sending, delivered or failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_at TIMESTAMP WITH TIME ZONE,
+    last_error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    delivered_at TIMESTAMP WITH TIME ZONE
+);
+
+-- Only undelivered messages are scanned by workers and by the pending-notification query
+CREATE INDEX IF NOT EXISTS idx_notification_outbox_due ON notification_outbox (next_attempt_at, id)
+    WHERE status IN ('pending', 'sending');
+CREATE INDEX IF NOT EXISTS idx_notification_outbox_user_active ON notification_outbox (user_id)
+    WHERE status IN ('pending', 'sending');
+
+-- Generation counter of the API response cache; bumped by the ETL after loading new gigs
+CREATE TABLE IF NOT EXISTS cache_generations (
+    name VARCHAR(50) PRIMARY KEY,
+    generation BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Hourly gig counts and budget totals per category and platform, maintained by the ETL loader
+-- (missing category/platform are stored as '', a missing published_at as '-infinity')
+CREATE TABLE IF NOT EXISTS gig_category_hourly (
+    category VARCHAR(100) NOT NULL,
+    hour_bucket TIMESTAMP WITH TIME ZONE NOT NULL,
+    source_platform VARCHAR(50) NOT NULL,
+    gig_count BIGINT NOT NULL DEFAULT 0,
+    budget_sum DECIMAL(18, 2) NOT NULL DEFAULT 0,
+    budget_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (category, hour_bucket, source_platform)
 );
 
-CREATE INDEX IF NOT EXISTS idx_sent_notifications_user_gig ON sent_notifications (user_id, gig_id);
-CREATE INDEX IF NOT EXISTS idx_sent_notifications_gig_id ON sent_notifications (gig_id);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_gig_category_hourly_hour ON gig_category_hourly (hour_bucket);
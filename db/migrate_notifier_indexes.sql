@@ -0,0 +1,25 @@
+-- Replaces the single-column gigs/sent_notifications indexes with the composite ones in init_db.sql.
+--
+--   psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f db/migrate_notifier_indexes.sql
+--   python -m app.query_plans   (on a development database: checks the hot queries use index scans)
+--
+-- Safe to re-run. Databases partitioned with migrate_partition_gigs.sql after this change already
+-- have these indexes. Building them blocks writes to gigs and sent_notifications, so run it while
+-- the orchestrator is stopped or between ETL runs.
+
+BEGIN;
+
+-- category IN (...) AND published_at >= window ORDER BY published_at DESC; also covers the
+-- category-only lookups idx_gigs_category served
+CREATE INDEX IF NOT EXISTS idx_gigs_category_published_at ON gigs (category, published_at DESC) INCLUDE (id);
+DROP INDEX IF EXISTS idx_gigs_category;
+
+-- One (gig_id, user_id) index serves the pair lookups of the notifier and the outbox as well as the
+-- gig_id lookups, so both older indexes go; the sweep's anti-join reads a sent_at range instead of
+-- scanning the whole monthly partition
+CREATE INDEX IF NOT EXISTS idx_sent_notifications_gig_user ON sent_notifications (gig_id, user_id);
+CREATE INDEX IF NOT EXISTS idx_sent_notifications_sent_at ON sent_notifications (sent_at);
+DROP INDEX IF EXISTS idx_sent_notifications_user_gig;
+DROP INDEX IF EXISTS idx_sent_notifications_gig_id;
+
+COMMIT;
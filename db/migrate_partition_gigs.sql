@@ -0,0 +1,116 @@
+-- One-off migration of a database created before 'gigs' and 'sent_notifications' were partitioned.
+--
+--   1. Stop the orchestrator (ETL and notifications).
+--   2. Apply the current db/init_db.sql (adds the search column, ensure_monthly_partition and gig_links;
+--      safe to re-run).
+--   3. psql "$DATABASE_URL" -v ON_ERROR_STOP=1 -f db/migrate_partition_gigs.sql
+--   4. python -m etl.partition_maintenance   (partitions ahead of time, retention policy)
+--
+-- Runs in one transaction and fails without changes if 'gigs' is already partitioned.
+-- Gigs without a published date get their created_at as partition key; the hourly category
+-- rollup is rebuilt accordingly.
+
+BEGIN;
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'gigs'::regclass) THEN
+        RAISE EXCEPTION 'gigs is already partitioned; nothing to migrate.';
+    END IF;
+END;
+$$;
+
+LOCK TABLE gigs, sent_notifications IN ACCESS EXCLUSIVE MODE;
+
+-- New partitioned tables, swapped in under the old names below
+CREATE TABLE gigs_partitioned (
+    id SERIAL,
+    title VARCHAR(512) NOT NULL,
+    link TEXT NOT NULL,
+    description TEXT,
+    published_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    category VARCHAR(100),
+    budget_amount DECIMAL(10, 2),
+    budget_currency VARCHAR(10),
+    skills TEXT[],
+    source_platform VARCHAR(50),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    search_vector tsvector GENERATED ALWAYS AS (gig_search_document(title, description, skills)) STORED,
+    CONSTRAINT gigs_partitioned_pkey PRIMARY KEY (id, published_at)
+) PARTITION BY RANGE (published_at);
+
+CREATE TABLE sent_notifications_partitioned (
+    id SERIAL,
+    user_id INTEGER NOT NULL CONSTRAINT sent_notifications_user_id_fkey REFERENCES users(id) ON DELETE CASCADE,
+    gig_id INTEGER NOT NULL,
+    sent_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT sent_notifications_partitioned_pkey PRIMARY KEY (id, sent_at)
+) PARTITION BY RANGE (sent_at);
+
+-- One partition per month that holds data, plus the current and the next three months
+SELECT ensure_monthly_partition('gigs_partitioned', month::date, 'gigs')
+FROM (
+    SELECT DISTINCT date_trunc('month', COALESCE(published_at, created_at, now()) AT TIME ZONE 'UTC') AS month FROM gigs
+    UNION
+    SELECT generate_series(date_trunc('month', now() AT TIME ZONE 'UTC'),
+                           date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months', interval '1 month')
+) AS months;
+
+SELECT ensure_monthly_partition('sent_notifications_partitioned', month::date, 'sent_notifications')
+FROM (
+    SELECT DISTINCT date_trunc('month', COALESCE(sent_at, now()) AT TIME ZONE 'UTC') AS month FROM sent_notifications
+    UNION
+    SELECT generate_series(date_trunc('month', now() AT TIME ZONE 'UTC'),
+                           date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months', interval '1 month')
+) AS months;
+
+INSERT INTO gigs_partitioned (id, title, link, description, published_at, category,
+                              budget_amount, budget_currency, skills, source_platform, created_at)
+SELECT id, title, link, description, COALESCE(published_at, created_at, now()), category,
+       budget_amount, budget_currency, skills, source_platform, created_at
+FROM gigs;
+
+INSERT INTO gig_links (link, first_seen_at)
+SELECT link, created_at FROM gigs
+ON CONFLICT (link) DO NOTHING;
+
+INSERT INTO sent_notifications_partitioned (id, user_id, gig_id, sent_at)
+SELECT id, user_id, gig_id, COALESCE(sent_at, now()) FROM sent_notifications;
+
+-- CASCADE only drops the foreign keys of sent_notifications and gig_keyword_matches into gigs
+DROP TABLE sent_notifications;
+DROP TABLE gigs CASCADE;
+
+ALTER TABLE gigs_partitioned RENAME TO gigs;
+ALTER TABLE gigs RENAME CONSTRAINT gigs_partitioned_pkey TO gigs_pkey;
+ALTER SEQUENCE gigs_partitioned_id_seq RENAME TO gigs_id_seq;
+SELECT setval('gigs_id_seq', COALESCE((SELECT max(id) FROM gigs), 0) + 1, false);
+
+ALTER TABLE sent_notifications_partitioned RENAME TO sent_notifications;
+ALTER TABLE sent_notifications RENAME CONSTRAINT sent_notifications_partitioned_pkey TO sent_notifications_pkey;
+ALTER SEQUENCE sent_notifications_partitioned_id_seq RENAME TO sent_notifications_id_seq;
+SELECT setval('sent_notifications_id_seq', COALESCE((SELECT max(id) FROM sent_notifications), 0) + 1, false);
+
+CREATE INDEX idx_gigs_published_at ON gigs (published_at DESC);
+CREATE INDEX idx_gigs_category_published_at ON gigs (category, published_at DESC) INCLUDE (id);
+CREATE INDEX idx_gigs_search_vector ON gigs USING GIN (search_vector);
+CREATE INDEX idx_gigs_skills ON gigs USING GIN (skills);
+CREATE INDEX idx_sent_notifications_gig_user ON sent_notifications (gig_id, user_id);
+CREATE INDEX idx_sent_notifications_sent_at ON sent_notifications (sent_at);
+
+-- Gigs that had no published date moved out of the '-infinity' bucket
+DELETE FROM gig_category_hourly;
+INSERT INTO gig_category_hourly (category, hour_bucket, source_platform, gig_count, budget_sum, budget_count)
+SELECT COALESCE(category, ''),
+       date_trunc('hour', published_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',  -- UTC hours, as etl/category_rollup.py
+       COALESCE(source_platform, ''),
+       COUNT(*),
+       COALESCE(SUM(budget_amount), 0),
+       COUNT(budget_amount)
+FROM gigs
+GROUP BY 1, 2, 3;
+
+COMMIT;
+
+ANALYZE gigs;
+ANALYZE sent_notifications;
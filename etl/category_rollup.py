@@ -0,0 +1,131 @@
+"""
+Hourly rollup of gig counts and budget totals per (category, hour bucket,
+source_platform) in 'gig_category_hourly', read by the analytics endpoints
+instead of aggregating raw 'gigs' rows on every request.
+
+The loader applies each batch of newly inserted gigs in its own transaction
+(add_gigs_to_rollup), and the re-categorization job moves changed gigs
+between categories (remove_gigs_from_rollup before the update,
+add_gigs_to_rollup after). Gigs without a category or platform are
+counted under '', and gigs without a published date under the
+'-infinity' bucket, so every row lands in exactly one bucket.
+
+Usage (backfill / repair):
+    python -m etl.category_rollup --rebuild
+"""
+import argparse
+import sys
+
+from utils.db_utils import get_db_connection, close_db_connection, close_db_pool
+
+# Whole UTC hour of published_at, independent of the session's TimeZone (the
+# endpoints split their windows at UTC hours, see app.routes._category_count_queries)
+HOUR_BUCKET_SQL = "date_trunc('hour', published_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'"
+
+# Aggregates of the given gigs per rollup key; %(ids)s is a list of gig ids
+_BATCH_AGGREGATE_SQL = f"""
+    SELECT COALESCE(category, '') AS category,
+           COALESCE({HOUR_BUCKET_SQL}, '-infinity') AS hour_bucket,
+           COALESCE(source_platform, '') AS source_platform,
+           COUNT(*) AS gig_count,
+           COALESCE(SUM(budget_amount), 0) AS budget_sum,
+           COUNT(budget_amount) AS budget_count
+    FROM gigs
+    WHERE id = ANY(%(ids)s)
+    GROUP BY 1, 2, 3
+"""
+
+ADD_GIGS_SQL = f"""
+    INSERT INTO gig_category_hourly (category, hour_bucket, source_platform, gig_count, budget_sum, budget_count)
+    {_BATCH_AGGREGATE_SQL}
+    ON CONFLICT (category, hour_bucket, source_platform) DO UPDATE
+    SET gig_count = gig_category_hourly.gig_count + EXCLUDED.gig_count,
+        budget_sum = gig_category_hourly.budget_sum + EXCLUDED.budget_sum,
+        budget_count = gig_category_hourly.budget_count + EXCLUDED.budget_count;
+"""
+
+REMOVE_GIGS_SQL = f"""
+    UPDATE gig_category_hourly AS r
+    SET gig_count = r.gig_count - d.gig_count,
+        budget_sum = r.budget_sum - d.budget_sum,
+        budget_count = r.budget_count - d.budget_count
+    FROM ({_BATCH_AGGREGATE_SQL}) AS d
+    WHERE r.category = d.category
+      AND r.hour_bucket = d.hour_bucket
+      AND r.source_platform = d.source_platform;
+"""
+
+DELETE_EMPTY_BUCKETS_SQL = "DELETE FROM gig_category_hourly WHERE gig_count <= 0;"
+
+REBUILD_SQL = f"""
+    INSERT INTO gig_category_hourly (category, hour_bucket, source_platform, gig_count, budget_sum, budget_count)
+    SELECT COALESCE(category, ''),
+           COALESCE({HOUR_BUCKET_SQL}, '-infinity'),
+           COALESCE(source_platform, ''),
+           COUNT(*),
+           COALESCE(SUM(budget_amount), 0),
+           COUNT(budget_amount)
+    FROM gigs
+    GROUP BY 1, 2, 3;
+"""
+
+
+def add_gigs_to_rollup(cursor, gig_ids):
+    """Adds already-inserted gigs to the rollup. Runs in the caller's transaction."""
+    if gig_ids:
+        cursor.execute(ADD_GIGS_SQL, {"ids": list(gig_ids)})
+
+
+def remove_gigs_from_rollup(cursor, gig_ids):
+    """
+    Subtracts gigs from the rollup, e.g. before they are re-categorized or
+    deleted. Runs in the caller's transaction, while the rows still exist.
+    """
+    if gig_ids:
+        cursor.execute(REMOVE_GIGS_SQL, {"ids": list(gig_ids)})
+        cursor.execute(DELETE_EMPTY_BUCKETS_SQL)
+
+
+def rebuild_category_rollup(conn):
+    """
+    Recomputes the whole rollup from 'gigs' in one transaction. The table
+    lock keeps concurrent loads from adding to it halfway through.
+    Returns the number of rollup rows.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute("LOCK TABLE gig_category_hourly IN EXCLUSIVE MODE;")
+        cursor.execute("DELETE FROM gig_category_hourly;")
+        cursor.execute(REBUILD_SQL)
+        rows = cursor.rowcount
+    conn.commit()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain the hourly gig category rollup.")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Recompute the rollup from all stored gigs.")
+    args = parser.parse_args(argv)
+    if not args.rebuild:
+        parser.print_help()
+        return 0
+
+    conn = get_db_connection()
+    if not conn:
+        print("Failed to get database connection. Aborting rollup rebuild.")
+        return 1
+    try:
+        rows = rebuild_category_rollup(conn)
+        print(f"Category rollup rebuilt: {rows} (category, hour, platform) rows.")
+        return 0
+    except Exception as e:
+        conn.rollback()
+        print(f"Category rollup rebuild failed: {e}")
+        return 1
+    finally:
+        close_db_connection(conn)
+        close_db_pool()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+import asyncio
+import time
+from urllib.parse import urlparse
+
+import aiohttp
+import feedparser
+
+from etl.extract.feed_registry import get_adapter
+
+DEFAULT_MAX_CONCURRENCY = 10
+DEFAULT_PER_HOST_CONCURRENCY = 2
+DEFAULT_PER_HOST_INTERVAL_SECONDS = 1.0
+DEFAULT_TIMEOUT_SECONDS = 30
+
+
+class _HostLimiter:
+    """
+    Bounds concurrent requests to one host and spaces request starts at
+    least `min_interval` seconds apart.
+    """
+
+    def __init__(self, max_concurrency, min_interval):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.min_interval = min_interval
+        self._lock = asyncio.Lock()
+        self._last_start = 0.0
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        async with self._lock:
+            wait = self._last_start + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_start = time.monotonic()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.semaphore.release()
+
+
+async def _fetch_feed(session, feed, feed_state, semaphore, host_limiter):
+    """
+    Performs a conditional GET for one feed. Never raises: failures are
+    reported in the returned result's 'error' so other feeds are unaffected.
+    """
+    result = {"feed": feed, "status": None, "etag": None, "modified": None, "body": None, "error": None}
+    etag, modified = feed_state or (None, None)
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if modified:
+        headers["If-Modified-Since"] = modified
+
+    try:
+        async with host_limiter, semaphore:
+            async with session.get(feed["url"], headers=headers) as response:
+                result["status"] = response.status
+                result["etag"] = response.headers.get("ETag")
+                result["modified"] = response.headers.get("Last-Modified")
+                if response.status == 200:
+                    result["body"] = await response.read()
+                elif response.status != 304:
+                    result["error"] = f"HTTP {response.status}"
+    except asyncio.TimeoutError:
+        result["error"] = "timed out"
+    except aiohttp.ClientError as e:
+        result["error"] = str(e) or e.__class__.__name__
+    except Exception as e:
+        # Anything else (a malformed URL, a decoding error...) fails this feed only
+        result["error"] = f"{e.__class__.__name__}: {e}"
+    return result
+
+
+async def fetch_feeds(feeds, feed_states=None, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                      per_host_concurrency=DEFAULT_PER_HOST_CONCURRENCY,
+                      per_host_interval=DEFAULT_PER_HOST_INTERVAL_SECONDS,
+                      timeout=DEFAULT_TIMEOUT_SECONDS):
+    """
+    Fetches all feeds concurrently with a global concurrency bound, a
+    per-host limiter and a per-request timeout.
+    `feed_states` maps feed URL to its stored (etag, modified) validators.
+    Returns one result dictionary per feed, in input order.
+    """
+    feed_states = feed_states or {}
+    semaphore = asyncio.Semaphore(max_concurrency)
+    host_limiters = {}
+    for feed in feeds:
+        host = urlparse(feed["url"]).netloc
+        if host not in host_limiters:
+            host_limiters[host] = _HostLimiter(per_host_concurrency, per_host_interval)
+
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    async with aiohttp.ClientSession(timeout=client_timeout) as session:
+        return await asyncio.gather(*(
+            _fetch_feed(session, feed, feed_states.get(feed["url"]), semaphore,
+                        host_limiters[urlparse(feed["url"]).netloc])
+            for feed in feeds
+        ))
+
+
+def iter_feed_result(result, seen_gigs=None):
+    """
+    Parses a fetched feed body and routes its entries through the feed's
+    source adapter, yielding raw gig dictionaries.
+    """
+    feed = result["feed"]
+    if not result["body"]:
+        return
+
+    parsed = feedparser.parse(result["body"])
+    if not parsed.entries:
+        print(f"No entries found in feed {feed['name']}.")
+        return
+
+    print(f"Extracting gigs from feed {feed['name']}...")
+    adapter = get_adapter(feed)
+    yield from adapter(parsed.entries, seen_gigs=seen_gigs, source_platform=feed["source_platform"])
+
+
+def iter_feed_gigs(results, seen_gigs=None):
+    """
+    Yields raw gigs from every successfully fetched, changed feed in `results`,
+    parsing one feed at a time.
+    """
+    for result in results:
+        if result["status"] == 200 and not result["error"]:
+            yield from iter_feed_result(result, seen_gigs=seen_gigs)
+
+
+def fetch_all_feeds(feeds, feed_states=None, **fetch_options):
+    """
+    Synchronous entry point for fetch_feeds. Logs unchanged and failed feeds
+    and returns every feed's fetch result.
+    """
+    results = asyncio.run(fetch_feeds(feeds, feed_states, **fetch_options))
+    for result in results:
+        name = result["feed"]["name"]
+        if result["error"]:
+            print(f"Failed to fetch feed {name}: {result['error']}")
+        elif result["status"] == 304:
+            print(f"Feed {name} not modified since last fetch (HTTP 304).")
+    return results
+
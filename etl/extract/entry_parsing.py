@@ -0,0 +1,99 @@
+"""
+Field parsing shared by the feed source adapters: budget amounts and
+currencies from an entry's summary, and published dates that feedparser
+could not parse itself.
+
+Patterns are compiled once at import, currency symbols are resolved through
+a lookup table, and a PublishedDateParser remembers the date format that
+last matched, so entries of the same feed are parsed with a single strptime
+call instead of trying every format in turn.
+"""
+import re
+from datetime import datetime
+
+# Currency of a budget written with a symbol and without an explicit code
+CURRENCY_SYMBOLS = {
+    '$': 'USD',
+    '€': 'EUR',
+    '£': 'GBP',
+    '¥': 'JPY',
+    '₹': 'INR',
+}
+CURRENCY_CODES = ('USD', 'CAD', 'INR', 'AUD', 'NZD', 'EUR', 'GBP', 'HKD', 'JPY')
+UNKNOWN_CURRENCY = 'UNKNOWN'  # A budget amount without symbol or code
+
+# Formats of the 'published' string, most common first
+PUBLISHED_DATE_FORMATS = (
+    '%Y-%m-%d %H:%M:%S',
+    '%a, %d %b %Y %H:%M:%S %z',
+    '%a, %d %b %Y %H:%M:%S %Z',
+)
+
+_SYMBOL_CLASS = '[' + ''.join(re.escape(symbol) for symbol in CURRENCY_SYMBOLS) + ']'
+
+# "Budget: $30 - $250 USD", "Budget: €1,500", "Budget: 2000 INR", ...
+_BUDGET_PATTERN = re.compile(
+    rf"Budget:\s*(?:({_SYMBOL_CLASS})\s*)?([\d,\.]+)"
+    rf"(?:\s*-\s*(?:{_SYMBOL_CLASS})?\s*([\d,\.]+))?"
+    rf"\s*({'|'.join(CURRENCY_CODES)})?",
+    re.IGNORECASE
+)
+
+
+def parse_amount_range(start, end=None):
+    """
+    Numeric value of a budget written as "1,500" or as a range "30 - 250"
+    (the midpoint). Raises ValueError for malformed numbers such as "1.2.3".
+    """
+    amount = float(start.replace(',', ''))
+    if end:
+        amount = (amount + float(end.replace(',', ''))) / 2
+    return amount
+
+
+def parse_budget(summary_text):
+    """
+    Extracts (amount, currency) from the "Budget: ..." part of an entry's
+    summary. An explicit code wins over a symbol; an amount with neither has
+    currency UNKNOWN_CURRENCY. Returns (None, None) without a parsable budget.
+    """
+    match = _BUDGET_PATTERN.search(summary_text)
+    if not match:
+        return None, None
+
+    symbol, start, end, code = match.groups()
+    try:
+        amount = parse_amount_range(start, end)
+    except ValueError:
+        print(f"Warning: Could not parse budget numbers from summary: {summary_text}")
+        return None, None
+
+    if code:
+        return amount, code.upper()
+    if symbol:
+        return amount, CURRENCY_SYMBOLS[symbol]
+    return amount, UNKNOWN_CURRENCY
+
+
+class PublishedDateParser:
+    """
+    Parses 'published' strings with PUBLISHED_DATE_FORMATS, trying the
+    format that matched last first. Use one instance per feed: a feed
+    writes all its dates the same way, so after its first entry each date
+    costs one strptime call.
+    """
+
+    def __init__(self, formats=PUBLISHED_DATE_FORMATS):
+        self._formats = list(formats)
+
+    def parse(self, text):
+        """Returns the parsed datetime, or None if no format matches."""
+        for index, date_format in enumerate(self._formats):
+            try:
+                published = datetime.strptime(text, date_format)
+            except ValueError:
+                continue
+            if index:
+                self._formats.insert(0, self._formats.pop(index))  # Remember the feed's format
+            return published
+        return None
@@ -0,0 +1,54 @@
+import json
+import os
+
+from etl.extract.freelancer_extractor import iter_freelancer_entries
+
+# Source adapters: lazily yield raw gig dictionaries from a parsed feed's entries.
+# Each takes (entries, seen_gigs=None, source_platform=...) like iter_freelancer_entries.
+ADAPTERS = {
+    "freelancer": iter_freelancer_entries,
+}
+
+# Feeds ingested on every ETL run. Each entry has:
+# - name (unique label used in logs)
+# - url (RSS/Atom feed URL)
+# - adapter (key into ADAPTERS)
+# - source_platform (stored on every gig from this feed)
+FEEDS = [
+    {
+        "name": "freelancer-all",
+        "url": "https://www.freelancer.com/rss.xml",
+        "adapter": "freelancer",
+        "source_platform": "Freelancer",
+    },
+]
+
+# Optional JSON file with additional feeds in the same shape as FEEDS
+FEED_REGISTRY_PATH = os.getenv("FEED_REGISTRY_PATH")
+
+
+def get_feeds():
+    """
+    Returns the feeds to ingest: the built-in FEEDS plus any listed in the
+    JSON file at FEED_REGISTRY_PATH. Feeds with an unknown adapter are skipped.
+    """
+    feeds = list(FEEDS)
+    if FEED_REGISTRY_PATH:
+        try:
+            with open(FEED_REGISTRY_PATH, 'r', encoding='utf-8') as f:
+                feeds.extend(json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"Error loading feed registry {FEED_REGISTRY_PATH}: {e}")
+
+    valid_feeds = []
+    for feed in feeds:
+        if feed.get("adapter") not in ADAPTERS:
+            print(f"Skipping feed {feed.get('name')}: unknown adapter '{feed.get('adapter')}'.")
+            continue
+        valid_feeds.append(feed)
+    return valid_feeds
+
+
+def get_adapter(feed):
+    """Returns the source adapter function for a registry entry."""
+    return ADAPTERS[feed["adapter"]]
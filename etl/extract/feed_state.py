@@ -0,0 +1,46 @@
+def load_feed_states(conn, feed_urls):
+    """
+    Returns a dict mapping each stored feed URL in `feed_urls` to its
+    (etag, modified) validators, fetched in a single query.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "SELECT feed_url, etag, modified FROM feed_state WHERE feed_url = ANY(%s);",
+            (list(feed_urls),)
+        )
+        rows = cursor.fetchall()
+        conn.commit()
+        return {feed_url: (etag, modified) for feed_url, etag, modified in rows}
+    except Exception as e:
+        conn.rollback()
+        print(f"Error loading feed states: {e}")
+        return {}
+    finally:
+        cursor.close()
+
+
+def save_feed_state(conn, feed_url, etag, modified):
+    """
+    Stores the ETag and Last-Modified validators returned with a feed so the
+    next fetch can be a conditional GET.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """
+            INSERT INTO feed_state (feed_url, etag, modified, updated_at)
+            VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
+            ON CONFLICT (feed_url) DO UPDATE
+            SET etag = EXCLUDED.etag,
+                modified = EXCLUDED.modified,
+                updated_at = EXCLUDED.updated_at;
+            """,
+            (feed_url, etag, modified)
+        )
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"Error saving feed state for {feed_url}: {e}")
+    finally:
+        cursor.close()
@@ -1,7 +1,9 @@
-import feedparser
-import re
 from datetime import datetime
 
+from etl.extract.entry_parsing import PublishedDateParser, parse_budget
+
+SOURCE_PLATFORM = "Freelancer"
+
 
 def _extract_skills_from_entry(entry_tags):
     """
@@ -13,70 +15,14 @@ def _extract_skills_from_entry(entry_tags):
     return []
 
 
-def _parse_budget_from_summary(summary_text):
-    """
-    Extracts budget amount and currency from the 'summary' field
-    of a Freelancer.com RSS entry.
-    """
-    amount = None
-    currency = None
-
-    match = re.search(
-        r"Budget:\s*(?:([\$€£¥₹])\s*)?([\d,\.]+)(?:\s*-\s*(?:[\$€£¥₹])?\s*([\d,\.]+))?\s*(USD|CAD|INR|AUD|NZD|EUR|GBP|HKD|JPY)?",
-        summary_text,
-        re.IGNORECASE
-    )
-
-    if match:
-        try:
-            budget_start_str = match.group(2).replace(',', '')
-            budget_start = float(budget_start_str)
-
-            if match.group(3):
-                budget_end_str = match.group(3).replace(',', '')
-                budget_end = float(budget_end_str)
-                amount = (budget_start + budget_end) / 2
-            else:
-                amount = budget_start
-
-            if match.group(4):
-                currency = match.group(4).upper()
-            elif match.group(1):  # Fallback to symbol
-                symbol = match.group(1)
-                if symbol == '$':
-                    currency = 'USD'
-                elif symbol == '€':
-                    currency = 'EUR'
-                elif symbol == '£':
-                    currency = 'GBP'
-                elif symbol == '¥':
-                    currency = 'JPY'
-                elif symbol == '₹':
-                    currency = 'INR'
-            else:
-                currency = 'UNKNOWN'  # Or set to None if you prefer no currency
-        except ValueError:
-            print(f"Warning: Could not parse budget numbers from summary: {summary_text}")
-            amount = None
-            currency = None
-
-    return amount, currency
-
-
-def extract_freelancer_gigs(feed_url):
+def iter_freelancer_entries(entries, seen_gigs=None, source_platform=SOURCE_PLATFORM):
     """
-    Fetches and parses gig data from a Freelancer.com RSS feed.
-    Returns a list of dictionaries with extracted raw data.
+    Source adapter for Freelancer.com: lazily turns parsed feed entries into
+    raw gig dictionaries tagged with `source_platform`.
     """
-    print(f"Extracting gigs from {feed_url}...")
-    feed = feedparser.parse(feed_url)
-
-    if not feed.entries:
-        print(f"No entries found in feed {feed_url}.")
-        return []
-
-    extracted_gigs = []
-    for i, entry in enumerate(feed.entries):
+    skipped_count = 0
+    date_parser = PublishedDateParser()  # Learns the feed's date format from its first dated entry
+    for i, entry in enumerate(entries):
         title = entry.get('title')
         link = entry.get('link')
         description = entry.get('summary') or entry.get('description') or entry.get('content', [{}])[0].get('value')
@@ -85,22 +31,16 @@ def extract_freelancer_gigs(feed_url):
         if hasattr(entry, 'published_parsed') and entry.published_parsed:
             published = datetime(*entry.published_parsed[:6])
         elif hasattr(entry, 'published'):
-            try:
-                published = datetime.strptime(entry.published, '%Y-%m-%d %H:%M:%S')
-            except ValueError:
-                try:
-                    published = datetime.strptime(entry.published, '%a, %d %b %Y %H:%M:%S %z')
-                except ValueError:
-                    try:
-                        published = datetime.strptime(entry.published, '%a, %d %b %Y %H:%M:%S %Z')
-                    except ValueError:
-                        # print(f"Warning: Could not parse date string for '{title}': {entry.published}")
-                        published = None
+            published = date_parser.parse(entry.published)
+
+        if seen_gigs is not None and seen_gigs.is_stored(source_platform, link, published):
+            skipped_count += 1
+            continue
 
         skills = _extract_skills_from_entry(entry.get('tags'))
-        budget_amount, budget_currency = _parse_budget_from_summary(description or "")
+        budget_amount, budget_currency = parse_budget(description or "")
 
-        extracted_gigs.append({
+        yield {
             "title": title,
             "link": link,
             "description": description,
@@ -108,8 +48,8 @@ def extract_freelancer_gigs(feed_url):
             "budget_amount": budget_amount,
             "budget_currency": budget_currency,
             "skills": skills,
-            "source_platform": "Freelancer",  # Hardcoded for now
-        })
+            "source_platform": source_platform,
+        }
 
-    print(f"Extracted {len(extracted_gigs)} gigs.")
-    return extracted_gigs
\ No newline at end of file
+    if skipped_count:
+        print(f"Skipped {skipped_count} entries already stored in the database.")
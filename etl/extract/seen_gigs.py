@@ -0,0 +1,99 @@
+from collections import OrderedDict
+from datetime import timezone, timedelta
+
+DEFAULT_WINDOW_HOURS = 48
+DEFAULT_MAX_LINKS = 50000
+
+
+def _to_naive_utc(value):
+    """
+    Normalizes a datetime to naive UTC, the form produced by the extractor
+    from feedparser's published_parsed.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class SeenGigs:
+    """
+    Remembers which gigs are already stored so the extractor can drop them
+    before they are parsed and categorized.
+
+    Keeps, per source platform, a high-water mark on published_at, plus a
+    bounded, insertion-ordered set of recently stored links. An entry is
+    treated as already stored if its link is in the recent set, or if it was
+    published more than `window` before its source's high-water mark (older
+    than anything the feed is expected to still carry).
+    """
+
+    def __init__(self, window_hours=DEFAULT_WINDOW_HOURS, max_links=DEFAULT_MAX_LINKS):
+        self.window = timedelta(hours=window_hours)
+        self.max_links = max_links
+        self.high_water_marks = {}
+        self._links = OrderedDict()
+
+    def seed_from_db(self, conn):
+        """
+        Loads the links and high-water marks of the newest `max_links` gigs
+        stored within the window. Returns the number of links loaded.
+        """
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """
+                SELECT link, published_at, source_platform
+                FROM gigs
+                WHERE published_at >= NOW() - %s
+                ORDER BY published_at DESC
+                LIMIT %s;
+                """,
+                (self.window, self.max_links)
+            )
+            rows = cursor.fetchall()
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            print(f"Error seeding seen gigs from database: {e}")
+            return 0
+        finally:
+            cursor.close()
+
+        # Oldest first, so the newest links are the last to be evicted
+        self.mark_stored(
+            {"link": link, "published_at": published_at, "source_platform": source_platform}
+            for link, published_at, source_platform in reversed(rows)
+        )
+        print(f"Seeded {len(rows)} recently stored gig links.")
+        return len(rows)
+
+    def is_stored(self, source_platform, link, published_at):
+        """Returns True if the entry is known (or assumed) to be in the 'gigs' table already."""
+        if link in self._links:
+            return True
+        high_water_mark = self.high_water_marks.get(source_platform)
+        published_at = _to_naive_utc(published_at)
+        if high_water_mark is None or published_at is None:
+            return False
+        return published_at < high_water_mark - self.window
+
+    def mark_stored(self, gigs):
+        """Records gigs that are now in the database, evicting the oldest links beyond max_links."""
+        for gig in gigs:
+            link = gig.get("link")
+            if link:
+                self._links[link] = None
+                self._links.move_to_end(link)
+
+            published_at = _to_naive_utc(gig.get("published_at"))
+            source_platform = gig.get("source_platform")
+            if published_at is not None:
+                current = self.high_water_marks.get(source_platform)
+                if current is None or published_at > current:
+                    self.high_water_marks[source_platform] = published_at
+
+        while len(self._links) > self.max_links:
+            self._links.popitem(last=False)
+
+    def __len__(self):
+        return len(self._links)
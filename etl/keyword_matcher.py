@@ -0,0 +1,147 @@
+"""
+Ingest-time matching of new gigs against users' skill and keyword
+subscriptions ('user_keyword_subscriptions'). The loader tags every batch of
+newly inserted gigs with the users whose terms they contain, in
+'gig_keyword_matches', and the notifier reads those pairs alongside the
+category preferences.
+
+All subscribed terms are compiled into one KeywordMatcher: a hash table from
+a term's token sequence to the sorted ids of its subscribers. A gig's title,
+skills and description are tokenized once and every token n-gram up to the
+longest term is looked up, so matching a gig costs time proportional to its
+text length, independent of how many terms or subscribers exist. Terms and
+gig text go through the same tokenizer, so "Node.js" matches "node.js",
+"react native" matches "React-Native", and "c++", "c#" and "asp.net" stay
+single tokens.
+
+The loader re-reads a generation number ('keyword_subscriptions' in
+cache_generations, bumped by the subscriptions API) on every load and only
+recompiles the matcher when it changed.
+"""
+import re
+import threading
+from array import array
+from collections import defaultdict
+
+from psycopg2 import extras  # For execute_values
+
+KEYWORD_MATCHER_GENERATION = "keyword_subscriptions"  # cache_generations row bumped on every subscription change
+MAX_TERM_TOKENS = 4  # Longer terms are rejected by normalize_term
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9+#]+(?:\.[a-z0-9+#]+)*")
+
+_ACTIVE_SUBSCRIPTIONS_SQL = """
+    SELECT s.term, s.user_id
+    FROM user_keyword_subscriptions s
+    JOIN users u ON u.id = s.user_id
+    WHERE u.is_active = TRUE
+"""
+
+_GENERATION_SQL = "SELECT generation FROM cache_generations WHERE name = %s;"
+
+_NEW_GIGS_TEXT_SQL = """
+    SELECT id, title, description, array_to_string(skills, ' ')
+    FROM gigs
+    WHERE id = ANY(%s)
+"""
+
+_INSERT_MATCHES_SQL = """
+    INSERT INTO gig_keyword_matches (gig_id, user_id)
+    VALUES %s
+    ON CONFLICT (gig_id, user_id) DO NOTHING;
+"""
+
+
+def tokenize(text):
+    """Lower-cased word tokens of `text`, keeping '+', '#' and inner dots (c++, c#, node.js)."""
+    return _TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+def normalize_term(term):
+    """
+    Canonical stored form of a subscription term: its tokens joined by single
+    spaces. Returns None for terms without tokens or longer than MAX_TERM_TOKENS.
+    """
+    tokens = tokenize(term)
+    if not tokens or len(tokens) > MAX_TERM_TOKENS:
+        return None
+    return ' '.join(tokens)
+
+
+class KeywordMatcher:
+    """Compiled multi-term matcher over (normalized term, user id) subscriptions."""
+
+    def __init__(self, subscriptions=()):
+        users_by_term = defaultdict(set)
+        for term, user_id in subscriptions:
+            users_by_term[tuple(term.split(' '))].add(user_id)
+        self._users_by_term = {term: array('i', sorted(user_ids)) for term, user_ids in users_by_term.items()}
+        self.max_tokens = max((len(term) for term in self._users_by_term), default=0)
+
+    def __len__(self):
+        """Number of distinct terms."""
+        return len(self._users_by_term)
+
+    def match_tokens(self, tokens):
+        """Set of subscriber ids with at least one term occurring in `tokens`."""
+        users_by_term = self._users_by_term
+        matched = set()
+        for start in range(len(tokens)):
+            for end in range(start + 1, min(start + self.max_tokens, len(tokens)) + 1):
+                user_ids = users_by_term.get(tuple(tokens[start:end]))
+                if user_ids is not None:
+                    matched.update(user_ids)
+        return matched
+
+    def match(self, *texts):
+        """Subscriber ids matched by any of `texts` (terms never span two texts)."""
+        matched = set()
+        for text in texts:
+            matched |= self.match_tokens(tokenize(text))
+        return matched
+
+
+_matcher_lock = threading.Lock()
+_matcher_cache = {"generation": None, "matcher": KeywordMatcher()}
+
+
+def load_keyword_matcher(cursor):
+    """Compiles a matcher from all active users' subscriptions."""
+    cursor.execute(_ACTIVE_SUBSCRIPTIONS_SQL)
+    return KeywordMatcher(cursor.fetchall())
+
+
+def get_keyword_matcher(cursor):
+    """The compiled matcher, recompiled only when the subscriptions generation changed."""
+    cursor.execute(_GENERATION_SQL, (KEYWORD_MATCHER_GENERATION,))
+    row = cursor.fetchone()
+    generation = row[0] if row else 0
+    with _matcher_lock:
+        if _matcher_cache["generation"] != generation:
+            _matcher_cache["matcher"] = load_keyword_matcher(cursor)
+            _matcher_cache["generation"] = generation
+            print(f"Keyword matcher compiled: {len(_matcher_cache['matcher'])} terms (generation {generation}).")
+        return _matcher_cache["matcher"]
+
+
+def tag_keyword_matches(cursor, gig_ids):
+    """
+    Matches already-inserted gigs against every keyword subscription and
+    stores the (gig, user) hits. Runs in the caller's transaction.
+    Returns the number of pairs found.
+    """
+    if not gig_ids:
+        return 0
+    matcher = get_keyword_matcher(cursor)
+    if not len(matcher):
+        return 0
+
+    cursor.execute(_NEW_GIGS_TEXT_SQL, (list(gig_ids),))
+    pairs = [
+        (gig_id, user_id)
+        for gig_id, title, description, skills in cursor.fetchall()
+        for user_id in matcher.match(title, skills, description)
+    ]
+    if pairs:
+        extras.execute_values(cursor, _INSERT_MATCHES_SQL, pairs, page_size=1000)
+    return len(pairs)
@@ -1,28 +1,234 @@
+import io
+import time
 import psycopg2
 from psycopg2 import extras  # For execute_values
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 
+from etl.category_rollup import add_gigs_to_rollup
+from etl.keyword_matcher import tag_keyword_matches
+from etl.partition_maintenance import retention_cutoff
 
-def load_gigs_to_db(gigs, conn):
+LOAD_METHODS = ("insert", "copy")
+INSERT_PAGE_SIZE = 1000
+NEW_GIGS_CHANNEL = "new_gigs"  # LISTEN/NOTIFY channel announcing ids of newly inserted gigs
+NOTIFY_IDS_PER_PAYLOAD = 500  # Keeps each payload well under PostgreSQL's 8000-byte limit
+EXPIRED_LINKS_LOGGED = 5  # Example links printed when gigs older than the retention period are dropped
+
+GIG_COLUMNS = ("title", "link", "description", "published_at", "category",
+               "budget_amount", "budget_currency", "skills", "source_platform")
+
+CREATE_STAGING_TABLE_SQL = """
+    CREATE TEMP TABLE IF NOT EXISTS gigs_staging (
+        row_no BIGINT,
+        title VARCHAR(512),
+        link TEXT,
+        description TEXT,
+        published_at TIMESTAMP WITH TIME ZONE,
+        category VARCHAR(100),
+        budget_amount DECIMAL(10, 2),
+        budget_currency VARCHAR(10),
+        skills TEXT[],
+        source_platform VARCHAR(50)
+    ) ON COMMIT DELETE ROWS;
+"""
+
+COPY_STAGING_SQL = f"COPY gigs_staging (row_no, {', '.join(GIG_COLUMNS)}) FROM STDIN"
+
+# Inserts the rows of `source` (row_no plus GIG_COLUMNS) whose link was never loaded before.
+# gig_links is the duplicate check; repeated links within the batch keep their first row.
+# Gigs without a published date are partitioned under the load time.
+_INSERT_NEW_GIGS_SQL = """
+    new_links AS (
+        INSERT INTO gig_links (link)
+        SELECT link FROM {source}
+        ON CONFLICT (link) DO NOTHING
+        RETURNING link
+    )
+    INSERT INTO gigs ({columns})
+    SELECT {values}
+    FROM (
+        SELECT DISTINCT ON (link) *
+        FROM {source} JOIN new_links USING (link)
+        ORDER BY link, row_no
+    ) AS first_rows
+    ORDER BY row_no
+    RETURNING id;
+"""
+
+_NEW_GIGS_FORMAT = {
+    "columns": ', '.join(GIG_COLUMNS),
+    "values": ', '.join("COALESCE(published_at, CURRENT_TIMESTAMP)" if column == "published_at" else column
+                        for column in GIG_COLUMNS),
+}
+
+INSERT_SQL = "WITH incoming (row_no, {columns}) AS (VALUES %s),".format(**_NEW_GIGS_FORMAT) + \
+    _INSERT_NEW_GIGS_SQL.format(source="incoming", **_NEW_GIGS_FORMAT)
+# Casts give the VALUES list its column types (a column of NULLs would otherwise be text)
+INSERT_ROW_TEMPLATE = "(%s, %s, %s, %s, %s::timestamptz, %s, %s::numeric, %s, %s::text[], %s)"
+
+MERGE_STAGING_SQL = "WITH" + _INSERT_NEW_GIGS_SQL.format(source="gigs_staging", **_NEW_GIGS_FORMAT)
+
+# Creates the monthly 'gigs' partitions a batch needs (usually already made by etl.partition_maintenance)
+ENSURE_PARTITIONS_SQL = """
+    SELECT ensure_monthly_partition('gigs', month::date)
+    FROM (
+        SELECT DISTINCT date_trunc('month', COALESCE(published_at, CURRENT_TIMESTAMP) AT TIME ZONE 'UTC') AS month
+        FROM {source}
+    ) AS months;
+"""
+
+
+@dataclass
+class PageMetrics:
+    """Timing and outcome of one INSERT page (or of the COPY merge)."""
+    rows: int
+    inserted: int
+    seconds: float
+
+
+@dataclass
+class LoadResult:
+    """
+    Outcome of loading a batch of gigs: exact inserted and duplicate counts,
+    the ids of newly inserted gigs and per-page latency.
+    """
+    method: str
+    attempted: int = 0
+    expired: int = 0
+    inserted_ids: list = field(default_factory=list)
+    pages: list = field(default_factory=list)
+    seconds: float = 0.0
+    error: str = None
+
+    @property
+    def inserted(self):
+        return len(self.inserted_ids)
+
+    @property
+    def skipped(self):
+        """
+        Rows whose link was already loaded (or repeated in the batch, dated
+        before the retention period, or not loaded because of an error).
+        """
+        return self.attempted - self.inserted
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def dedup_ratio(self):
+        """Share of attempted rows that were already stored."""
+        return self.skipped / self.attempted if self.attempted else 0.0
+
+    def merge(self, other):
+        """Accumulates another result into this one (e.g. across streamed batches)."""
+        self.attempted += other.attempted
+        self.expired += other.expired
+        self.inserted_ids.extend(other.inserted_ids)
+        self.pages.extend(other.pages)
+        self.seconds += other.seconds
+        self.error = self.error or other.error
+        return self
+
+    def as_dict(self):
+        """Summary suitable for structured logging or metrics export."""
+        page_seconds = [page.seconds for page in self.pages]
+        return {
+            "method": self.method,
+            "attempted": self.attempted,
+            "inserted": self.inserted,
+            "skipped": self.skipped,
+            "expired": self.expired,
+            "dedup_ratio": round(self.dedup_ratio, 4),
+            "pages": len(self.pages),
+            "page_seconds_max": round(max(page_seconds), 4) if page_seconds else 0.0,
+            "page_seconds_avg": round(sum(page_seconds) / len(page_seconds), 4) if page_seconds else 0.0,
+            "seconds": round(self.seconds, 4),
+            "error": self.error,
+        }
+
+
+class _RetentionFilter:
+    """
+    Drops gigs published before the retention cutoff: their monthly
+    partition was retired by etl.partition_maintenance and must not be
+    created again. Counts them and keeps a few links for the log.
+    """
+
+    def __init__(self, cutoff=None):
+        self.cutoff = cutoff or retention_cutoff()
+        self.count = 0
+        self.examples = []
+
+    def is_expired(self, gig):
+        published = gig.get('published_at')
+        if published is None:
+            return False  # Loaded under the load time
+        if published.tzinfo is None:
+            published = published.replace(tzinfo=timezone.utc)  # Feeds' naive dates are UTC
+        if published >= self.cutoff:
+            return False
+        self.count += 1
+        if len(self.examples) < EXPIRED_LINKS_LOGGED:
+            self.examples.append(gig.get('link'))
+        return True
+
+    def apply(self, gigs):
+        """Yields the gigs within the retention period."""
+        return (gig for gig in gigs if not self.is_expired(gig))
+
+    def report(self):
+        if self.count:
+            print(f"Dropped {self.count} gigs published before the retention cutoff "
+                  f"{self.cutoff:%Y-%m-%d}, e.g. {', '.join(map(str, self.examples))}.")
+
+
+def publish_new_gig_ids(cursor, gig_ids):
+    """
+    Announces newly inserted gig ids on NEW_GIGS_CHANNEL as comma-separated
+    payloads. Sent inside the load transaction, so listeners hear about the
+    gigs only once they are committed (and never if the load rolls back).
+    """
+    for offset in range(0, len(gig_ids), NOTIFY_IDS_PER_PAYLOAD):
+        payload = ','.join(str(gig_id) for gig_id in gig_ids[offset:offset + NOTIFY_IDS_PER_PAYLOAD])
+        cursor.execute("SELECT pg_notify(%s, %s);", (NEW_GIGS_CHANNEL, payload))
+
+
+def load_gigs_to_db(gigs, conn, method="insert", page_size=INSERT_PAGE_SIZE):
     """
     Loads a list of transformed gig dictionaries into the 'gigs' table.
-    Handles duplicate links using ON CONFLICT DO NOTHING.
+    Skips links that were loaded before (gig_links) or repeat within the batch,
+    and drops gigs published before the retention period (see
+    etl.partition_maintenance.retention_cutoff).
+    `method` selects the multi-row INSERT path ("insert") or the COPY into a
+    staging table path ("copy", see bulk_load_gigs_to_db).
+    Returns a LoadResult; rows are counted from RETURNING id, so the figures
+    stay exact across pages. In the same transaction the new gigs are added
+    to the hourly category rollup, tagged with their keyword subscribers and
+    their ids published on NEW_GIGS_CHANNEL.
     """
+    if method == "copy":
+        return bulk_load_gigs_to_db(gigs, conn)
+    if method not in LOAD_METHODS:
+        raise ValueError(f"Unknown load method '{method}'. Choose from: {', '.join(LOAD_METHODS)}")
+
+    result = LoadResult(method="insert", attempted=len(gigs))
+    retention = _RetentionFilter()
+    gigs = list(retention.apply(gigs))
+    result.expired = retention.count
+    retention.report()
     if not gigs:
         print("No gigs to load.")
-        return 0
+        return result
 
     cursor = conn.cursor()
 
-    insert_sql = """
-                 INSERT INTO gigs (title, link, description, published_at, category,
-                                   budget_amount, budget_currency, skills, source_platform)
-                 VALUES %s ON CONFLICT (link) DO NOTHING; \
-                 """
-
     values = []
-    for gig in gigs:
+    for row_no, gig in enumerate(gigs):
         values.append((
+            row_no,
             gig.get('title'),
             gig.get('link'),
             gig.get('description'),
@@ -34,14 +240,131 @@ def load_gigs_to_db(gigs, conn):
             gig.get('source_platform')
         ))
 
+    started = time.perf_counter()
     try:
-        psycopg2.extras.execute_values(cursor, insert_sql, values, page_size=1000)
+        cursor.execute(ENSURE_PARTITIONS_SQL.format(source="unnest(%s::timestamptz[]) AS batch (published_at)"),
+                       ([gig.get('published_at') for gig in gigs],))
+        for offset in range(0, len(values), page_size):
+            page = values[offset:offset + page_size]
+            page_started = time.perf_counter()
+            rows = psycopg2.extras.execute_values(cursor, INSERT_SQL, page, template=INSERT_ROW_TEMPLATE,
+                                                  page_size=len(page), fetch=True)
+            result.pages.append(PageMetrics(len(page), len(rows), time.perf_counter() - page_started))
+            result.inserted_ids.extend(row[0] for row in rows)
+        add_gigs_to_rollup(cursor, result.inserted_ids)
+        tag_keyword_matches(cursor, result.inserted_ids)
+        publish_new_gig_ids(cursor, result.inserted_ids)
         conn.commit()
-        print(f"Loaded {cursor.rowcount} new gigs into the database.")
-        return cursor.rowcount
+        print(f"Loaded {result.inserted} new gigs into the database ({result.skipped - result.expired} duplicates skipped).")
     except Exception as e:
         conn.rollback()
+        result.inserted_ids = []
+        result.error = str(e)
         print(f"Error loading gigs to database: {e}")
-        return 0
     finally:
-        cursor.close()
\ No newline at end of file
+        result.seconds = time.perf_counter() - started
+        cursor.close()
+    return result
+
+
+def _copy_escape(value):
+    """Escapes a string for COPY's text format."""
+    return (value.replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+def _copy_field(value):
+    """Renders one column value in COPY text format (\\N for NULL)."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, (list, tuple)):
+        # PostgreSQL array literal with every element quoted
+        elements = ('"' + str(v).replace('\\', '\\\\').replace('"', '\\"') + '"' for v in value)
+        return _copy_escape('{' + ','.join(elements) + '}')
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return _copy_escape(str(value))
+
+
+class _CopyRowStream(io.TextIOBase):
+    """
+    File-like object that renders gigs into COPY text rows on demand, so
+    copy_expert can stream any iterable without materializing it.
+    """
+
+    def __init__(self, gigs):
+        self._rows = (
+            '\t'.join([str(row_no)] + [_copy_field(gig.get(column)) for column in GIG_COLUMNS]) + '\n'
+            for row_no, gig in enumerate(gigs)
+        )
+        self._buffer = ''
+        self.row_count = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        pieces = [self._buffer]
+        length = len(self._buffer)
+        while size < 0 or length < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            pieces.append(row)
+            length += len(row)
+            self.row_count += 1
+        data = ''.join(pieces)
+        if size < 0:
+            size = length
+        self._buffer = data[size:]
+        return data[:size]
+
+
+def bulk_load_gigs_to_db(gigs, conn):
+    """
+    Bulk-loads gigs by streaming them with COPY FROM STDIN into a temporary
+    staging table, then merging the rows with new links into 'gigs' with a
+    single INSERT ... SELECT.
+    `gigs` may be any iterable, including a generator.
+    Returns a LoadResult with one page for the COPY and one for the merge;
+    skipped counts rows whose link already existed (or repeated within the input,
+    or were dated before the retention period and dropped before the COPY).
+    """
+    result = LoadResult(method="copy")
+    cursor = conn.cursor()
+    retention = _RetentionFilter()
+    stream = _CopyRowStream(retention.apply(gigs))
+    started = time.perf_counter()
+    try:
+        cursor.execute(CREATE_STAGING_TABLE_SQL)
+        cursor.copy_expert(COPY_STAGING_SQL, stream, size=65536)
+        result.expired = retention.count
+        result.attempted = stream.row_count + retention.count
+        result.pages.append(PageMetrics(stream.row_count, 0, time.perf_counter() - started))
+        retention.report()
+        if not stream.row_count:
+            conn.rollback()
+            print("No gigs to load.")
+            return result
+
+        merge_started = time.perf_counter()
+        cursor.execute(ENSURE_PARTITIONS_SQL.format(source="gigs_staging"))
+        cursor.execute(MERGE_STAGING_SQL)
+        result.inserted_ids = [row[0] for row in cursor.fetchall()]
+        result.pages.append(PageMetrics(stream.row_count, result.inserted, time.perf_counter() - merge_started))
+        add_gigs_to_rollup(cursor, result.inserted_ids)
+        tag_keyword_matches(cursor, result.inserted_ids)
+        publish_new_gig_ids(cursor, result.inserted_ids)
+        conn.commit()  # ON COMMIT DELETE ROWS empties the staging table
+        print(f"Bulk loaded {result.inserted} new gigs into the database ({result.skipped - result.expired} duplicates skipped).")
+    except Exception as e:
+        conn.rollback()
+        result.expired = retention.count
+        result.attempted = max(result.attempted, stream.row_count + retention.count)
+        result.inserted_ids = []
+        result.error = str(e)
+        print(f"Error bulk loading gigs to database: {e}")
+    finally:
+        result.seconds = time.perf_counter() - started
+        cursor.close()
+    return result
@@ -0,0 +1,194 @@
+"""
+Monthly partition maintenance for 'gigs' (partitioned by published_at) and
+'sent_notifications' (partitioned by sent_at).
+
+Each run
+  - creates the partitions of the current month and the next
+    PARTITION_MONTHS_AHEAD months, so inserts never wait on DDL, and
+  - retires partitions entirely older than the retention period:
+    with PARTITION_ARCHIVE_DIR set, a partition is written to
+    <dir>/<partition>.csv.gz (COPY CSV with header; an existing archive of
+    the same month is never overwritten, the new one gets a timestamp
+    suffix) and dropped; otherwise it is detached and renamed to
+    <partition>_detached_<UTC timestamp>, so the month's name is free again.
+
+Before a gigs partition is retired its gigs are subtracted from the hourly
+category rollup and their keyword matches and 'gig_links' rows removed.
+The loader refuses gigs published before retention_cutoff(), so feeds
+re-serving old items do not bring them back.
+
+The orchestrator runs this daily; it can also be run by hand:
+    python -m etl.partition_maintenance [--dry-run]
+"""
+import argparse
+import gzip
+import os
+import sys
+from datetime import date, datetime, time, timezone
+
+from psycopg2 import sql
+
+from etl.category_rollup import remove_gigs_from_rollup
+from utils.db_utils import get_db_connection, close_db_connection, close_db_pool
+
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", 3))  # Future monthly partitions kept ready
+GIG_RETENTION_MONTHS = int(os.getenv("GIG_RETENTION_MONTHS", 6))  # Full months of gigs kept besides the current one
+SENT_NOTIFICATION_RETENTION_MONTHS = int(os.getenv("SENT_NOTIFICATION_RETENTION_MONTHS", 6))
+PARTITION_ARCHIVE_DIR = os.getenv("PARTITION_ARCHIVE_DIR", "")  # Empty: detach retired partitions instead of archiving
+
+_ENSURE_PARTITION_SQL = "SELECT ensure_monthly_partition(%s, %s);"
+
+# Attached partitions of a parent table with their lower bound (a UTC month start)
+_PARTITIONS_SQL = """
+    SELECT c.relname,
+           (regexp_match(pg_get_expr(c.relpartbound, c.oid), 'FROM \\(''([^'']+)''\\)'))[1]::timestamptz
+               AT TIME ZONE 'UTC' AS lower_bound
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = %s::regclass
+    ORDER BY lower_bound;
+"""
+
+_KEYWORD_MATCHES_DELETE_SQL = "DELETE FROM gig_keyword_matches WHERE gig_id = ANY(%s);"
+
+_GIG_LINKS_DELETE_SQL = "DELETE FROM gig_links l USING {} g WHERE l.link = g.link;"
+
+
+def _add_months(month_start, months):
+    """First day of the month `months` after (or before, if negative) `month_start`."""
+    index = month_start.year * 12 + month_start.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _retention_start(retention_months, today=None):
+    if retention_months < 1:
+        raise ValueError("Retention must keep at least one full month.")
+    return _add_months((today or datetime.utcnow().date()).replace(day=1), -retention_months)
+
+
+def retention_cutoff(retention_months=GIG_RETENTION_MONTHS, today=None):
+    """Start (UTC) of the oldest month kept; rows dated before it belong to retired partitions."""
+    return datetime.combine(_retention_start(retention_months, today), time.min, tzinfo=timezone.utc)
+
+
+def create_future_partitions(conn, parent, months_ahead=PARTITION_MONTHS_AHEAD, today=None):
+    """Creates the missing partitions from the current month through `months_ahead` months ahead."""
+    current_month = (today or datetime.utcnow().date()).replace(day=1)
+    created = []
+    with conn.cursor() as cursor:
+        cursor.execute(_PARTITIONS_SQL, (parent,))
+        existing = {name for name, _ in cursor.fetchall()}
+        for offset in range(months_ahead + 1):
+            cursor.execute(_ENSURE_PARTITION_SQL, (parent, _add_months(current_month, offset)))
+            name = cursor.fetchone()[0]
+            if name is None:
+                raise RuntimeError(f"'{parent}' is not partitioned; run db/migrate_partition_gigs.sql first.")
+            if name not in existing:
+                created.append(name)
+    conn.commit()
+    return created
+
+
+def expired_partitions(conn, parent, retention_months, today=None):
+    """Names of the partitions of `parent` whose whole month is older than the retention period."""
+    cutoff = _retention_start(retention_months, today)
+    with conn.cursor() as cursor:
+        cursor.execute(_PARTITIONS_SQL, (parent,))
+        partitions = cursor.fetchall()
+    conn.rollback()  # End the read-only transaction
+    return [name for name, lower_bound in partitions
+            if lower_bound is not None and _add_months(lower_bound.date(), 1) <= cutoff]
+
+
+def retire_partition(conn, parent, partition, archive_dir=PARTITION_ARCHIVE_DIR):
+    """
+    Archives (if `archive_dir` is set) and detaches one partition in a single
+    transaction; the SHARE lock keeps late inserts from slipping in after the
+    copy. Returns the archive path, or the new name of the detached table.
+    """
+    table = sql.Identifier(partition)
+    stamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+    archive_path = None
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(sql.SQL("LOCK TABLE {} IN SHARE MODE;").format(table))
+            if archive_dir:
+                os.makedirs(archive_dir, exist_ok=True)
+                archive_path = os.path.join(archive_dir, f"{partition}.csv.gz")
+                if os.path.exists(archive_path):  # The month was archived before and got late rows since
+                    archive_path = os.path.join(archive_dir, f"{partition}.{stamp}.csv.gz")
+                with gzip.open(archive_path + ".tmp", "wt", encoding="utf-8", newline="") as archive:
+                    # Generated columns (gigs.search_vector) are left out by COPY
+                    cursor.copy_expert(sql.SQL("COPY {} TO STDOUT WITH (FORMAT csv, HEADER)").format(table), archive)
+
+            if parent == "gigs":
+                cursor.execute(sql.SQL("SELECT id FROM {};").format(table))
+                gig_ids = [row[0] for row in cursor.fetchall()]
+                remove_gigs_from_rollup(cursor, gig_ids)
+                if gig_ids:
+                    cursor.execute(_KEYWORD_MATCHES_DELETE_SQL, (gig_ids,))
+                cursor.execute(sql.SQL(_GIG_LINKS_DELETE_SQL).format(table))
+
+            cursor.execute(sql.SQL("ALTER TABLE {} DETACH PARTITION {};").format(sql.Identifier(parent), table))
+            if archive_dir:
+                cursor.execute(sql.SQL("DROP TABLE {};").format(table))
+                os.replace(archive_path + ".tmp", archive_path)  # Last step before the commit
+                result = archive_path
+            else:
+                result = f"{partition}_detached_{stamp}"
+                cursor.execute(sql.SQL("ALTER TABLE {} RENAME TO {};").format(table, sql.Identifier(result)))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        if archive_path and os.path.exists(archive_path + ".tmp"):
+            os.remove(archive_path + ".tmp")
+        raise
+    return result
+
+
+def run_partition_maintenance(conn, months_ahead=PARTITION_MONTHS_AHEAD, archive_dir=PARTITION_ARCHIVE_DIR,
+                              dry_run=False, today=None):
+    """
+    Creates upcoming partitions and retires expired ones for both tables.
+    Returns {parent: {"created": [...], "retired": [...]}}.
+    """
+    retention = {"gigs": GIG_RETENTION_MONTHS, "sent_notifications": SENT_NOTIFICATION_RETENTION_MONTHS}
+    summary = {}
+    for parent, retention_months in retention.items():
+        created = [] if dry_run else create_future_partitions(conn, parent, months_ahead, today)
+        expired = expired_partitions(conn, parent, retention_months, today)
+        if not dry_run:
+            for partition in expired:
+                retired_to = retire_partition(conn, parent, partition, archive_dir)
+                print(f"Retired partition {partition}" + (" to " if archive_dir else " as detached table ") + f"{retired_to}.")
+        summary[parent] = {"created": created, "retired": expired}
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create upcoming and retire expired monthly partitions.")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Only list the partitions that would be retired.")
+    args = parser.parse_args(argv)
+
+    conn = get_db_connection()
+    if not conn:
+        print("Failed to get database connection. Aborting partition maintenance.")
+        return 1
+    try:
+        summary = run_partition_maintenance(conn, dry_run=args.dry_run)
+        for parent, changes in summary.items():
+            print(f"{parent}: created {changes['created'] or 'none'}; "
+                  f"{'would retire' if args.dry_run else 'retired'} {changes['retired'] or 'none'}.")
+        return 0
+    except Exception as e:
+        conn.rollback()
+        print(f"Partition maintenance failed: {e}")
+        return 1
+    finally:
+        close_db_connection(conn)
+        close_db_pool()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
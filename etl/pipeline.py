@@ -0,0 +1,132 @@
+import queue
+import threading
+from collections import defaultdict
+
+from etl.transform.data_transformer import categorize_gig
+from etl.load.db_loader import LoadResult, load_gigs_to_db
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_QUEUE_SIZE = 4  # Batches buffered between stages
+
+# Marks the end of a stage's output on its queue
+_END_OF_STREAM = object()
+
+
+def iter_batches(items, batch_size):
+    """Groups any iterable into lists of at most `batch_size` items."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _put(out_queue, item, stop_event):
+    """Blocks on a full queue (backpressure) but gives up once the pipeline is stopping."""
+    while not stop_event.is_set():
+        try:
+            out_queue.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(in_queue, stop_event):
+    """Waits for the next item, returning end-of-stream once the pipeline is stopping."""
+    while not stop_event.is_set():
+        try:
+            return in_queue.get(timeout=0.5)
+        except queue.Empty:
+            continue
+    return _END_OF_STREAM
+
+
+def _extract_stage(raw_gigs, batch_size, out_queue, stop_event, errors):
+    """Pulls raw gigs from the source iterable and queues them in batches."""
+    try:
+        for batch in iter_batches(raw_gigs, batch_size):
+            if not _put(out_queue, batch, stop_event):
+                return
+    except Exception as e:
+        errors.append(e)
+    finally:
+        _put(out_queue, _END_OF_STREAM, stop_event)
+
+
+def _transform_stage(in_queue, out_queue, stop_event, category_counts, errors):
+    """Categorizes each queued batch in place and passes it on to the loader."""
+    try:
+        while True:
+            batch = _get(in_queue, stop_event)
+            if batch is _END_OF_STREAM:
+                break
+            for gig in batch:
+                gig["category"] = categorize_gig(gig.get("title"), gig.get("skills", []), gig.get("description"))
+                category_counts[gig["category"]] += 1
+            if not _put(out_queue, batch, stop_event):
+                return
+    except Exception as e:
+        errors.append(e)
+    finally:
+        _put(out_queue, _END_OF_STREAM, stop_event)
+
+
+def run_streaming_pipeline(raw_gigs, conn, batch_size=DEFAULT_BATCH_SIZE, queue_size=DEFAULT_QUEUE_SIZE,
+                           seen_gigs=None, load_method="insert"):
+    """
+    Streams raw gigs through categorization into the database in batches.
+
+    `raw_gigs` may be any iterable, typically a generator over feed entries.
+    Extraction and categorization run on background threads connected by
+    bounded queues, so at most about (2 * queue_size + 3) batches are held in
+    memory and a slow loader throttles the stages upstream. Each batch is
+    committed by load_gigs_to_db as soon as it is categorized, and marked in
+    `seen_gigs` (a SeenGigs) once stored. `load_method` is passed to load_gigs_to_db.
+
+    Returns a LoadResult accumulated over all batches.
+    """
+    extracted_queue = queue.Queue(maxsize=queue_size)
+    transformed_queue = queue.Queue(maxsize=queue_size)
+    stop_event = threading.Event()
+    category_counts = defaultdict(int)
+    errors = []
+
+    stages = [
+        threading.Thread(target=_extract_stage, name="etl-extract", daemon=True,
+                         args=(raw_gigs, batch_size, extracted_queue, stop_event, errors)),
+        threading.Thread(target=_transform_stage, name="etl-transform", daemon=True,
+                         args=(extracted_queue, transformed_queue, stop_event, category_counts, errors)),
+    ]
+    for stage in stages:
+        stage.start()
+
+    load_result = LoadResult(method=load_method)
+    batch_count = 0
+    try:
+        while True:
+            batch = transformed_queue.get()
+            if batch is _END_OF_STREAM:
+                break
+            batch_count += 1
+            batch_result = load_gigs_to_db(batch, conn, method=load_method)
+            load_result.merge(batch_result)
+            if seen_gigs is not None and batch_result.ok:
+                seen_gigs.mark_stored(batch)
+        if errors:
+            raise errors[0]
+    finally:
+        stop_event.set()
+        for stage in stages:
+            stage.join()
+
+    print(f"Streamed {sum(category_counts.values())} gigs in {batch_count} batches; "
+          f"loaded {load_result.inserted} new gigs ({load_result.skipped} skipped).")
+    print("Category distribution:")
+    for cat, count in sorted(category_counts.items(), key=lambda x: x[1], reverse=True):
+        print(f"{cat}: {count}")
+
+    return load_result
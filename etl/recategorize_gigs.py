@@ -0,0 +1,175 @@
+"""
+Backfill job that re-applies the current categorization rules from
+etl/transform/data_transformer.py to rows already stored in the 'gigs' table.
+
+Rows are streamed in id order through a named (server-side) cursor so memory
+stays bounded by the batch size, and only rows whose category changed are
+written back. Progress is recorded per batch in 'etl_job_progress', so an
+interrupted run resumes after the last committed id.
+
+Usage:
+    python -m etl.recategorize_gigs [--batch-size N] [--restart]
+"""
+import argparse
+import sys
+
+from psycopg2 import extras  # For execute_values
+
+from etl.category_rollup import add_gigs_to_rollup, remove_gigs_from_rollup
+from etl.transform.data_transformer import categorize_gig
+from utils.db_utils import get_db_connection, close_db_connection, close_db_pool
+
+JOB_NAME = "recategorize_gigs"
+DEFAULT_BATCH_SIZE = 5000
+
+CREATE_PROGRESS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS etl_job_progress (
+        job_name VARCHAR(100) PRIMARY KEY,
+        last_id INTEGER NOT NULL,
+        rows_scanned BIGINT NOT NULL DEFAULT 0,
+        rows_updated BIGINT NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+UPDATE_CATEGORIES_SQL = """
+    UPDATE gigs AS g
+    SET category = v.category
+    FROM (VALUES %s) AS v(id, category)
+    WHERE g.id = v.id;
+"""
+
+SAVE_PROGRESS_SQL = """
+    INSERT INTO etl_job_progress (job_name, last_id, rows_scanned, rows_updated, updated_at)
+    VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP)
+    ON CONFLICT (job_name) DO UPDATE
+    SET last_id = EXCLUDED.last_id,
+        rows_scanned = EXCLUDED.rows_scanned,
+        rows_updated = EXCLUDED.rows_updated,
+        updated_at = EXCLUDED.updated_at;
+"""
+
+
+def _load_progress(conn):
+    """
+    Returns (last_id, rows_scanned, rows_updated) recorded by a previous,
+    unfinished run, or zeros when starting fresh.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(CREATE_PROGRESS_TABLE_SQL)
+        cursor.execute(
+            "SELECT last_id, rows_scanned, rows_updated FROM etl_job_progress WHERE job_name = %s;",
+            (JOB_NAME,)
+        )
+        row = cursor.fetchone()
+    conn.commit()
+    return row if row else (0, 0, 0)
+
+
+def _clear_progress(conn):
+    """Removes the progress marker so the next run starts from the first row."""
+    with conn.cursor() as cursor:
+        cursor.execute("DELETE FROM etl_job_progress WHERE job_name = %s;", (JOB_NAME,))
+    conn.commit()
+
+
+def _write_batch(conn, changed, last_id, rows_scanned, rows_updated):
+    """
+    Applies one batch of category changes and records progress in the same
+    transaction, so a crash never leaves the marker ahead of the data. The
+    changed gigs are moved between categories in the hourly rollup as well.
+    """
+    with conn.cursor() as cursor:
+        if changed:
+            changed_ids = [gig_id for gig_id, _ in changed]
+            remove_gigs_from_rollup(cursor, changed_ids)
+            extras.execute_values(cursor, UPDATE_CATEGORIES_SQL, changed, page_size=len(changed))
+            add_gigs_to_rollup(cursor, changed_ids)
+        cursor.execute(SAVE_PROGRESS_SQL, (JOB_NAME, last_id, rows_scanned, rows_updated))
+    conn.commit()
+
+
+def recategorize_gigs(read_conn, write_conn, batch_size=DEFAULT_BATCH_SIZE, restart=False):
+    """
+    Re-categorizes every gig after the last recorded id.
+
+    `read_conn` holds the server-side cursor for the whole scan; `write_conn`
+    commits updates and progress after every batch. Two connections are used
+    because committing on the reading connection would close the cursor.
+    Returns (rows_scanned, rows_updated) for the whole job, including any
+    previously interrupted runs it resumed.
+    """
+    if restart:
+        _clear_progress(write_conn)
+
+    last_id, rows_scanned, rows_updated = _load_progress(write_conn)
+    if last_id:
+        print(f"Resuming re-categorization after gig id {last_id} "
+              f"({rows_scanned} scanned, {rows_updated} updated so far).")
+
+    read_cursor = read_conn.cursor(name=f"{JOB_NAME}_cursor")
+    read_cursor.itersize = batch_size
+    try:
+        read_cursor.execute(
+            "SELECT id, title, skills, description, category FROM gigs WHERE id > %s ORDER BY id;",
+            (last_id,)
+        )
+        while True:
+            rows = read_cursor.fetchmany(batch_size)
+            if not rows:
+                break
+
+            changed = []
+            for gig_id, title, skills, description, category in rows:
+                new_category = categorize_gig(title, skills or [], description)
+                if new_category != category:
+                    changed.append((gig_id, new_category))
+
+            last_id = rows[-1][0]
+            rows_scanned += len(rows)
+            rows_updated += len(changed)
+            _write_batch(write_conn, changed, last_id, rows_scanned, rows_updated)
+            print(f"Re-categorized up to gig id {last_id}: "
+                  f"{rows_scanned} scanned, {rows_updated} updated.")
+    except Exception:
+        write_conn.rollback()
+        raise
+    finally:
+        read_cursor.close()
+        read_conn.rollback()  # End the read-only transaction that held the cursor
+
+    _clear_progress(write_conn)
+    print(f"Re-categorization finished: {rows_scanned} gigs scanned, {rows_updated} updated.")
+    return rows_scanned, rows_updated
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-categorize existing gigs in place.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"Rows fetched and updated per batch (default {DEFAULT_BATCH_SIZE}).")
+    parser.add_argument("--restart", action="store_true",
+                        help="Ignore recorded progress and start from the first gig.")
+    args = parser.parse_args(argv)
+
+    read_conn = get_db_connection()
+    write_conn = get_db_connection()
+    if not read_conn or not write_conn:
+        print("Failed to get database connection. Aborting re-categorization.")
+        close_db_connection(read_conn)
+        close_db_connection(write_conn)
+        return 1
+
+    try:
+        recategorize_gigs(read_conn, write_conn, batch_size=args.batch_size, restart=args.restart)
+        return 0
+    except Exception as e:
+        print(f"Re-categorization failed: {e}")
+        return 1
+    finally:
+        close_db_connection(read_conn)
+        close_db_connection(write_conn)
+        close_db_pool()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
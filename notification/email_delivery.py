@@ -0,0 +1,176 @@
+import os
+import queue
+import smtplib
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from notification.email_sender import get_smtp_settings, open_smtp_session, build_message
+
+logger = logging.getLogger(__name__)
+
+EMAIL_DELIVERY_WORKERS = int(os.getenv("EMAIL_DELIVERY_WORKERS", 4))  # Concurrent sending threads
+EMAIL_RATE_LIMIT_PER_SECOND = float(os.getenv("EMAIL_RATE_LIMIT_PER_SECOND", 5))  # 0 disables the limit
+SMTP_MAX_MESSAGES_PER_SESSION = int(os.getenv("SMTP_MAX_MESSAGES_PER_SESSION", 100))  # Reconnect after this many
+
+
+class _PooledSession:
+    """An authenticated SMTP session and the number of messages sent on it."""
+
+    def __init__(self, server):
+        self.server = server
+        self.sent = 0
+
+
+class SMTPSessionPool:
+    """
+    Keeps up to `size` authenticated SMTP sessions and lends them to sending
+    threads, so the EHLO/STARTTLS/LOGIN handshake is paid once per session
+    instead of once per recipient.
+    """
+
+    def __init__(self, settings, size, max_messages_per_session=SMTP_MAX_MESSAGES_PER_SESSION):
+        self.settings = settings
+        self.size = size
+        self.max_messages_per_session = max_messages_per_session
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _acquire(self):
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            try:
+                return _PooledSession(open_smtp_session(self.settings))
+            except Exception:
+                self._slots.release()
+                raise
+
+    def _release(self, session, discard=False):
+        if discard or session.sent >= self.max_messages_per_session:
+            self._quit(session)
+        else:
+            self._idle.put(session)
+        self._slots.release()
+
+    @staticmethod
+    def _quit(session):
+        try:
+            session.server.quit()
+        except Exception:
+            session.server.close()
+
+    def sendmail(self, sender_email, recipient_email, message_text):
+        """
+        Sends one message on a pooled session. A dropped connection is
+        replaced and the send retried once.
+        """
+        for attempt in (1, 2):
+            session = self._acquire()
+            try:
+                session.server.sendmail(sender_email, recipient_email, message_text)
+            except smtplib.SMTPRecipientsRefused:
+                self._release(session)  # The session itself is still healthy
+                raise
+            except smtplib.SMTPResponseException:
+                self._release(session, discard=True)
+                raise
+            except OSError:  # Dropped connection (SMTPServerDisconnected, socket errors)
+                self._release(session, discard=True)
+                if attempt == 2:
+                    raise
+                logger.warning(f"SMTP session lost while sending to {recipient_email}; reconnecting.")
+                continue
+            except Exception:
+                self._release(session, discard=True)
+                raise
+            session.sent += 1
+            self._release(session)
+            return
+
+    def close(self):
+        """Logs out of every idle session."""
+        while True:
+            try:
+                self._quit(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+
+class _RateLimiter:
+    """Spaces calls across all threads to at most `rate_per_second`."""
+
+    def __init__(self, rate_per_second):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class EmailDeliveryService:
+    """
+    Sends notification emails through a pool of reused SMTP sessions on
+    `workers` threads, rate limited to `rate_per_second` messages overall.
+
+    Usage:
+        with EmailDeliveryService() as delivery:
+            future = delivery.submit(recipient, subject, body_html)
+            delivered = future.result()  # True / False, like send_email
+    """
+
+    def __init__(self, workers=EMAIL_DELIVERY_WORKERS, rate_per_second=EMAIL_RATE_LIMIT_PER_SECOND, settings=None):
+        self.settings = settings or get_smtp_settings()
+        self.workers = workers
+        self._rate_limiter = _RateLimiter(rate_per_second)
+        self._pool = SMTPSessionPool(self.settings, workers) if self.settings else None
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="email-delivery")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def submit(self, recipient_email, subject, body_html):
+        """Queues one email; returns a Future resolving to True if it was accepted by the server."""
+        return self._executor.submit(self._deliver, recipient_email, subject, body_html)
+
+    def _deliver(self, recipient_email, subject, body_html):
+        if self._pool is None:
+            return False  # get_smtp_settings() already logged the missing configuration
+
+        message = build_message(self.settings["sender_email"], recipient_email, subject, body_html)
+        self._rate_limiter.wait()
+        try:
+            self._pool.sendmail(self.settings["sender_email"], recipient_email, message.as_string())
+            logger.info(f"Email sent successfully to {recipient_email} for subject: '{subject}'")
+            return True
+        except smtplib.SMTPAuthenticationError as e:
+            logger.error(f"Authentication failed for {recipient_email}: Check SMTP_USERNAME and SMTP_PASSWORD (ensure App Password is used). Error: {e}", exc_info=True)
+            return False
+        except smtplib.SMTPRecipientsRefused as e:
+            logger.error(f"Recipient email {recipient_email} refused: {e}. Ensure the email address is valid.", exc_info=True)
+            return False
+        except smtplib.SMTPException as e:
+            logger.error(f"SMTP error while sending email to {recipient_email}: {e}", exc_info=True)
+            return False
+        except Exception as e:
+            logger.error(f"Unexpected error sending email to {recipient_email}: {e}", exc_info=True)
+            return False
+
+    def close(self):
+        """Waits for queued emails, then logs out of the pooled sessions."""
+        self._executor.shutdown(wait=True)
+        if self._pool is not None:
+            self._pool.close()
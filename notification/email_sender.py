@@ -15,13 +15,22 @@ logger = logging.getLogger(__name__)
 # Path to the HTML email template file
 EMAIL_TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), 'email_template.html')
 
+# Template text and its {{gigs_content}} split, reloaded only when the file's mtime changes
+_template_cache = {"mtime": None, "html": None, "parts": None}
+
+
 def _load_email_template():
     """
-    Loads the HTML email template from a file.
+    Loads the HTML email template from a file. The text is cached and only
+    read again after the file's modification time changes.
     """
     try:
-        with open(EMAIL_TEMPLATE_PATH, 'r', encoding='utf-8') as f:
-            return f.read()
+        mtime = os.stat(EMAIL_TEMPLATE_PATH).st_mtime_ns
+        if _template_cache["html"] is None or _template_cache["mtime"] != mtime:
+            with open(EMAIL_TEMPLATE_PATH, 'r', encoding='utf-8') as f:
+                html = f.read()
+            _template_cache.update(mtime=mtime, html=html, parts=html.split('{{gigs_content}}'))
+        return _template_cache["html"]
     except FileNotFoundError:
         logger.error(f"Email template file not found: {EMAIL_TEMPLATE_PATH}")
         return None
@@ -29,33 +38,69 @@ def _load_email_template():
         logger.error(f"Error loading email template: {e}", exc_info=True)
         return None
 
-def send_email(recipient_email, subject, body_html):
+def get_smtp_settings():
     """
-    Sends an email notification using Gmail SMTP with an App Password.
+    Reads the SMTP configuration from the environment.
+    Returns None (and logs) if any required value is missing.
     """
-    sender_email = os.getenv("SENDER_EMAIL")
-    smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
-    smtp_port = int(os.getenv("SMTP_PORT", 587))
-    smtp_username = os.getenv("SMTP_USERNAME")
-    smtp_password = os.getenv("SMTP_PASSWORD")
-
-    if not all([sender_email, smtp_server, smtp_port, smtp_username, smtp_password]):
+    settings = {
+        "sender_email": os.getenv("SENDER_EMAIL"),
+        "server": os.getenv("SMTP_SERVER", "smtp.gmail.com"),
+        "port": int(os.getenv("SMTP_PORT", 587)),
+        "username": os.getenv("SMTP_USERNAME"),
+        "password": os.getenv("SMTP_PASSWORD"),
+        "use_tls": os.getenv("SMTP_USE_TLS", "true").lower() in ("1", "true", "yes"),
+    }
+    if not all([settings["sender_email"], settings["server"], settings["port"],
+                settings["username"], settings["password"]]):
         logger.error("Gmail SMTP configuration is incomplete. Check .env variables: SENDER_EMAIL, SMTP_SERVER, SMTP_PORT, SMTP_USERNAME, SMTP_PASSWORD")
-        return False
+        return None
+    return settings
+
+
+def open_smtp_session(settings):
+    """
+    Connects and authenticates an SMTP session (EHLO, STARTTLS, EHLO, LOGIN).
+    The caller is responsible for calling quit() on it.
+    """
+    server = smtplib.SMTP(settings["server"], settings["port"], timeout=30)
+    try:
+        server.ehlo()  # Identify with the SMTP server
+        if settings["use_tls"]:
+            server.starttls()  # Secure the connection
+            server.ehlo()  # Re-identify after STARTTLS
+        server.login(settings["username"], settings["password"])
+    except Exception:
+        server.close()
+        raise
+    return server
+
 
+def build_message(sender_email, recipient_email, subject, body_html):
+    """Builds the MIME message for one notification email."""
     message = MIMEMultipart("alternative")
     message["From"] = sender_email
     message["To"] = recipient_email
     message["Subject"] = subject
     message.attach(MIMEText(body_html, "html"))
+    return message
+
+
+def send_email(recipient_email, subject, body_html):
+    """
+    Sends an email notification using Gmail SMTP with an App Password.
+    Opens a dedicated SMTP session; use notification.email_delivery to reuse
+    sessions across many recipients.
+    """
+    settings = get_smtp_settings()
+    if settings is None:
+        return False
+
+    message = build_message(settings["sender_email"], recipient_email, subject, body_html)
 
     try:
-        with smtplib.SMTP(smtp_server, smtp_port, timeout=30) as server:
-            server.ehlo()  # Identify with the SMTP server
-            server.starttls()  # Secure the connection
-            server.ehlo()  # Re-identify after STARTTLS
-            server.login(smtp_username, smtp_password)
-            server.sendmail(sender_email, recipient_email, message.as_string())
+        with open_smtp_session(settings) as server:
+            server.sendmail(settings["sender_email"], recipient_email, message.as_string())
         logger.info(f"Email sent successfully to {recipient_email} for subject: '{subject}'")
         return True
     except smtplib.SMTPAuthenticationError as e:
@@ -71,40 +116,29 @@ def send_email(recipient_email, subject, body_html):
         logger.error(f"Unexpected error sending email to {recipient_email}: {e}", exc_info=True)
         return False
 
-def format_gigs_for_email(gigs):
-    """
-    Formats a list of gig dictionaries into an HTML string suitable for an email,
-    using a loaded template with modern card design.
-    """
-    if not gigs:
-        return "<p>No new gigs matching your preferences at this time.</p>"
-
-    template_html = _load_email_template()
-    if template_html is None:
-        return "<p>Error: Email template could not be loaded.</p>"
 
-    gigs_html_items = []
-    for gig in gigs:
-        title = gig.title if hasattr(gig, 'title') else 'N/A'
-        link = gig.link if hasattr(gig, 'link') else '#'
-        description = gig.description if hasattr(gig, 'description') else 'No description provided.'
-        category = gig.category if hasattr(gig, 'category') else 'Uncategorized'
-        published_at = gig.published_at if hasattr(gig, 'published_at') else None
-        budget_amount = getattr(gig, 'budget_amount', None)
-        budget_currency = getattr(gig, 'budget_currency', None)
-
-        # Format published date
-        if isinstance(published_at, datetime):
-            published_at_str = published_at.strftime('%Y-%m-%d %H:%M UTC')
-        elif isinstance(published_at, str):
-            published_at_str = published_at
-        else:
-            published_at_str = 'N/A'
-
-        # Format budget if available
-        budget_html = ""
-        if budget_amount and budget_currency:
-            budget_html = f"""
+def _render_gig_card(gig):
+    """Renders the HTML card for one gig."""
+    title = gig.title if hasattr(gig, 'title') else 'N/A'
+    link = gig.link if hasattr(gig, 'link') else '#'
+    description = gig.description if hasattr(gig, 'description') else 'No description provided.'
+    category = gig.category if hasattr(gig, 'category') else 'Uncategorized'
+    published_at = gig.published_at if hasattr(gig, 'published_at') else None
+    budget_amount = getattr(gig, 'budget_amount', None)
+    budget_currency = getattr(gig, 'budget_currency', None)
+
+    # Format published date
+    if isinstance(published_at, datetime):
+        published_at_str = published_at.strftime('%Y-%m-%d %H:%M UTC')
+    elif isinstance(published_at, str):
+        published_at_str = published_at
+    else:
+        published_at_str = 'N/A'
+
+    # Format budget if available
+    budget_html = ""
+    if budget_amount and budget_currency:
+        budget_html = f"""
                 <div class="gig-budget">
                     <svg width="14" height="14" viewBox="0 0 24 24" fill="none" stroke="currentColor">
                         <line x1="12" y1="2" x2="12" y2="22"/>
@@ -114,15 +148,15 @@ def format_gigs_for_email(gigs):
                 </div>
             """
 
-        # Format category
-        category_html = f"""
+    # Format category
+    category_html = f"""
             <span class="gig-category">
                 {category}
             </span>
         """
 
-        # Format date
-        date_html = f"""
+    # Format date
+    date_html = f"""
             <span class="gig-date">
                 <svg width="14" height="14" viewBox="0 0 24 24" fill="none" stroke="currentColor">
                     <rect width="18" height="18" x="3" y="4" rx="2" ry="2"/>
@@ -134,8 +168,8 @@ def format_gigs_for_email(gigs):
             </span>
         """
 
-        # Build the gig card
-        gig_html = f"""
+    # Build the gig card
+    gig_html = f"""
         <div class="gig-card">
             <div class="gig-header">
                 <h3 class="gig-title">
@@ -161,7 +195,33 @@ def format_gigs_for_email(gigs):
             </div>
         </div>
         """
+    return gig_html
+
+
+def format_gigs_for_email(gigs, card_cache=None):
+    """
+    Formats a list of gig dictionaries into an HTML string suitable for an email,
+    using a loaded template with modern card design.
+    `card_cache` is an optional dict, kept for one notification run, that
+    memoizes rendered cards by gig id: a gig sent to many users is rendered
+    once and each email becomes a join of cached cards.
+    """
+    if not gigs:
+        return "<p>No new gigs matching your preferences at this time.</p>"
+
+    if _load_email_template() is None:
+        return "<p>Error: Email template could not be loaded.</p>"
+
+    gigs_html_items = []
+    for gig in gigs:
+        gig_id = getattr(gig, 'id', None)
+        if card_cache is None or gig_id is None:
+            gigs_html_items.append(_render_gig_card(gig))
+            continue
+        gig_html = card_cache.get(gig_id)
+        if gig_html is None:
+            gig_html = card_cache[gig_id] = _render_gig_card(gig)
         gigs_html_items.append(gig_html)
 
-    # Join all gig cards and replace the placeholder
-    return template_html.replace('{{gigs_content}}', '\n'.join(gigs_html_items))
\ No newline at end of file
+    # Join all gig cards into the placeholder
+    return '\n'.join(gigs_html_items).join(_template_cache["parts"])
@@ -0,0 +1,120 @@
+"""
+Listens for the ids of newly loaded gigs, which etl.load.db_loader publishes
+with NOTIFY on NEW_GIGS_CHANNEL when a load commits, and hands them to the
+notifier in small debounced batches. Events are a latency optimisation only:
+if the listener is down the periodic notification sweep still picks the
+gigs up.
+
+When given a CategorySubscriberIndex, the listener also keeps it current
+from PREFERENCES_CHANGED_CHANNEL and reloads it fully after reconnecting
+and every SUBSCRIBER_INDEX_RELOAD_SECONDS.
+"""
+import logging
+import select
+import time
+
+import psycopg2
+
+from etl.load.db_loader import NEW_GIGS_CHANNEL
+from notification.subscriber_index import PREFERENCES_CHANGED_CHANNEL
+from utils.db_utils import get_dedicated_db_connection
+
+logger = logging.getLogger(__name__)
+
+NEW_GIGS_DEBOUNCE_SECONDS = 5  # Quiet period before a batch of announced gigs is processed
+NEW_GIGS_MAX_WAIT_SECONDS = 60  # Upper bound on how long announced gigs are held back
+RECONNECT_DELAY_SECONDS = 30
+SUBSCRIBER_INDEX_RELOAD_SECONDS = 3600  # Full reload catches changes made without an announcement
+
+
+class NewGigListener:
+    """
+    LISTENs on NEW_GIGS_CHANNEL (and, with `preferences=True`, on
+    PREFERENCES_CHANGED_CHANNEL) over a dedicated autocommit connection.
+    """
+
+    def __init__(self, preferences=False):
+        self.channels = [NEW_GIGS_CHANNEL] + ([PREFERENCES_CHANGED_CHANNEL] if preferences else [])
+        self._conn = None
+
+    @property
+    def connection(self):
+        """The listening connection, connecting on first use. Safe for short queries between waits."""
+        if self._conn is None:
+            self._conn = get_dedicated_db_connection(autocommit=True)
+            with self._conn.cursor() as cursor:
+                for channel in self.channels:
+                    cursor.execute(f"LISTEN {channel};")
+            logger.info(f"Listening on channels: {', '.join(self.channels)}.")
+        return self._conn
+
+    def wait(self, timeout):
+        """
+        Blocks for up to `timeout` seconds and returns (gig_ids, user_ids):
+        the gigs announced meanwhile and the users whose preferences changed.
+        Returns at once with notifications that arrived while the connection
+        ran queries (psycopg2 queues those in conn.notifies, where select()
+        would not see them).
+        """
+        conn = self.connection
+        conn.poll()
+        if not conn.notifies and select.select([conn], [], [], timeout) != ([], [], []):
+            conn.poll()
+        gig_ids, user_ids = [], []
+        while conn.notifies:
+            notify = conn.notifies.pop(0)
+            ids = [int(value) for value in notify.payload.split(',') if value]
+            (user_ids if notify.channel == PREFERENCES_CHANGED_CHANNEL else gig_ids).extend(ids)
+        return gig_ids, user_ids
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def listen_for_new_gigs(handle_gig_ids, stop_event, debounce_seconds=NEW_GIGS_DEBOUNCE_SECONDS,
+                        max_wait_seconds=NEW_GIGS_MAX_WAIT_SECONDS, subscriber_index=None):
+    """
+    Runs until `stop_event` is set, calling `handle_gig_ids(gig_ids)` with
+    the ids announced since the last call. A batch is handed over once no
+    new ids arrived for `debounce_seconds` (a streaming ETL run announces
+    one batch per commit) or after `max_wait_seconds` at the latest.
+    `subscriber_index` (a CategorySubscriberIndex) is kept current meanwhile.
+    Connection errors are logged and followed by a reconnect.
+    """
+    listener = NewGigListener(preferences=subscriber_index is not None)
+    pending = []
+    first_seen = None
+    index_loaded_at = None
+    try:
+        while not stop_event.is_set():
+            try:
+                if subscriber_index is not None and (
+                        index_loaded_at is None
+                        or time.monotonic() - index_loaded_at > SUBSCRIBER_INDEX_RELOAD_SECONDS):
+                    subscriber_index.load(listener.connection)
+                    index_loaded_at = time.monotonic()
+                gig_ids, user_ids = listener.wait(debounce_seconds if pending else 1.0)
+                if user_ids:
+                    subscriber_index.refresh_users(listener.connection, user_ids)
+            except (psycopg2.Error, OSError) as e:
+                logger.warning(f"New gig listener lost its connection: {e}. Reconnecting in {RECONNECT_DELAY_SECONDS}s.")
+                listener.close()
+                index_loaded_at = None  # Preference changes may have been missed while disconnected
+                stop_event.wait(RECONNECT_DELAY_SECONDS)
+                continue
+
+            if gig_ids:
+                pending.extend(gig_ids)
+                first_seen = first_seen or time.monotonic()
+                if time.monotonic() - first_seen < max_wait_seconds:
+                    continue
+            if pending:
+                batch, pending, first_seen = pending, [], None
+                try:
+                    handle_gig_ids(batch)
+                except Exception as e:
+                    logger.error(f"Handling {len(batch)} new gigs failed: {e}", exc_info=True)
+    finally:
+        listener.close()
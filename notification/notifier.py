@@ -1,20 +1,212 @@
 import logging
 from datetime import datetime, timedelta
+from collections import defaultdict
+from itertools import groupby
+
+from sqlalchemy import select, func, exists, any_, union
 
 # Import Flask models directly. They will be associated with the db instance
 # when the Flask app context is pushed.
-from app.models import User, Gig, SentNotification  # <--- UPDATED IMPORT
+from app.models import User, UserPreference, Gig, SentNotification, NotificationOutbox, GigKeywordMatch
 
 # Import email utilities
-from notification.email_sender import send_email, format_gigs_for_email
+from notification.email_sender import format_gigs_for_email
+from notification.outbox import ACTIVE_STATUSES, enqueue_messages, deliver_outbox
 
 logger = logging.getLogger(__name__)
 
+NOTIFICATION_WINDOW_HOURS = 2  # Only gigs published this recently are considered
+PENDING_ROWS_BUFFER = 1000  # Rows fetched per round trip while streaming pending notifications
+OUTBOX_INSERT_BATCH_SIZE = 200  # Rendered emails inserted into the outbox per statement
+OUTBOX_ENQUEUE_LOCK_ID = 7_340_001  # pg_advisory_xact_lock key serializing notification selection runs
+# A gig is only notified after it was loaded, so its sent_notifications rows are no older than its
+# published_at, give or take feeds stamping gigs ahead of time; bounds the sent_at partitions searched
+SENT_AT_SKEW_MARGIN = timedelta(hours=24)
+
+
+# Gig columns rendered into notification emails
+_NOTIFICATION_GIG_COLUMNS = (
+    Gig.id,
+    Gig.title,
+    Gig.link,
+    Gig.description,
+    Gig.category,
+    Gig.published_at,
+    Gig.budget_amount,
+    Gig.budget_currency,
+)
+
+
+def _candidate_pairs(window_start, gig_ids=None):
+    """
+    Distinct (user_id, gig_id) candidates for gigs published since
+    `window_start`: users whose category preferences match the gig, plus the
+    keyword matches the ETL recorded when the gig was loaded.
+    """
+    by_category = (
+        select(UserPreference.user_id, Gig.id.label("gig_id"))
+        .join(Gig, Gig.category == UserPreference.category_name)
+        .where(Gig.published_at >= window_start)
+    )
+    by_keyword = (
+        select(GigKeywordMatch.user_id, GigKeywordMatch.gig_id)
+        .join(Gig, Gig.id == GigKeywordMatch.gig_id)
+        .where(Gig.published_at >= window_start)
+    )
+    if gig_ids is not None:
+        by_category = by_category.where(Gig.id == any_(list(gig_ids)))
+        by_keyword = by_keyword.where(Gig.id == any_(list(gig_ids)))
+    return union(by_category, by_keyword).subquery()
+
+
+def _pending_notifications_query(window_start, gig_ids=None):
+    """
+    One statement computing every pending (user, gig) pair: active users joined
+    through their category preferences or keyword matches to gigs published
+    since `window_start`, minus the pairs already recorded in
+    sent_notifications or still waiting in the outbox. Ordered so rows for one
+    user are contiguous, newest gigs first.
+    `gig_ids` restricts the candidates to those gigs (e.g. a just-loaded batch).
+    """
+    candidates = _candidate_pairs(window_start, gig_ids)
+    return (
+        select(
+            User.id.label("user_id"),
+            User.email.label("user_email"),
+            *_NOTIFICATION_GIG_COLUMNS
+        )
+        .select_from(candidates)
+        .join(User, User.id == candidates.c.user_id)
+        .join(Gig, Gig.id == candidates.c.gig_id)
+        .outerjoin(
+            SentNotification,
+            (SentNotification.gig_id == Gig.id) & (SentNotification.user_id == User.id)
+            & (SentNotification.sent_at >= window_start - SENT_AT_SKEW_MARGIN)  # Prunes old partitions
+        )
+        .where(
+            User.is_active == True,
+            Gig.published_at >= window_start,  # Lets the planner prune old 'gigs' partitions
+            # Crucial: only select gigs NOT yet linked to this user in SentNotification
+            SentNotification.id.is_(None),
+            # ... nor held in one of the user's pending or sending outbox messages
+            ~exists().where(
+                NotificationOutbox.user_id == User.id,
+                NotificationOutbox.status.in_(ACTIVE_STATUSES),
+                Gig.id == any_(NotificationOutbox.gig_ids)
+            )
+        )
+        .order_by(User.id, Gig.published_at.desc(), Gig.id.desc())
+    )
+
+
+def iter_pending_notifications(db, window_start, gig_ids=None):
+    """
+    Streams pending notifications grouped by user, yielding
+    (user_id, user_email, gigs) with gigs newest first.
+
+    Rows are read through a server-side cursor on a dedicated connection,
+    so the caller can commit on db.session while iterating.
+    """
+    with db.engine.connect() as connection:
+        result = connection.execution_options(
+            stream_results=True, max_row_buffer=PENDING_ROWS_BUFFER
+        ).execute(_pending_notifications_query(window_start, gig_ids))
+        for (user_id, user_email), rows in groupby(result, key=lambda row: (row.user_id, row.user_email)):
+            yield user_id, user_email, list(rows)
+
+
+def iter_index_matches(db, subscriber_index, window_start, gig_ids):
+    """
+    Fan-out matching for a batch of new gigs: loads the gigs, looks up the
+    subscribers of each gig's category in `subscriber_index` (a
+    CategorySubscriberIndex), adds the keyword matches recorded at load time
+    and drops (user, gig) pairs that were already sent or are still queued. Yields (user_id, user_email, gigs) like
+    iter_pending_notifications, in the same order.
+    """
+    gigs = db.session.execute(
+        select(*_NOTIFICATION_GIG_COLUMNS)
+        .where(Gig.id == any_(list(gig_ids)), Gig.published_at >= window_start)
+        .order_by(Gig.published_at.desc(), Gig.id.desc())
+    ).all()
+    matches = subscriber_index.match(gigs)
+    batch_gig_ids = [gig.id for gig in gigs]
+    keyword_matches = defaultdict(set)
+    for user_id, gig_id in db.session.execute(
+            select(GigKeywordMatch.user_id, GigKeywordMatch.gig_id)
+            .where(GigKeywordMatch.gig_id == any_(batch_gig_ids))):
+        keyword_matches[user_id].add(gig_id)
+    for user_id, matched_ids in keyword_matches.items():
+        matched_ids |= {gig.id for gig in matches.get(user_id, ())}
+        matches[user_id] = [gig for gig in gigs if gig.id in matched_ids]
+    if not matches:
+        return
+
+    handled = set(db.session.execute(
+        select(SentNotification.user_id, SentNotification.gig_id)
+        .where(SentNotification.gig_id == any_(batch_gig_ids),
+               SentNotification.sent_at >= window_start - SENT_AT_SKEW_MARGIN)
+    ).all())
+    queued_pairs = (
+        select(NotificationOutbox.user_id, func.unnest(NotificationOutbox.gig_ids).label("gig_id"))
+        .where(NotificationOutbox.status.in_(ACTIVE_STATUSES))
+        .subquery()
+    )
+    handled.update(db.session.execute(
+        select(queued_pairs.c.user_id, queued_pairs.c.gig_id)
+        .where(queued_pairs.c.gig_id == any_(batch_gig_ids))
+    ).all())
+    emails = dict(db.session.execute(
+        select(User.id, User.email).where(User.id == any_(list(matches)), User.is_active == True)
+    ).all())
+
+    for user_id in sorted(matches):
+        user_email = emails.get(user_id)
+        user_gigs = [gig for gig in matches[user_id] if (user_id, gig.id) not in handled]
+        if user_email and user_gigs:
+            yield user_id, user_email, user_gigs
+
+
+def enqueue_pending_notifications(db, window_start, gig_ids=None, subscriber_index=None):
+    """
+    Selection phase: renders one email per user with pending gigs and
+    queues them in the outbox in a single transaction. A transaction-level
+    advisory lock serializes concurrent runs, so the same gigs are never
+    queued twice. `gig_ids` limits the run to those gigs; with a
+    `subscriber_index` they are matched through the index instead of the
+    pending-notifications join. Returns the number of queued emails.
+    """
+    db.session.execute(select(func.pg_advisory_xact_lock(OUTBOX_ENQUEUE_LOCK_ID)))
+    if gig_ids is not None and subscriber_index is not None:
+        pending = iter_index_matches(db, subscriber_index, window_start, gig_ids)
+    else:
+        pending = iter_pending_notifications(db, window_start, gig_ids)
+
+    queued = 0
+    messages = []
+    card_cache = {}  # Rendered gig cards shared by every email of this run
+    for user_id, user_email, gigs_to_notify in pending:
+        logger.info(f"Found {len(gigs_to_notify)} new gigs for user {user_id} ({user_email}).")
+        messages.append({
+            "user_id": user_id,
+            "recipient_email": user_email,
+            "subject": f"New Gig Alerts from StreamLance ({len(gigs_to_notify)} new matches!)",
+            "body_html": format_gigs_for_email(gigs_to_notify, card_cache),  # Format gigs into an HTML email body
+            "gig_ids": [gig.id for gig in gigs_to_notify],
+        })
+        if len(messages) >= OUTBOX_INSERT_BATCH_SIZE:
+            queued += enqueue_messages(db, messages)
+            messages = []
+    queued += enqueue_messages(db, messages)
+    db.session.commit()  # Publishes every queued email at once and releases the lock
+    return queued
+
 
 def send_notifications(app_instance):  # Now accepts app_instance
     """
     Sends email notifications to users based on their preferences and new gigs.
     This function expects a Flask application instance to be passed.
+    Rendered emails are queued in the notification outbox first, then
+    delivered from it; failed sends stay queued and are retried with backoff.
     """
     logger.info(f"--- Starting Notification Process ---")
 
@@ -22,64 +214,40 @@ def send_notifications(app_instance):  # Now accepts app_instance
     db = app_instance.db
 
     try:
-        # Get all active users who have set preferences
-        # Use the directly imported User model
-        users = db.session.query(User).filter(User.is_active == True).all()  # <--- UPDATED LINE
-
-        for user in users:
-            user_preferences = [p.category_name for p in
-                                user.preferences]  # Get category names from UserPreference objects
-            user_email = user.email
-
-            if not user_preferences:
-                logger.info(f"User {user.id} ({user_email}) has no preferences set. Skipping notifications.")
-                continue
-
-            # Define the time window for new gigs.
-            notification_window_start = datetime.utcnow() - timedelta(hours=2)
-
-            # Find gigs matching preferences that haven't been sent to this user yet
-            # Use the directly imported Gig and SentNotification models
-            gigs_to_notify = db.session.query(Gig).outerjoin(
-                SentNotification,
-                (SentNotification.gig_id == Gig.id) & (SentNotification.user_id == user.id)
-            ).filter(
-                Gig.category.in_(user_preferences),
-                Gig.published_at >= notification_window_start,
-                SentNotification.id.is_(None)
-                # Crucial: only select gigs NOT yet linked to this user in SentNotification
-            ).order_by(Gig.published_at.desc()).all()
-
-            if gigs_to_notify:
-                logger.info(f"Found {len(gigs_to_notify)} new gigs for user {user.id} ({user_email}).")
-
-                # Format gigs into an HTML email body
-                email_body_html = format_gigs_for_email(gigs_to_notify)
-
-                subject = f"New Gig Alerts from StreamLance ({len(gigs_to_notify)} new matches!)"
-
-                # Send the email
-                if send_email(user_email, subject, email_body_html):
-                    # Record the sent notifications in the database
-                    for gig in gigs_to_notify:
-                        try:
-                            new_notification = SentNotification(user_id=user.id, gig_id=gig.id)  # <--- UPDATED LINE
-                            db.session.add(new_notification)
-                        except Exception as e:  # Catch any error during add/commit for a single notification
-                            db.session.rollback()
-                            logger.warning(
-                                f"Failed to record notification for user {user.id}, gig {gig.id}: {e}. Skipping this record.")
-                            continue  # Continue to next gig if this one failed
-                    db.session.commit()  # Commit all new additions for this user
-                    logger.info(
-                        f"Successfully sent and recorded notifications for {len(gigs_to_notify)} gigs to {user_email}.")
-                else:
-                    logger.error(f"Failed to send email to {user_email}. Notifications not recorded for this run.")
-            else:
-                logger.info(
-                    f"No new matching gigs for user {user.id} ({user_email}) in the last 2 hours that haven't been sent.")
+        # Define the time window for new gigs.
+        notification_window_start = datetime.utcnow() - timedelta(hours=NOTIFICATION_WINDOW_HOURS)
+
+        queued = enqueue_pending_notifications(db, notification_window_start)
+        if queued:
+            logger.info(f"Queued {queued} notification emails in the outbox.")
+        else:
+            logger.info(f"No users have new matching gigs in the last {NOTIFICATION_WINDOW_HOURS} hours that haven't been sent.")
+
+        # Drain the outbox here as well; standalone workers (python -m notification.outbox) may share the work
+        delivered, failed = deliver_outbox(db)
+        if delivered or failed:
+            logger.info(f"Outbox delivery finished: {delivered} delivered, {failed} failed or rescheduled.")
 
     except Exception as e:
         db.session.rollback()  # Rollback any pending changes if an error occurs
         logger.error(f"An error occurred during notification process: {e}", exc_info=True)
 
+
+def notify_new_gigs(app_instance, gig_ids, subscriber_index=None):
+    """
+    Event-driven counterpart of send_notifications: evaluates only the given
+    newly loaded gigs against user preferences, queues the resulting emails
+    and delivers them. The periodic sweep still catches anything missed here.
+    A loaded `subscriber_index` turns matching into one lookup per gig.
+    """
+    db = app_instance.db
+    try:
+        window_start = datetime.utcnow() - timedelta(hours=NOTIFICATION_WINDOW_HOURS)
+        queued = enqueue_pending_notifications(db, window_start, gig_ids, subscriber_index)
+        logger.info(f"{len(gig_ids)} new gigs evaluated; queued {queued} notification emails.")
+        if queued:
+            delivered, failed = deliver_outbox(db)
+            logger.info(f"Outbox delivery finished: {delivered} delivered, {failed} failed or rescheduled.")
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"An error occurred while notifying about new gigs: {e}", exc_info=True)
@@ -0,0 +1,288 @@
+"""
+Durable outbox for notification emails.
+
+The notifier renders each user's email and inserts it into
+'notification_outbox'. Delivery workers claim due messages with
+SELECT ... FOR UPDATE SKIP LOCKED, send them through an EmailDeliveryService
+and mark them delivered (recording sent_notifications in the same
+transaction) or reschedule them with exponential backoff. Several worker
+processes can drain the same outbox, and messages claimed by a worker that
+died are picked up again once their claim times out.
+
+Usage (standalone worker):
+    python -m notification.outbox [--once] [--batch-size N] [--poll-seconds N]
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+from concurrent.futures import as_completed
+from datetime import timedelta
+
+from sqlalchemy import select, update, insert, func, or_, and_, exists, literal, Integer
+from sqlalchemy.dialects.postgresql import array
+
+from app.models import NotificationOutbox, SentNotification
+from notification.email_delivery import EmailDeliveryService
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_CLAIM_BATCH_SIZE = int(os.getenv("OUTBOX_CLAIM_BATCH_SIZE", 100))  # Messages claimed per round trip
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 5))  # After this many failures a message is marked failed
+OUTBOX_RETRY_BASE_SECONDS = int(os.getenv("OUTBOX_RETRY_BASE_SECONDS", 60))  # First retry delay, doubled per attempt
+OUTBOX_RETRY_MAX_SECONDS = int(os.getenv("OUTBOX_RETRY_MAX_SECONDS", 3600))  # Cap on the retry delay
+OUTBOX_CLAIM_TIMEOUT_SECONDS = int(os.getenv("OUTBOX_CLAIM_TIMEOUT_SECONDS", 900))  # Reclaim messages of dead workers
+OUTBOX_POLL_SECONDS = int(os.getenv("OUTBOX_POLL_SECONDS", 30))  # Standalone worker idle sleep
+SENT_NOTIFICATIONS_LOCK_NAMESPACE = 7_340_002  # First pg_advisory_xact_lock key; the second is the user id
+
+STATUS_PENDING = "pending"
+STATUS_SENDING = "sending"
+STATUS_DELIVERED = "delivered"
+STATUS_FAILED = "failed"
+ACTIVE_STATUSES = (STATUS_PENDING, STATUS_SENDING)  # Messages whose gigs must not be queued again
+
+
+def enqueue_messages(db, messages):
+    """
+    Adds rendered messages to the outbox with one multi-row INSERT on
+    db.session, without committing. Each message is a dict with user_id,
+    recipient_email, subject, body_html and gig_ids. Returns the count.
+    """
+    if not messages:
+        return 0
+    db.session.execute(insert(NotificationOutbox), messages)
+    return len(messages)
+
+
+def claim_messages(db, limit=OUTBOX_CLAIM_BATCH_SIZE):
+    """
+    Claims up to `limit` due messages for this worker and commits the claim.
+    Rows locked by other workers are skipped, so concurrent workers never
+    claim the same message. Messages left in 'sending' for longer than
+    OUTBOX_CLAIM_TIMEOUT_SECONDS are considered abandoned and claimed again.
+    """
+    due = (
+        select(NotificationOutbox.id)
+        .where(or_(
+            and_(NotificationOutbox.status == STATUS_PENDING,
+                 NotificationOutbox.next_attempt_at <= func.now()),
+            and_(NotificationOutbox.status == STATUS_SENDING,
+                 NotificationOutbox.locked_at < func.now() - timedelta(seconds=OUTBOX_CLAIM_TIMEOUT_SECONDS)),
+        ))
+        .order_by(NotificationOutbox.next_attempt_at, NotificationOutbox.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    stmt = (
+        update(NotificationOutbox)
+        .where(NotificationOutbox.id.in_(due))
+        .values(status=STATUS_SENDING, locked_at=func.now(), attempts=NotificationOutbox.attempts + 1)
+        .returning(
+            NotificationOutbox.id,
+            NotificationOutbox.user_id,
+            NotificationOutbox.recipient_email,
+            NotificationOutbox.subject,
+            NotificationOutbox.body_html,
+            NotificationOutbox.gig_ids,
+            NotificationOutbox.attempts,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    messages = db.session.execute(stmt).all()
+    db.session.commit()
+    return messages
+
+
+def record_sent_notifications(db, user_id, gig_ids):
+    """
+    Records delivered gigs for a user with one INSERT ... SELECT and commits.
+    Pairs that are already recorded are skipped, so a retry never fails the
+    batch or duplicates rows. Returns the number of new rows.
+
+    sent_notifications is partitioned by sent_at and cannot carry a unique
+    (user_id, gig_id) constraint, so the NOT EXISTS check is the only thing
+    preventing duplicates. It is safe only while no two transactions record
+    the same user's gigs concurrently: mark_delivered holds the claimed
+    outbox row, and every call takes a transaction-level advisory lock on
+    (SENT_NOTIFICATIONS_LOCK_NAMESPACE, user_id) before checking, so callers
+    outside the outbox are serialized too.
+    """
+    if not gig_ids:
+        return 0
+    db.session.execute(select(func.pg_advisory_xact_lock(SENT_NOTIFICATIONS_LOCK_NAMESPACE, user_id)))
+    new_gigs = select(func.unnest(array(sorted(set(gig_ids)), type_=Integer)).label("gig_id")).subquery()
+    stmt = insert(SentNotification).from_select(
+        ["user_id", "gig_id"],
+        select(literal(user_id), new_gigs.c.gig_id).where(
+            ~exists().where(SentNotification.user_id == user_id, SentNotification.gig_id == new_gigs.c.gig_id)
+        )
+    )
+    result = db.session.execute(stmt)
+    db.session.commit()
+    return result.rowcount
+
+
+def _still_claimed(message):
+    """
+    WHERE clause matching a message only while this worker's claim holds:
+    a message reclaimed after OUTBOX_CLAIM_TIMEOUT_SECONDS has a higher
+    attempt count, and a finished one is no longer 'sending'.
+    """
+    return and_(NotificationOutbox.id == message.id,
+                NotificationOutbox.status == STATUS_SENDING,
+                NotificationOutbox.attempts == message.attempts)
+
+
+def mark_delivered(db, message):
+    """
+    Marks a claimed message delivered and records its gigs, in one
+    transaction. Returns False, recording nothing, if the claim was lost to
+    another worker in the meantime.
+    """
+    result = db.session.execute(
+        update(NotificationOutbox)
+        .where(_still_claimed(message))
+        .values(status=STATUS_DELIVERED, delivered_at=func.now(), locked_at=None, last_error=None)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        db.session.rollback()
+        logger.warning(f"Outbox message {message.id} was reclaimed by another worker before it was marked delivered.")
+        return False
+    record_sent_notifications(db, message.user_id, message.gig_ids)  # Commits both statements
+    return True
+
+
+def retry_delay_seconds(attempts):
+    """Exponential backoff with +/-20% jitter, so retries from many workers spread out."""
+    delay = min(OUTBOX_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), OUTBOX_RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def mark_failed(db, message, error):
+    """
+    Reschedules a claimed message after a failed send, or marks it failed
+    once it has used up OUTBOX_MAX_ATTEMPTS. A failed message no longer
+    blocks its gigs, so a later notification run can queue them again.
+    Returns False, changing nothing, if the claim was lost to another worker
+    (which may already have delivered the message).
+    """
+    giving_up = message.attempts >= OUTBOX_MAX_ATTEMPTS
+    if giving_up:
+        values = {"status": STATUS_FAILED}
+    else:
+        delay = retry_delay_seconds(message.attempts)
+        values = {"status": STATUS_PENDING,
+                  "next_attempt_at": func.now() + timedelta(seconds=delay)}
+    result = db.session.execute(
+        update(NotificationOutbox)
+        .where(_still_claimed(message))
+        .values(locked_at=None, last_error=str(error), **values)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    if result.rowcount == 0:
+        logger.warning(f"Outbox message {message.id} was reclaimed by another worker; not rescheduling it.")
+        return False
+
+    if giving_up:
+        logger.error(f"Giving up on outbox message {message.id} to {message.recipient_email} "
+                     f"after {message.attempts} attempts: {error}")
+    else:
+        logger.warning(f"Outbox message {message.id} to {message.recipient_email} failed "
+                       f"(attempt {message.attempts}); retrying in {delay:.0f}s.")
+    return True
+
+
+def deliver_outbox(db, delivery=None, batch_size=OUTBOX_CLAIM_BATCH_SIZE):
+    """
+    Delivers every message that is currently due, batch by batch, and
+    returns (delivered, failed). Messages rescheduled for a later retry are
+    left for a later call. Emails are sent on the delivery service's threads;
+    outbox updates are made here, since db.session must stay on one thread.
+    Delivery is at-least-once: a worker dying between sending and marking a
+    message means it is sent again after OUTBOX_CLAIM_TIMEOUT_SECONDS.
+    """
+    own_delivery = delivery is None
+    if own_delivery:
+        delivery = EmailDeliveryService()
+
+    delivered = failed = 0
+    try:
+        if delivery.settings is None:
+            logger.error("SMTP is not configured; leaving outbox messages queued.")
+            return delivered, failed
+
+        while True:
+            messages = claim_messages(db, batch_size)
+            if not messages:
+                break
+            futures = {
+                delivery.submit(message.recipient_email, message.subject, message.body_html): message
+                for message in messages
+            }
+            for future in as_completed(futures):
+                message = futures[future]
+                try:
+                    sent, error = future.result(), "SMTP delivery failed; see email delivery log"
+                except Exception as e:
+                    sent, error = False, e  # Release the claim now rather than after the claim timeout
+                try:
+                    if sent:
+                        if mark_delivered(db, message):
+                            delivered += 1
+                            logger.info(f"Delivered and recorded {len(message.gig_ids)} gigs to {message.recipient_email}.")
+                    elif mark_failed(db, message, error):
+                        failed += 1
+                except Exception as e:
+                    db.session.rollback()
+                    logger.warning(f"Failed to update outbox message {message.id}: {e}.")
+    finally:
+        if own_delivery:
+            delivery.close()
+
+    return delivered, failed
+
+
+def run_outbox_worker(app_instance, batch_size=OUTBOX_CLAIM_BATCH_SIZE, poll_seconds=OUTBOX_POLL_SECONDS, once=False):
+    """Drains the outbox, then polls for newly queued or retryable messages until interrupted."""
+    db = app_instance.db
+    with app_instance.app_context(), EmailDeliveryService() as delivery:
+        while True:
+            try:
+                delivered, failed = deliver_outbox(db, delivery, batch_size)
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Outbox delivery round failed: {e}", exc_info=True)
+                delivered = failed = 0
+            if delivered or failed:
+                logger.info(f"Outbox round finished: {delivered} delivered, {failed} failed.")
+            if once:
+                return
+            if not delivered and not failed:
+                time.sleep(poll_seconds)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Deliver queued notification emails from the outbox.")
+    parser.add_argument("--batch-size", type=int, default=OUTBOX_CLAIM_BATCH_SIZE,
+                        help=f"Messages claimed per round trip (default {OUTBOX_CLAIM_BATCH_SIZE}).")
+    parser.add_argument("--poll-seconds", type=int, default=OUTBOX_POLL_SECONDS,
+                        help=f"Sleep between polls when the outbox is empty (default {OUTBOX_POLL_SECONDS}).")
+    parser.add_argument("--once", action="store_true",
+                        help="Deliver the messages that are due now and exit.")
+    args = parser.parse_args(argv)
+
+    from app import create_app
+    try:
+        run_outbox_worker(create_app(), batch_size=args.batch_size, poll_seconds=args.poll_seconds, once=args.once)
+        return 0
+    except KeyboardInterrupt:
+        logger.info("Outbox worker stopped by user (Ctrl+C).")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
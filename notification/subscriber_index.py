@@ -0,0 +1,131 @@
+"""
+In-memory inverted index from category name to the ids of the active users
+subscribed to it, used to fan new gigs out to their subscribers without
+scanning users.
+
+The index is loaded from 'user_preferences' in one query and kept current
+per user: set_user_preferences announces the changed user id on
+PREFERENCES_CHANGED_CHANNEL, and the listener in notification.gig_events
+calls refresh_users for those ids.
+"""
+import logging
+import threading
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+PREFERENCES_CHANGED_CHANNEL = "user_preferences_changed"  # Payload: the id of the user whose preferences changed
+
+_ACTIVE_PREFERENCES_SQL = """
+    SELECT p.category_name, p.user_id
+    FROM user_preferences p
+    JOIN users u ON u.id = p.user_id
+    WHERE u.is_active = TRUE
+"""
+
+
+class CategorySubscriberIndex:
+    """
+    Maps each category to a sorted array('i') of active subscriber ids.
+
+    Readers never lock: updates build new arrays and swap them in, so an
+    array returned by subscribers() is never modified afterwards. Writers
+    (load, refresh_users) are serialized by a lock.
+    """
+
+    def __init__(self):
+        self._users_by_category = {}
+        self._categories_by_user = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Number of indexed (active, subscribed) users."""
+        return len(self._categories_by_user)
+
+    def load(self, conn):
+        """Rebuilds the whole index from the database (psycopg2 connection)."""
+        with conn.cursor() as cursor:
+            cursor.execute(_ACTIVE_PREFERENCES_SQL)
+            rows = cursor.fetchall()
+        if not conn.autocommit:
+            conn.rollback()  # End the read-only transaction
+
+        user_lists = defaultdict(list)
+        categories_by_user = defaultdict(set)
+        for category, user_id in rows:
+            user_lists[category].append(user_id)
+            categories_by_user[user_id].add(category)
+
+        with self._lock:
+            self._users_by_category = {
+                category: array('i', sorted(user_ids)) for category, user_ids in user_lists.items()
+            }
+            self._categories_by_user = {user_id: frozenset(cats) for user_id, cats in categories_by_user.items()}
+        logger.info(f"Subscriber index loaded: {len(self._categories_by_user)} users "
+                    f"across {len(self._users_by_category)} categories.")
+
+    def refresh_users(self, conn, user_ids):
+        """
+        Re-reads the preferences of the given users and updates only the
+        categories they joined or left. Users that became inactive or have no
+        preferences are dropped from the index.
+        """
+        user_ids = list({int(user_id) for user_id in user_ids})
+        if not user_ids:
+            return
+        with conn.cursor() as cursor:
+            cursor.execute(_ACTIVE_PREFERENCES_SQL + " AND p.user_id = ANY(%s)", (user_ids,))
+            rows = cursor.fetchall()
+        if not conn.autocommit:
+            conn.rollback()
+
+        current = defaultdict(set)
+        for category, user_id in rows:
+            current[user_id].add(category)
+
+        with self._lock:
+            users_by_category = dict(self._users_by_category)
+            changed = {}  # category -> list copy being edited
+            for user_id in user_ids:
+                old = self._categories_by_user.get(user_id, frozenset())
+                new = frozenset(current.get(user_id, ()))
+                for category in old - new:
+                    members = changed.setdefault(category, list(users_by_category.get(category, ())))
+                    position = bisect_left(members, user_id)
+                    if position < len(members) and members[position] == user_id:
+                        del members[position]
+                for category in new - old:
+                    members = changed.setdefault(category, list(users_by_category.get(category, ())))
+                    position = bisect_left(members, user_id)
+                    if position == len(members) or members[position] != user_id:
+                        members.insert(position, user_id)
+                if new:
+                    self._categories_by_user[user_id] = new
+                else:
+                    self._categories_by_user.pop(user_id, None)
+
+            for category, members in changed.items():
+                if members:
+                    users_by_category[category] = array('i', members)
+                else:
+                    users_by_category.pop(category, None)
+            self._users_by_category = users_by_category
+        logger.info(f"Subscriber index refreshed for {len(user_ids)} users ({len(changed)} categories changed).")
+
+    def subscribers(self, category):
+        """Sorted array of active user ids subscribed to `category` (empty if none)."""
+        return self._users_by_category.get(category, array('i'))
+
+    def match(self, gigs):
+        """
+        Fans gigs out to subscribers with one index lookup per gig. Returns
+        {user_id: [gigs]}, each list keeping the order of `gigs`.
+        """
+        users_by_category = self._users_by_category  # One consistent snapshot for the whole batch
+        matches = defaultdict(list)
+        for gig in gigs:
+            for user_id in users_by_category.get(gig.category, ()):
+                matches[user_id].append(gig)
+        return matches
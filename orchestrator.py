@@ -1,20 +1,31 @@
+import os
+import json
 import time
 import sys
 import schedule
 import logging
+import threading
 from datetime import datetime, timedelta
 
 # Assuming these functions are in the specified paths
-from etl.extract.freelancer_extractor import extract_freelancer_gigs
+from etl.extract.async_extractor import fetch_all_feeds, iter_feed_gigs
+from etl.extract.feed_registry import get_feeds
+from etl.extract.feed_state import load_feed_states, save_feed_state
+from etl.extract.seen_gigs import SeenGigs
 from etl.transform.data_transformer import transform_gig_data
 from etl.load.db_loader import load_gigs_to_db
-from utils.db_utils import get_db_connection, close_db_connection
+from etl.pipeline import run_streaming_pipeline
+from etl.partition_maintenance import run_partition_maintenance
+from utils.db_utils import get_db_connection, close_db_connection, close_db_pool
 
 # NEW: Import the send_notifications function from the new notifier module
-from notification.notifier import send_notifications
+from notification.notifier import send_notifications, notify_new_gigs
+from notification.gig_events import listen_for_new_gigs
+from notification.subscriber_index import CategorySubscriberIndex
 
 # NEW: Import create_app from your Flask application for context management
 from app import create_app
+from app.cache import invalidate_api_cache
 
 # Removed: from app.models import db as flask_db_instance - no longer needed here
 
@@ -23,14 +34,34 @@ from app import create_app
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-FREELANCER_RSS_FEED = "https://www.freelancer.com/rss.xml"
 SLEEP_INTERVAL_SECONDS_SCHEDULE_CHECK = 60  # How often the scheduler checks for pending tasks (every minute)
 ETL_RUN_INTERVAL_HOURS = 1  # How often the ETL process should run
+TRANSFORM_WORKERS = int(os.getenv("TRANSFORM_WORKERS", 1))  # >1 enables multi-process categorization
+TRANSFORM_CHUNK_SIZE = int(os.getenv("TRANSFORM_CHUNK_SIZE", 500))  # Gigs per worker task in parallel mode
+SEEN_GIGS_WINDOW_HOURS = int(os.getenv("SEEN_GIGS_WINDOW_HOURS", 48))  # Look-back of the already-stored filter
+SEEN_GIGS_MAX_LINKS = int(os.getenv("SEEN_GIGS_MAX_LINKS", 50000))  # Cap on remembered recent links
+FEED_MAX_CONCURRENCY = int(os.getenv("FEED_MAX_CONCURRENCY", 10))  # Feeds fetched at once
+FEED_PER_HOST_CONCURRENCY = int(os.getenv("FEED_PER_HOST_CONCURRENCY", 2))  # Concurrent requests per host
+FEED_PER_HOST_INTERVAL_SECONDS = float(os.getenv("FEED_PER_HOST_INTERVAL_SECONDS", 1.0))  # Min gap between requests to a host
+FEED_TIMEOUT_SECONDS = int(os.getenv("FEED_TIMEOUT_SECONDS", 30))  # Per-feed request timeout
+ETL_PIPELINE_MODE = os.getenv("ETL_PIPELINE_MODE", "batch")  # "batch" or "streaming"
+STREAMING_BATCH_SIZE = int(os.getenv("STREAMING_BATCH_SIZE", 500))  # Gigs per committed batch in streaming mode
+STREAMING_QUEUE_SIZE = int(os.getenv("STREAMING_QUEUE_SIZE", 4))  # Batches buffered between streaming stages
+LOAD_METHOD = os.getenv("LOAD_METHOD", "insert")  # "insert" (execute_values) or "copy" (COPY + staging merge)
+ETL_METRICS_PATH = os.getenv("ETL_METRICS_PATH")  # Optional JSON-lines file receiving per-run load metrics
+NOTIFY_ON_NEW_GIGS = os.getenv("NOTIFY_ON_NEW_GIGS", "true").lower() in ("1", "true", "yes")  # React to loader events
+PARTITION_MAINTENANCE_TIME = os.getenv("PARTITION_MAINTENANCE_TIME", "03:30")  # Daily run of etl.partition_maintenance (HH:MM)
 
 # Global variable to hold the Flask app instance and its context
 _flask_app_instance = None
 _flask_app_context = None
 
+# Already-stored gig filter, seeded from the database on the first ETL run
+_seen_gigs = None
+
+# Category -> subscribers index used to fan new gigs out; loaded and kept current by the listener thread
+_subscriber_index = CategorySubscriberIndex()
+
 
 def setup_flask_app_context():
     """
@@ -39,10 +70,12 @@ def setup_flask_app_context():
     """
     global _flask_app_instance, _flask_app_context
     if _flask_app_instance is None:
+        # The app (and its pooled SQLAlchemy engine) is created once and reused across runs
         _flask_app_instance = create_app()  # Create the Flask app instance
         # IMPORTANT: create_app() (from app/__init__.py) already calls db.init_app(_flask_app_instance).
         # We do NOT need to call db.init_app() again here.
 
+    if _flask_app_context is None:
         _flask_app_context = _flask_app_instance.app_context()
         _flask_app_context.push()
         logger.info("Flask app context pushed for orchestrator.")
@@ -51,21 +84,70 @@ def setup_flask_app_context():
 
 def teardown_flask_app_context():
     """
-    Tears down the Flask application context.
+    Tears down the Flask application context. The app instance is kept so
+    its connection pool survives between runs.
     """
-    global _flask_app_context, _flask_app_instance
+    global _flask_app_context
     if _flask_app_context:
         _flask_app_context.pop()
         _flask_app_context = None
-        _flask_app_instance = None  # Reset app instance as well
         logger.info("Flask app context popped.")
 
 
-def run_etl_process():
+def _save_feed_states(conn, fetch_results):
+    """
+    Persists the validators of successfully fetched feeds for the next conditional GET.
+    """
+    for result in fetch_results:
+        save_feed_state(conn, result["feed"]["url"], result["etag"], result["modified"])
+
+
+def _export_load_metrics(load_result):
+    """
+    Logs the load summary and, if ETL_METRICS_PATH is set, appends it there
+    as one JSON line per run.
+    """
+    metrics = load_result.as_dict()
+    metrics["finished_at"] = datetime.utcnow().isoformat()
+    logger.info(f"Load metrics: {json.dumps(metrics)}")
+    if ETL_METRICS_PATH:
+        try:
+            with open(ETL_METRICS_PATH, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(metrics) + '\n')
+        except OSError as e:
+            logger.warning(f"Could not write load metrics to {ETL_METRICS_PATH}: {e}")
+
+
+def _finish_load(conn, load_result, changed_feeds):
+    """
+    Reports the load outcome. Feed validators are only saved once the
+    feeds' contents are stored, so a failed run fetches the full feeds again.
+    Loads that inserted gigs also invalidate the API response cache.
+    """
+    _export_load_metrics(load_result)
+    if not load_result.ok:
+        logger.error(f"ETL Process failed while loading gigs: {load_result.error}")
+        return False
+
+    _save_feed_states(conn, changed_feeds)
+    if load_result.inserted:
+        try:
+            invalidate_api_cache(conn)  # Stats and trending figures changed
+        except Exception as e:
+            conn.rollback()
+            logger.warning(f"Could not invalidate the API response cache: {e}")
+    logger.info(f"ETL Process completed. Successfully loaded {load_result.inserted} new gigs "
+                f"({load_result.skipped} duplicates skipped).")
+    return True
+
+
+def run_etl_process(transform_workers=TRANSFORM_WORKERS, transform_chunk_size=TRANSFORM_CHUNK_SIZE):
     """
     Orchestrates the ETL pipeline for gig data.
     This function will be called by the scheduler.
+    `transform_workers` > 1 categorizes gigs on a process pool.
     """
+    global _seen_gigs
     logger.info(f"--- Starting ETL Process at {time.strftime('%Y-%m-%d %H:%M:%S')} ---")
     conn = None
     try:
@@ -75,18 +157,55 @@ def run_etl_process():
             logger.error("Failed to get database connection. Aborting ETL.")
             return False
 
-        # 2. Extract Data
-        logger.info(f"Extracting gigs from {FREELANCER_RSS_FEED}...")
-        raw_gigs = extract_freelancer_gigs(FREELANCER_RSS_FEED)
-        logger.info(f"Extracted {len(raw_gigs)} gigs.")
+        # 2. Extract Data (concurrent conditional GETs against the validators from the last run)
+        feeds = get_feeds()
+        logger.info(f"Extracting gigs from {len(feeds)} feeds...")
+        feed_states = load_feed_states(conn, [feed["url"] for feed in feeds])
+
+        fetch_results = fetch_all_feeds(
+            feeds, feed_states,
+            max_concurrency=FEED_MAX_CONCURRENCY,
+            per_host_concurrency=FEED_PER_HOST_CONCURRENCY,
+            per_host_interval=FEED_PER_HOST_INTERVAL_SECONDS,
+            timeout=FEED_TIMEOUT_SECONDS
+        )
+        failed_feeds = [result for result in fetch_results if result["error"]]
+        if failed_feeds and len(failed_feeds) == len(fetch_results):
+            logger.error(f"Fetching failed for all {len(failed_feeds)} feeds. Aborting ETL.")
+            return False
+
+        changed_feeds = [result for result in fetch_results if result["status"] == 200 and not result["error"]]
+        if not changed_feeds:
+            logger.info("No feed modified since last run (HTTP 304 or fetch errors). ETL finished.")
+            return True
+
+        # Seeded on the first run that has entries to check, not on runs that end at a 304
+        if _seen_gigs is None:
+            _seen_gigs = SeenGigs(window_hours=SEEN_GIGS_WINDOW_HOURS, max_links=SEEN_GIGS_MAX_LINKS)
+            _seen_gigs.seed_from_db(conn)
+
+        if ETL_PIPELINE_MODE == "streaming":
+            # Entries flow through categorization into the loader in committed batches
+            logger.info(f"Streaming gigs from {len(changed_feeds)} changed feeds in batches of {STREAMING_BATCH_SIZE}...")
+            load_result = run_streaming_pipeline(
+                iter_feed_gigs(changed_feeds, seen_gigs=_seen_gigs), conn,
+                batch_size=STREAMING_BATCH_SIZE, queue_size=STREAMING_QUEUE_SIZE, seen_gigs=_seen_gigs,
+                load_method=LOAD_METHOD
+            )
+            return _finish_load(conn, load_result, changed_feeds)
+
+        raw_gigs = list(iter_feed_gigs(changed_feeds, seen_gigs=_seen_gigs))
+        logger.info(f"Extracted {len(raw_gigs)} gigs from {len(changed_feeds)} changed feeds.")
 
         if not raw_gigs:
+            _save_feed_states(conn, changed_feeds)
             logger.info("No new raw gigs extracted. ETL finished.")
             return True
 
         # 3. Transform Data
         logger.info(f"Transforming {len(raw_gigs)} gigs...")
-        transformed_gigs = transform_gig_data(raw_gigs)
+        transformed_gigs = transform_gig_data(raw_gigs, workers=transform_workers,
+                                              chunk_size=transform_chunk_size)
         logger.info(f"Transformed {len(transformed_gigs)} gigs.")
 
         if not transformed_gigs:
@@ -95,9 +214,10 @@ def run_etl_process():
 
         # 4. Load Data
         logger.info(f"Loading {len(transformed_gigs)} gigs into the database...")
-        loaded_count = load_gigs_to_db(transformed_gigs, conn)
-        logger.info(f"ETL Process completed. Successfully loaded {loaded_count} new gigs.")
-        return True
+        load_result = load_gigs_to_db(transformed_gigs, conn, method=LOAD_METHOD)
+        if load_result.ok:
+            _seen_gigs.mark_stored(transformed_gigs)
+        return _finish_load(conn, load_result, changed_feeds)
 
     except Exception as e:
         logger.error(f"An unexpected error occurred during ETL: {e}", exc_info=True)
@@ -105,10 +225,31 @@ def run_etl_process():
     finally:
         if conn:
             close_db_connection(conn)
-            logger.info("Database connection closed (psycopg2).")
+            logger.info("Database connection returned to pool (psycopg2).")
         logger.info("Orchestrator finished ETL run.")
 
 
+def run_partition_maintenance_job():
+    """
+    Creates upcoming monthly partitions of gigs and sent_notifications and
+    retires the expired ones (see etl/partition_maintenance.py).
+    """
+    conn = get_db_connection()
+    if not conn:
+        logger.error("Failed to get database connection. Skipping partition maintenance.")
+        return
+    try:
+        summary = run_partition_maintenance(conn)
+        for parent, changes in summary.items():
+            if changes["created"] or changes["retired"]:
+                logger.info(f"Partition maintenance of {parent}: created {changes['created']}, retired {changes['retired']}.")
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"Partition maintenance failed: {e}", exc_info=True)
+    finally:
+        close_db_connection(conn)
+
+
 # Wrapper function for scheduled notifications to manage Flask context
 def scheduled_send_notifications_wrapper():
     """
@@ -121,6 +262,24 @@ def scheduled_send_notifications_wrapper():
         teardown_flask_app_context()
 
 
+def _notify_new_gigs_in_context(gig_ids):
+    """Runs the event-driven notifier on the listener thread, in its own app context."""
+    with _flask_app_instance.app_context():
+        notify_new_gigs(_flask_app_instance, gig_ids, _subscriber_index)
+
+
+def start_new_gig_listener():
+    """
+    Starts a background thread that notifies users as soon as the loader
+    announces new gigs. Returns the event that stops it.
+    """
+    stop_event = threading.Event()
+    threading.Thread(target=listen_for_new_gigs, name="new-gig-listener", daemon=True,
+                     args=(_notify_new_gigs_in_context, stop_event),
+                     kwargs={"subscriber_index": _subscriber_index}).start()
+    return stop_event
+
+
 def main():
     """
     Main function to set up and run the scheduled ETL and Notification processes.
@@ -132,8 +291,13 @@ def main():
 
     # Schedule the Notification process to run every hour, at :10 past the hour
     # The wrapper ensures the Flask context is handled correctly for the scheduled call
+    # With NOTIFY_ON_NEW_GIGS this sweep is a safety net; new gigs are normally notified as they load
     schedule.every(ETL_RUN_INTERVAL_HOURS).hours.at(":10").do(scheduled_send_notifications_wrapper)
 
+    # Keep monthly partitions created ahead and apply the retention policy, daily and on start
+    schedule.every().day.at(PARTITION_MAINTENANCE_TIME).do(run_partition_maintenance_job)
+    run_partition_maintenance_job()
+
     # Perform initial ETL run immediately on start
     logger.info("Performing initial ETL run...")
     run_etl_process()
@@ -147,6 +311,10 @@ def main():
     finally:
         teardown_flask_app_context()
 
+    listener_stop_event = None
+    if NOTIFY_ON_NEW_GIGS:
+        listener_stop_event = start_new_gig_listener()
+
     logger.info("Initial ETL and Notification runs completed. Entering scheduling loop.")
 
     # Keep the script running to check the schedule
@@ -156,6 +324,9 @@ def main():
             time.sleep(SLEEP_INTERVAL_SECONDS_SCHEDULE_CHECK)  # Wait for a minute before checking again
         except KeyboardInterrupt:
             logger.info("\nOrchestrator stopped by user (Ctrl+C). Exiting.")
+            if listener_stop_event:
+                listener_stop_event.set()
+            close_db_pool()
             sys.exit(0)  # Exit cleanly
         except Exception as e:
             logger.error(f"Error in scheduler loop: {e}", exc_info=True)
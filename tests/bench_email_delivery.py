@@ -0,0 +1,71 @@
+"""
+Throughput benchmark of notification delivery against a local aiosmtpd
+server (tests/smtp_server.py) whose EHLO is slowed down to model a remote
+provider's handshake. Not collected by pytest; run it with
+    python -m tests.bench_email_delivery [--messages 200] [--ehlo-delay 0.05] [--workers 1 4 8]
+
+Compares one send_email session per recipient with EmailDeliveryService's
+pooled sessions at each worker count (rate limit disabled).
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+from notification.email_delivery import EmailDeliveryService
+from notification.email_sender import send_email
+from tests.smtp_server import RecordingHandler, SMTPStandIn
+
+
+def _serial_send_email(server, recipients):
+    settings = server.settings()
+    os.environ.update({
+        "SENDER_EMAIL": settings["sender_email"], "SMTP_SERVER": settings["server"],
+        "SMTP_PORT": str(settings["port"]), "SMTP_USERNAME": settings["username"],
+        "SMTP_PASSWORD": settings["password"], "SMTP_USE_TLS": "false",
+    })
+    return sum(send_email(recipient, "New gigs", "<p>hello</p>") for recipient in recipients)
+
+
+def _pooled(server, recipients, workers):
+    with EmailDeliveryService(workers=workers, rate_per_second=0, settings=server.settings()) as delivery:
+        futures = [delivery.submit(recipient, "New gigs", "<p>hello</p>") for recipient in recipients]
+    return sum(future.result() for future in futures)
+
+
+def run_benchmark(messages, ehlo_delay, worker_counts):
+    """Returns a list of (name, delivered, seconds, logins)."""
+    recipients = [f"user{i}@example.invalid" for i in range(messages)]
+    runs = [("send_email, one session each", lambda server: _serial_send_email(server, recipients))]
+    for workers in worker_counts:
+        runs.append((f"EmailDeliveryService, {workers} workers",
+                     lambda server, workers=workers: _pooled(server, recipients, workers)))
+
+    results = []
+    for name, run in runs:
+        with SMTPStandIn(RecordingHandler(ehlo_delay=ehlo_delay)) as server:
+            started = time.perf_counter()
+            delivered = run(server)
+            results.append((name, delivered, time.perf_counter() - started, server.handler.logins))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time email delivery against a local SMTP server.")
+    parser.add_argument("--messages", type=int, default=200, help="Emails per run (default 200).")
+    parser.add_argument("--ehlo-delay", type=float, default=0.05,
+                        help="Seconds the server takes per EHLO (default 0.05).")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8],
+                        help="Worker counts to run EmailDeliveryService with (default 1 4 8).")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.ERROR)
+
+    for name, delivered, seconds, logins in run_benchmark(args.messages, args.ehlo_delay, args.workers):
+        print(f"{name:36s} {delivered:5d}/{args.messages} sent  {seconds:7.2f} s  "
+              f"{delivered / seconds:8.1f} msg/s  {logins:4d} logins")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Micro-benchmark of notification email rendering
+(notification.email_sender.format_gigs_for_email) for a notification run of
+synthetic emails drawn from a shared pool of gigs. Not collected by pytest;
+run it with
+    python -m tests.bench_email_render [--emails 10000] [--gigs 2000] [--max-gigs-per-email 60]
+
+Compares the uncached path (template file read and every card rendered for
+each email), the mtime-cached template alone, and the cached template with a
+per-run card cache as notifier.process_notifications uses it. The three
+paths are checked to render identical HTML first.
+"""
+import argparse
+import random
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from notification import email_sender
+from notification.email_sender import format_gigs_for_email
+
+Gig = namedtuple("Gig", "id title link description category published_at budget_amount budget_currency")
+CATEGORIES = ["Web Development", "Mobile Development", "Data Science & Analytics", "Design & Creative"]
+
+
+def synthetic_emails(emails, gigs, max_gigs_per_email, seed=0):
+    """`emails` gig lists, newest first, drawn from one pool of `gigs` gigs."""
+    rng = random.Random(seed)
+    now = datetime(2026, 10, 16, 12)
+    pool = [
+        Gig(i, f"Gig {i}: build a dashboard", f"https://example.invalid/gig/{i}",
+            "Looking for an experienced developer. " * rng.randint(1, 12), rng.choice(CATEGORIES),
+            now - timedelta(minutes=i), rng.choice([None, 50, 1200.5]), rng.choice([None, "USD"]))
+        for i in range(gigs)
+    ]
+    return [sorted(rng.sample(pool, rng.randint(1, max_gigs_per_email)), key=lambda gig: -gig.id)
+            for _ in range(emails)]
+
+
+def format_gigs_uncached(gigs):
+    """The rendering path before caching: read the template and render every card for each email."""
+    with open(email_sender.EMAIL_TEMPLATE_PATH, 'r', encoding='utf-8') as f:
+        template_html = f.read()
+    return template_html.replace('{{gigs_content}}', '\n'.join(email_sender._render_gig_card(gig) for gig in gigs))
+
+
+def _render_run(emails):
+    card_cache = {}  # One notification run
+    return (format_gigs_for_email(gigs, card_cache) for gigs in emails)
+
+
+# Each path renders the emails one at a time and keeps only the HTML's length,
+# so the timings are not dominated by holding hundreds of MB of rendered bodies
+RENDER_PATHS = [
+    ("uncached template and cards", lambda emails: (format_gigs_uncached(gigs) for gigs in emails)),
+    ("cached template", lambda emails: (format_gigs_for_email(gigs) for gigs in emails)),
+    ("cached template + card cache", _render_run),
+]
+
+
+def run_benchmark(emails, repeat=3):
+    """Returns a list of (name, best seconds) over `repeat` runs of each render path."""
+    outputs = [list(render(emails[:500])) for _, render in RENDER_PATHS]
+    if any(output != outputs[0] for output in outputs[1:]):
+        raise AssertionError("render paths produce different HTML")
+
+    results = []
+    for name, render in RENDER_PATHS:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            sum(map(len, render(emails)))
+            timings.append(time.perf_counter() - started)
+        results.append((name, min(timings)))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time notification email rendering with and without caching.")
+    parser.add_argument("--emails", type=int, default=10_000, help="Emails per notification run (default 10000).")
+    parser.add_argument("--gigs", type=int, default=2_000, help="Gigs the emails are drawn from (default 2000).")
+    parser.add_argument("--max-gigs-per-email", type=int, default=60, help="Most gigs in one email (default 60).")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per path; the best is kept (default 3).")
+    args = parser.parse_args(argv)
+
+    emails = synthetic_emails(args.emails, args.gigs, args.max_gigs_per_email)
+    cards = sum(map(len, emails))
+    print(f"{len(emails)} emails, {cards} gig cards from {args.gigs} distinct gigs")
+    results = run_benchmark(emails, args.repeat)
+    uncached_seconds = results[0][1]
+    for name, seconds in results:
+        print(f"{name:30s} {seconds:7.3f} s  {len(emails) / seconds:9.0f} emails/s  "
+              f"{uncached_seconds / seconds:5.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
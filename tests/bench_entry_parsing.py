@@ -0,0 +1,99 @@
+"""
+Micro-benchmark of feed entry parsing (etl.extract.entry_parsing) over
+synthetic Freelancer.com entries. Not collected by pytest; run it with
+    python -m tests.bench_entry_parsing [--entries 100000]
+
+Reports the time to parse every entry's budget, to parse every entry's
+published date with a PublishedDateParser against trying each format in
+turn, and to run the whole Freelancer adapter.
+"""
+import argparse
+import contextlib
+import io
+import random
+import sys
+import time
+from datetime import datetime
+
+from etl.extract.entry_parsing import PUBLISHED_DATE_FORMATS, PublishedDateParser, parse_budget
+from etl.extract.freelancer_extractor import iter_freelancer_entries
+
+BUDGETS = [
+    "Budget: $30 - $250 USD", "Budget: €1,500", "Budget: £20-40", "Budget: ¥5000",
+    "Budget: ₹ 600 - ₹1,000 INR", "Budget: 100 CAD", "Budget: 100", "Budget: 1.2.3 USD", "",
+]
+PUBLISHED_SAMPLES = {
+    PUBLISHED_DATE_FORMATS[0]: "2026-10-16 12:00:{:02d}",
+    PUBLISHED_DATE_FORMATS[1]: "Fri, 16 Oct 2026 12:00:{:02d} +0000",
+    PUBLISHED_DATE_FORMATS[2]: "Fri, 16 Oct 2026 12:00:{:02d} GMT",
+}
+
+
+class _Entry(dict):
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+def synthetic_entries(count, published_format, seed=0):
+    """`count` entries with varied budgets, all dated in `published_format` (one feed)."""
+    rng = random.Random(seed)
+    sample = PUBLISHED_SAMPLES[published_format]
+    return [
+        _Entry(title=f"Gig {i}", link=f"https://example.invalid/gig/{i}",
+               summary=f"Description of project {i}. " * 3 + rng.choice(BUDGETS),
+               published=sample.format(i % 60), tags=[{"term": "Python"}])
+        for i in range(count)
+    ]
+
+
+def _parse_date_trying_each_format(text):
+    for date_format in PUBLISHED_DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format)
+        except ValueError:
+            continue
+    return None
+
+
+def _timed(function):
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # parse_budget warns about malformed budgets
+        function()
+    return (time.perf_counter() - started) * 1000
+
+
+def run_benchmark(count):
+    """Returns a list of (name, milliseconds)."""
+    results = []
+    entries = synthetic_entries(count, PUBLISHED_DATE_FORMATS[0])
+    summaries = [entry["summary"] for entry in entries]
+    results.append((f"parse_budget x{count}", _timed(lambda: [parse_budget(text) for text in summaries])))
+
+    for number, published_format in enumerate(PUBLISHED_DATE_FORMATS, start=1):
+        texts = [entry["published"] for entry in synthetic_entries(count, published_format)]
+        parser = PublishedDateParser()
+        results.append((f"dates format {number}, each format in turn",
+                        _timed(lambda: [_parse_date_trying_each_format(text) for text in texts])))
+        results.append((f"dates format {number}, PublishedDateParser",
+                        _timed(lambda: [parser.parse(text) for text in texts])))
+
+    entries = synthetic_entries(count, PUBLISHED_DATE_FORMATS[2])
+    results.append((f"iter_freelancer_entries x{count}", _timed(lambda: list(iter_freelancer_entries(entries)))))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time feed entry parsing over synthetic entries.")
+    parser.add_argument("--entries", type=int, default=100_000, help="Synthetic entries per run (default 100000).")
+    args = parser.parse_args(argv)
+
+    for name, milliseconds in run_benchmark(args.entries):
+        print(f"{name:48s} {milliseconds:9.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+Benchmark of /api/gigs/search on a large seeded table: the ranked, paged
+query the endpoint runs (app.routes._search_gigs_query, full-text search on
+the GIN-indexed search_vector and skill containment on the skills index)
+against an unindexed ILIKE scan for the same words. Not collected by pytest;
+run it with
+    python -m tests.bench_gig_search [--gigs 1000000] [--limit 20] [--repeat 5]
+
+Gigs are seeded inside one transaction that is always rolled back (as in
+tests/rollup_check.py); seeding a million rows fills search_vector and both
+GIN indexes and takes a few minutes. Before timing, each search is checked:
+results come in non-increasing rank, and pages 1-3 fetched one by one equal
+the first three pages fetched at once, without duplicates. Reported times
+are medians of --repeat runs for the first and the deepest allowed page.
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.dialects import postgresql
+
+from app.models import Gig
+from app.routes import ALL_CATEGORIES, RECOMMENDED_GIG_FIELDS, SEARCH_MAX_PAGE, _search_gigs_query
+from utils.db_utils import get_db_connection, close_db_connection, close_db_pool
+
+WORDS = [
+    "python", "react", "django", "wordpress", "kubernetes", "flutter", "figma", "seo", "copywriting", "unity",
+    "tensorflow", "shopify", "laravel", "angular", "swift", "kotlin", "excel", "tableau", "blender", "solidity",
+    "rust", "golang", "postgres", "aws", "docker", "scraping", "chatbot", "logo", "translation", "accounting",
+    "video", "editing", "landing", "dashboard", "migration", "api", "integration", "automation", "mobile", "website",
+]
+
+# (name, q, skills)
+SEARCHES = [
+    ("rare pair", "solidity migration", []),
+    ("two words", "kubernetes dashboard", []),
+    ("common word", "python", []),
+    ("phrase and exclusion", '"shopify developer" -wordpress', []),
+    ("skills", None, ["Rust", "Docker"]),
+    ("text and skills", "dashboard", ["Python"]),
+]
+
+_ENSURE_PARTITIONS_SQL = """
+    SELECT ensure_monthly_partition('gigs', month::date)
+    FROM generate_series(date_trunc('month', now() AT TIME ZONE 'UTC' - interval '30 days'),
+                         date_trunc('month', now() AT TIME ZONE 'UTC'), interval '1 month') AS month;
+"""
+
+# Titles, descriptions and skills combine words at different strides, so word pairs co-occur unevenly
+_SEED_GIGS_SQL = """
+    INSERT INTO gigs (title, link, description, published_at, category,
+                      budget_amount, budget_currency, skills, source_platform)
+    SELECT 'Need ' || w[1 + i %% 40] || ' developer for ' || w[1 + (i / 40) %% 40] || ' project',
+           'https://search-bench.invalid/gig/' || i,
+           'We are looking for someone experienced in ' || w[1 + (i / 7) %% 40] || ' and ' || w[1 + (i / 13) %% 40]
+               || '. ' || repeat('Details about scope, timeline and deliverables. ', 6),
+           now() - random() * interval '30 days',
+           (%(categories)s::text[])[1 + i %% cardinality(%(categories)s::text[])],
+           CASE WHEN i %% 3 = 0 THEN NULL ELSE round((random() * 5000)::numeric, 2) END,
+           'USD',
+           ARRAY[initcap(w[1 + i %% 40]), initcap(w[1 + (i / 7) %% 40])],
+           'Freelancer'
+    FROM (SELECT %(words)s::text[] AS w) AS words, generate_series(1, %(gigs)s) AS i;
+"""
+
+_RANKS_SQL = "SELECT id, ts_rank(search_vector, websearch_to_tsquery('english', %s)) FROM gigs WHERE id = ANY(%s);"
+
+
+def seed_gigs(cursor, gigs):
+    """Seeds `gigs` gigs over the last 30 days and refreshes the planner statistics (both undone by the rollback)."""
+    cursor.execute(_ENSURE_PARTITIONS_SQL)
+    cursor.execute(_SEED_GIGS_SQL, {"gigs": gigs, "categories": ALL_CATEGORIES[:4], "words": WORDS})
+    cursor.execute("ANALYZE gigs;")
+
+
+def _execute(cursor, statement):
+    # Compiled for psycopg2, as the app runs it (the default dialect may add bind casts)
+    compiled = statement.compile(dialect=postgresql.psycopg2.dialect(), compile_kwargs={"render_postcompile": True})
+    cursor.execute(str(compiled), compiled.params)
+    return cursor.fetchall()
+
+
+def _timed(cursor, statement, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        _execute(cursor, statement)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def _ilike_query(field_names, q, limit):
+    """The unindexed alternative: every word in the title or description, newest first."""
+    words = [word for word in q.replace('"', ' ').split() if not word.startswith('-')]
+    return (
+        select(*[RECOMMENDED_GIG_FIELDS[name] for name in field_names])
+        .where(and_(*[or_(Gig.title.ilike(f"%{word}%"), Gig.description.ilike(f"%{word}%")) for word in words]))
+        .order_by(Gig.published_at.desc().nulls_last(), Gig.id.desc())
+        .limit(limit + 1)
+    )
+
+
+def check_search(cursor, q, skills, limit):
+    """Problems with the ranking or paging of one search (an empty list if there are none)."""
+    problems = []
+    paged_ids = []
+    for page in (1, 2, 3):
+        paged_ids.extend(row[0] for row in _execute(cursor, _search_gigs_query(["id"], q, skills, page=page,
+                                                                               limit=limit))[:limit])
+    all_at_once = [row[0] for row in _execute(cursor, _search_gigs_query(["id"], q, skills, limit=3 * limit))]
+    if paged_ids != all_at_once[:3 * limit]:
+        problems.append("pages 1-3 differ from the same rows fetched at once")
+    if len(set(paged_ids)) != len(paged_ids):
+        problems.append("pages 1-3 repeat gigs")
+    if q and paged_ids:
+        cursor.execute(_RANKS_SQL, (q, paged_ids))
+        ranks = dict(cursor.fetchall())
+        ordered = [ranks[gig_id] for gig_id in paged_ids]
+        if any(later > earlier for earlier, later in zip(ordered, ordered[1:])):
+            problems.append("results are not in non-increasing rank")
+    return problems
+
+
+def run_benchmark(conn, gigs, limit, repeat=5):
+    """
+    Returns a list of (name, matches, page 1 ms, last page, last page ms,
+    ILIKE ms or None) for each of SEARCHES.
+    Raises AssertionError if a search is ranked or paged inconsistently.
+    """
+    field_names = list(RECOMMENDED_GIG_FIELDS)
+    results = []
+    try:
+        with conn.cursor() as cursor:
+            seed_gigs(cursor, gigs)
+            for name, q, skills in SEARCHES:
+                problems = check_search(cursor, q, skills, limit)
+                if problems:
+                    raise AssertionError(f"{name}: {'; '.join(problems)}")
+
+                matching = _search_gigs_query(["id"], q, skills).order_by(None).limit(None).offset(None)
+                matches = _execute(cursor, select(func.count()).select_from(matching.subquery()))[0][0]
+                last_page = max(1, min(SEARCH_MAX_PAGE, -(-matches // limit)))
+
+                first_ms = _timed(cursor, _search_gigs_query(field_names, q, skills, limit=limit), repeat) * 1000
+                last_ms = _timed(cursor, _search_gigs_query(field_names, q, skills, page=last_page, limit=limit),
+                                 repeat) * 1000
+                ilike_ms = _timed(cursor, _ilike_query(field_names, q, limit), max(1, repeat // 2)) * 1000 if q else None
+                results.append((name, matches, first_ms, last_page, last_ms, ilike_ms))
+    finally:
+        conn.rollback()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time ranked gig search on a large seeded table.")
+    parser.add_argument("--gigs", type=int, default=1_000_000, help="Gigs to seed (default 1000000).")
+    parser.add_argument("--limit", type=int, default=20, help="Page size (default 20, as the endpoint).")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query; the median is kept (default 5).")
+    args = parser.parse_args(argv)
+
+    conn = get_db_connection()
+    if not conn:
+        print("Failed to get database connection. Aborting search benchmark.")
+        return 1
+    started = time.perf_counter()
+    try:
+        results = run_benchmark(conn, args.gigs, args.limit, args.repeat)
+    except Exception as e:
+        print(f"Search benchmark failed: {e}")
+        return 1
+    finally:
+        close_db_connection(conn)
+        close_db_pool()
+
+    print(f"{args.gigs} gigs seeded and searched in {time.perf_counter() - started:.0f} s; "
+          f"ranking and paging checked for every search")
+    for name, matches, first_ms, last_page, last_ms, ilike_ms in results:
+        ilike = f"{ilike_ms:9.1f} ms" if ilike_ms is not None else f"{'-':>12s}"
+        print(f"{name:22s} {matches:8d} matches  page 1 {first_ms:8.1f} ms  page {last_page:2d} {last_ms:8.1f} ms  "
+              f"ILIKE scan {ilike}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Benchmark of the two load paths of etl.load.db_loader: the paged multi-row
+INSERT ("insert") against COPY into a staging table plus one merge
+("copy"), over synthetic gigs. Not collected by pytest; run it with
+    python -m tests.bench_load_methods [--rows 1000 100000 1000000] [--repeat 1]
+
+The loader is handed the connection through a wrapper whose commit() does
+nothing, and each load is rolled back afterwards, so neither the gigs nor
+their rollup rows, keyword matches or NEW_GIGS_CHANNEL notifications outlive
+a run (times therefore exclude the final commit). The loads still take row
+locks on gig_links and the rollup while they run: use a development
+database. The insert path needs its whole batch in memory, so the 1M-row
+run needs a couple of GB.
+"""
+import argparse
+import contextlib
+import io
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from etl.load.db_loader import LOAD_METHODS, load_gigs_to_db
+from utils.db_utils import get_db_connection, close_db_connection, close_db_pool
+
+CATEGORIES = ["Web Development", "Mobile Development", "Data Science & Analytics", "Design & Creative"]
+SKILLS = [["Python", "Django"], ["React.js", "TypeScript"], ["Figma"], []]
+
+
+class _RollbackOnlyConnection:
+    """Passes the loader's calls through to `conn`, except that commit() is left to the benchmark."""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, *args, **kwargs):
+        return self._conn.cursor(*args, **kwargs)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        self._conn.rollback()
+
+
+def synthetic_gigs(count, run_id):
+    """`count` gigs with unique links, published over the last few days."""
+    now = datetime.now(timezone.utc)
+    for i in range(count):
+        yield {
+            "title": f"Benchmark gig {i}",
+            "link": f"https://example.invalid/bench/{run_id}/{i}",
+            "description": f"Description of benchmark project {i}.\tDetails follow.\n" * 4,
+            "published_at": now - timedelta(seconds=i % 259_200),
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "budget_amount": 50 + i % 500 if i % 3 else None,
+            "budget_currency": "USD",
+            "skills": SKILLS[i % len(SKILLS)],
+            "source_platform": "Freelancer",
+        }
+
+
+def _time_load(conn, method, rows, run_id):
+    # The insert path needs a list; COPY streams the generator as the loader does in the ETL
+    gigs = synthetic_gigs(rows, run_id)
+    if method == "insert":
+        gigs = list(gigs)
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = load_gigs_to_db(gigs, _RollbackOnlyConnection(conn), method=method)
+        seconds = time.perf_counter() - started
+    finally:
+        conn.rollback()
+    if not result.ok:
+        raise RuntimeError(f"{method} load of {rows} rows failed: {result.error}")
+    return seconds, result.inserted
+
+
+def run_benchmark(conn, row_counts, repeat=1):
+    """Returns a list of (rows, method, best seconds, inserted) over `repeat` runs each."""
+    results = []
+    for rows in row_counts:
+        for method in LOAD_METHODS:
+            timings = [_time_load(conn, method, rows, f"{method}-{rows}-{run}") for run in range(repeat)]
+            seconds, inserted = min(timings)
+            results.append((rows, method, seconds, inserted))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the INSERT and COPY gig load paths.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000, 1_000_000],
+                        help="Batch sizes to load (default 1000 100000 1000000).")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per batch size and method; the best is kept.")
+    args = parser.parse_args(argv)
+
+    conn = get_db_connection()
+    if not conn:
+        print("Failed to get database connection. Aborting load benchmark.")
+        return 1
+    try:
+        results = run_benchmark(conn, args.rows, args.repeat)
+    except Exception as e:
+        print(f"Load benchmark failed: {e}")
+        return 1
+    finally:
+        close_db_connection(conn)
+        close_db_pool()
+
+    insert_seconds = {rows: seconds for rows, method, seconds, _ in results if method == "insert"}
+    for rows, method, seconds, inserted in results:
+        speedup = insert_seconds[rows] / seconds if seconds else 0.0
+        print(f"{rows:9d} rows  {method:6s} {seconds:8.2f} s  {rows / seconds:10.0f} rows/s  "
+              f"{inserted:9d} inserted  {speedup:5.1f}x insert")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
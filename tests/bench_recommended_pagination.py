@@ -0,0 +1,139 @@
+"""
+Latency benchmark of /api/gigs/recommended pagination: the keyset query the
+endpoint runs (app.routes._recommended_gigs_query with a cursor) against
+the same query paged with OFFSET, at increasingly deep pages. Not collected
+by pytest; run it with
+    python -m tests.bench_recommended_pagination [--gigs 200000] [--limit 50] [--pages 1 10 100 1000 2000]
+
+Gigs are seeded inside one transaction that is always rolled back (as in
+tests/rollup_check.py), all published within the endpoint's 6-hour window
+and spread over four categories of which the user prefers two. Each page is
+fetched both ways and checked to return the same gigs; the median of
+--repeat runs is reported.
+"""
+import argparse
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.dialects import postgresql
+
+from app.routes import ALL_CATEGORIES, RECOMMENDED_GIG_FIELDS, _recommended_gigs_query
+from utils.db_utils import get_db_connection, close_db_connection, close_db_pool
+
+SEEDED_CATEGORIES = ALL_CATEGORIES[:4]
+PREFERRED_CATEGORIES = SEEDED_CATEGORIES[:2]
+RECOMMENDED_WINDOW = timedelta(hours=6)  # As get_recommended_gigs
+
+_ENSURE_PARTITIONS_SQL = """
+    SELECT ensure_monthly_partition('gigs', month::date)
+    FROM generate_series(date_trunc('month', now() AT TIME ZONE 'UTC' - interval '1 day'),
+                         date_trunc('month', now() AT TIME ZONE 'UTC'), interval '1 month') AS month;
+"""
+
+_SEED_GIGS_SQL = """
+    INSERT INTO gigs (title, link, description, published_at, category,
+                      budget_amount, budget_currency, skills, source_platform)
+    SELECT 'Pagination benchmark gig ' || i,
+           'https://pagination-bench.invalid/gig/' || i,
+           repeat('Seeded by tests.bench_recommended_pagination. ', 10),
+           now() - random() * interval '5 hours 50 minutes',
+           (%(categories)s::text[])[1 + i %% cardinality(%(categories)s::text[])],
+           CASE WHEN i %% 3 = 0 THEN NULL ELSE round((random() * 5000)::numeric, 2) END,
+           'USD',
+           ARRAY['python', 'react'],
+           'Freelancer'
+    FROM generate_series(1, %(gigs)s) AS i;
+"""
+
+
+def seed_gigs(cursor, gigs):
+    """Seeds `gigs` recent gigs and refreshes the planner statistics (both undone by the rollback)."""
+    cursor.execute(_ENSURE_PARTITIONS_SQL)
+    cursor.execute(_SEED_GIGS_SQL, {"gigs": gigs, "categories": SEEDED_CATEGORIES})
+    cursor.execute("ANALYZE gigs;")
+
+
+def _execute(cursor, statement):
+    compiled = statement.compile(dialect=postgresql.psycopg2.dialect(), compile_kwargs={"render_postcompile": True})
+    cursor.execute(str(compiled), compiled.params)
+    return cursor.fetchall()
+
+
+def _timed(cursor, statement, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = _execute(cursor, statement)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), rows
+
+
+def run_benchmark(conn, gigs, limit, pages, repeat=5):
+    """
+    Returns a list of (page, offset milliseconds, keyset milliseconds) for
+    each page number in `pages` that the seeded gigs reach.
+    """
+    field_names = list(RECOMMENDED_GIG_FIELDS)
+    time_cutoff = datetime.utcnow() - RECOMMENDED_WINDOW
+    results = []
+    try:
+        with conn.cursor() as cursor:
+            seed_gigs(cursor, gigs)
+            for page in pages:
+                offset = (page - 1) * limit
+                offset_query = _recommended_gigs_query(field_names, PREFERRED_CATEGORIES, time_cutoff,
+                                                       limit=limit).offset(offset)
+                if page == 1:
+                    cursor_position = None
+                else:
+                    # The cursor the previous page would have returned: its last gig
+                    previous = _execute(cursor, _recommended_gigs_query(
+                        [], PREFERRED_CATEGORIES, time_cutoff, limit=0).offset(offset - 1))
+                    if not previous:
+                        break
+                    cursor_position = previous[0]
+                keyset_query = _recommended_gigs_query(field_names, PREFERRED_CATEGORIES, time_cutoff,
+                                                       cursor_position, limit)
+
+                offset_seconds, offset_rows = _timed(cursor, offset_query, repeat)
+                keyset_seconds, keyset_rows = _timed(cursor, keyset_query, repeat)
+                if offset_rows != keyset_rows:
+                    raise AssertionError(f"page {page}: OFFSET and keyset pagination return different gigs")
+                results.append((page, offset_seconds * 1000, keyset_seconds * 1000))
+    finally:
+        conn.rollback()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time OFFSET against keyset pagination of recommended gigs.")
+    parser.add_argument("--gigs", type=int, default=200_000, help="Gigs to seed (default 200000).")
+    parser.add_argument("--limit", type=int, default=50, help="Page size (default 50).")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100, 1000, 2000],
+                        help="Page numbers to fetch (default 1 10 100 1000 2000).")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query; the median is kept (default 5).")
+    args = parser.parse_args(argv)
+
+    conn = get_db_connection()
+    if not conn:
+        print("Failed to get database connection. Aborting pagination benchmark.")
+        return 1
+    try:
+        results = run_benchmark(conn, args.gigs, args.limit, args.pages, args.repeat)
+    except Exception as e:
+        print(f"Pagination benchmark failed: {e}")
+        return 1
+    finally:
+        close_db_connection(conn)
+        close_db_pool()
+
+    for page, offset_ms, keyset_ms in results:
+        print(f"page {page:6d}  offset {offset_ms:9.2f} ms  keyset {keyset_ms:7.2f} ms  "
+              f"{offset_ms / keyset_ms:6.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
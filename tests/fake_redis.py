@@ -0,0 +1,43 @@
+"""
+In-memory stand-in for the subset of the redis-py client that
+app.cache.RedisCache uses: get, set with `ex`, delete and scan_iter. Values
+are stored as bytes and expire on a clock the test controls.
+"""
+import fnmatch
+
+
+class FakeRedis:
+    def __init__(self):
+        self.now = 0.0  # Seconds; advance it to expire keys
+        self._data = {}  # key -> (value bytes, expires_at or None)
+
+    def _live(self, key):
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= self.now:
+            del self._data[key]
+            return None
+        return entry
+
+    def get(self, key):
+        entry = self._live(key)
+        return entry[0] if entry else None
+
+    def set(self, key, value, ex=None):
+        if isinstance(value, str):
+            value = value.encode("utf-8")
+        self._data[key] = (value, self.now + ex if ex is not None else None)
+        return True
+
+    def delete(self, *keys):
+        return sum(self._data.pop(key, None) is not None for key in keys)
+
+    def scan_iter(self, match="*"):
+        for key in list(self._data):
+            if self._live(key) and fnmatch.fnmatchcase(key, match):
+                yield key
+
+    def ttl(self, key):
+        entry = self._live(key)
+        if entry is None:
+            return -2
+        return -1 if entry[1] is None else int(entry[1] - self.now)
@@ -0,0 +1,270 @@
+"""
+Consistency check of the hourly category rollup (etl/category_rollup.py)
+against plain GROUP BY aggregates over 'gigs'.
+
+Gigs are seeded at random minutes and exactly on hour boundaries, applied
+to the rollup the way the loader, the re-categorization job and partition
+retirement do, and then compared:
+  - every (category, hour, platform) rollup row against GROUP BY over gigs,
+  - the per-category counts the stats and trending endpoints build with
+    _category_count_queries (rollup for whole hours, raw gigs for the
+    partial hours at the window edges) against a GROUP BY over the same
+    window, for the endpoints' windows and for random ones,
+  - the stats endpoint's average budget, and each category's, against AVG
+    over gigs.
+
+The rollup is first rebuilt from the existing gigs, and everything happens
+in one transaction that is always rolled back; like app.query_plans it
+locks the tables while it runs, so do not point it at production. Run by
+tests/test_category_rollup.py when RUN_DB_TESTS=1, or directly:
+    python -m tests.rollup_check [--gigs 20000] [--days 10] [--windows 300]
+Exits with status 1 if any aggregate differs.
+"""
+import argparse
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy.dialects import postgresql
+
+from app.routes import ALL_CATEGORIES, _average_budget_query, _category_count_queries
+from etl.category_rollup import REBUILD_SQL, add_gigs_to_rollup, remove_gigs_from_rollup
+from utils.db_utils import get_db_connection, close_db_connection, close_db_pool
+
+AVERAGE_TOLERANCE = Decimal("0.000001")
+# Session time zone the rollup is written in; a half-hour offset from UTC, so the
+# rollup's hours only match the endpoints' UTC hours if they ignore the session zone
+WRITER_TIME_ZONE = "Asia/Kolkata"
+
+_ENSURE_PARTITIONS_SQL = """
+    SELECT ensure_monthly_partition('gigs', month::date)
+    FROM generate_series(date_trunc('month', now() AT TIME ZONE 'UTC' - %(days)s * interval '1 day'),
+                         date_trunc('month', now() AT TIME ZONE 'UTC'), interval '1 month') AS month;
+"""
+
+# One in five gigs exactly on a UTC hour boundary, one in seven without a category, one in three without a budget
+_SEED_GIGS_SQL = """
+    INSERT INTO gigs (title, link, description, published_at, category,
+                      budget_amount, budget_currency, skills, source_platform)
+    SELECT 'Rollup check gig ' || i,
+           'https://rollup-check.invalid/gig/' || i,
+           'Seeded by tests.rollup_check',
+           CASE WHEN i %% 5 = 0
+                THEN date_trunc('hour', (now() - random() * %(days)s * interval '1 day') AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+                ELSE now() - random() * %(days)s * interval '1 day' END,
+           CASE WHEN i %% 7 = 0 THEN NULL
+                ELSE (%(categories)s::text[])[1 + i %% cardinality(%(categories)s::text[])] END,
+           CASE WHEN i %% 3 = 0 THEN NULL ELSE round((random() * 5000)::numeric, 2) END,
+           'USD',
+           ARRAY['python'],
+           CASE WHEN i %% 11 = 0 THEN NULL WHEN i %% 2 = 0 THEN 'Freelancer' ELSE 'Rollup check' END
+    FROM generate_series(1, %(gigs)s) AS i
+    RETURNING id;
+"""
+
+_RECATEGORIZE_SQL = "UPDATE gigs SET category = %(category)s WHERE id = ANY(%(ids)s);"
+_DELETE_GIGS_SQL = "DELETE FROM gigs WHERE id = ANY(%(ids)s);"
+
+_ROLLUP_ROWS_SQL = """
+    SELECT category, hour_bucket, source_platform, gig_count, budget_sum, budget_count
+    FROM gig_category_hourly;
+"""
+
+_RAW_ROWS_SQL = """
+    SELECT COALESCE(category, ''), date_trunc('hour', published_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+           COALESCE(source_platform, ''),
+           COUNT(*), COALESCE(SUM(budget_amount), 0), COUNT(budget_amount)
+    FROM gigs
+    GROUP BY 1, 2, 3;
+"""
+
+_RAW_COUNTS_SQL = "SELECT category, COUNT(*) FROM gigs WHERE {} GROUP BY category;"
+
+_RAW_AVERAGES_SQL = """
+    SELECT COALESCE(category, ''), AVG(budget_amount)
+    FROM gigs WHERE budget_amount IS NOT NULL GROUP BY 1;
+"""
+
+_ROLLUP_AVERAGES_SQL = """
+    SELECT category, SUM(budget_sum) / NULLIF(SUM(budget_count), 0)
+    FROM gig_category_hourly GROUP BY category HAVING SUM(budget_count) > 0;
+"""
+
+_RAW_AVERAGE_SQL = "SELECT AVG(budget_amount) FROM gigs;"
+
+_BOUNDARY_TIMES_SQL = "SELECT published_at FROM gigs WHERE id = ANY(%(ids)s) ORDER BY random() LIMIT %(limit)s;"
+
+
+def seed_gigs(cursor, gigs, days):
+    """
+    Inserts the check's gigs and maintains the rollup for them like the ETL
+    does: added on load, a slice re-categorized, another slice retired.
+    Returns the ids of the gigs still stored.
+    """
+    params = {"days": days, "gigs": gigs, "categories": ALL_CATEGORIES}
+    cursor.execute(_ENSURE_PARTITIONS_SQL, params)
+    cursor.execute(_SEED_GIGS_SQL, params)
+    gig_ids = [row[0] for row in cursor.fetchall()]
+    add_gigs_to_rollup(cursor, gig_ids)
+
+    # As etl.recategorize_gigs: out of the rollup, new category, back in
+    recategorized = gig_ids[::13]
+    remove_gigs_from_rollup(cursor, recategorized)
+    cursor.execute(_RECATEGORIZE_SQL, {"category": ALL_CATEGORIES[0], "ids": recategorized})
+    add_gigs_to_rollup(cursor, recategorized)
+
+    # As etl.partition_maintenance: out of the rollup, then gone
+    retired = set(gig_ids[5::17])
+    remove_gigs_from_rollup(cursor, list(retired))
+    cursor.execute(_DELETE_GIGS_SQL, {"ids": list(retired)})
+    return [gig_id for gig_id in gig_ids if gig_id not in retired]
+
+
+def _execute(cursor, statement):
+    compiled = statement.compile(dialect=postgresql.psycopg2.dialect(), compile_kwargs={"render_postcompile": True})
+    cursor.execute(str(compiled), compiled.params)
+    return cursor.fetchall()
+
+
+def _naive_utc(moment):
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)  # The endpoints pass naive UTC datetimes
+
+
+def check_rollup_rows(cursor):
+    """Rollup rows that differ from GROUP BY (category, hour, platform) over gigs."""
+    cursor.execute(_ROLLUP_ROWS_SQL)
+    rollup = {row[:3]: row[3:] for row in cursor.fetchall()}
+    cursor.execute(_RAW_ROWS_SQL)
+    raw = {row[:3]: row[3:] for row in cursor.fetchall()}
+    return [f"rollup row {key}: {rollup.get(key)} != raw {raw.get(key)}"
+            for key in sorted(set(rollup) | set(raw), key=str) if rollup.get(key) != raw.get(key)]
+
+
+def category_counts(cursor, start, end=None):
+    """Per-category counts from _category_count_queries, summed like app.routes._category_counts."""
+    counts = {}
+    for query in _category_count_queries(start, end):
+        for category, count in _execute(cursor, query):
+            counts[category or None] = counts.get(category or None, 0) + int(count)
+    return counts
+
+
+def raw_category_counts(cursor, start, end=None):
+    """GROUP BY category over gigs published in [start, end]."""
+    if end is None:
+        cursor.execute(_RAW_COUNTS_SQL.format("published_at >= %s"), (start,))
+    else:
+        cursor.execute(_RAW_COUNTS_SQL.format("published_at BETWEEN %s AND %s"), (start, end))
+    return {category: int(count) for category, count in cursor.fetchall()}
+
+
+def count_windows(cursor, gig_ids, days, windows, rng):
+    """
+    (name, start, end) windows to compare: the stats and trending windows,
+    windows starting or ending exactly on a seeded gig or a whole hour,
+    and random ones down to the microsecond, shorter and longer than an hour.
+    """
+    now = datetime.utcnow()
+    checks = [("stats", now - timedelta(days=30), None),
+              ("trending current", now - timedelta(days=2), None),
+              ("trending previous", now - timedelta(days=4), now - timedelta(days=2))]
+
+    cursor.execute(_BOUNDARY_TIMES_SQL, {"ids": gig_ids, "limit": windows // 4})
+    for number, (published_at,) in enumerate(cursor.fetchall(), start=1):
+        moment = _naive_utc(published_at)
+        checks.append((f"from gig {number}", moment, rng.choice([None, moment + timedelta(minutes=rng.randint(0, 600))])))
+        checks.append((f"to gig {number}", moment - timedelta(minutes=rng.randint(0, 600)), moment))
+
+    for number in range(1, windows + 1):
+        start = now - timedelta(days=days) * rng.random()
+        if rng.random() < 0.2:
+            start = start.replace(minute=0, second=0, microsecond=0)
+        end = rng.choice([None,
+                          start + timedelta(minutes=rng.randint(0, 59), seconds=rng.random() * 60),
+                          start + timedelta(hours=rng.randint(1, 72), minutes=rng.randint(0, 59)),
+                          (start + timedelta(hours=rng.randint(1, 72))).replace(minute=0, second=0, microsecond=0)])
+        checks.append((f"random {number}", start, end))
+    return checks
+
+
+def check_averages(cursor):
+    """Differences between the rollup's average budgets (overall and per category) and AVG over gigs."""
+    problems = []
+    rollup_average = _execute(cursor, _average_budget_query())[0][0]
+    cursor.execute(_RAW_AVERAGE_SQL)
+    raw_average = cursor.fetchone()[0]
+    if (rollup_average is None) != (raw_average is None) or \
+            (raw_average is not None and abs(rollup_average - raw_average) > AVERAGE_TOLERANCE):
+        problems.append(f"average budget: rollup {rollup_average} != raw {raw_average}")
+
+    cursor.execute(_ROLLUP_AVERAGES_SQL)
+    rollup = dict(cursor.fetchall())
+    cursor.execute(_RAW_AVERAGES_SQL)
+    raw = dict(cursor.fetchall())
+    for category in sorted(set(rollup) | set(raw)):
+        if category not in rollup or category not in raw or abs(rollup[category] - raw[category]) > AVERAGE_TOLERANCE:
+            problems.append(f"average budget of {category!r}: rollup {rollup.get(category)} != raw {raw.get(category)}")
+    return problems
+
+
+def run_rollup_checks(conn, gigs, days, windows, seed=None):
+    """
+    Rebuilds the rollup and seeds from a WRITER_TIME_ZONE session, compares
+    from a UTC one and rolls back.
+    Returns a list of (name, problems).
+    """
+    rng = random.Random(seed)
+    results = []
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("LOCK TABLE gig_category_hourly IN EXCLUSIVE MODE;")
+            cursor.execute("SET LOCAL TIME ZONE %s;", (WRITER_TIME_ZONE,))
+            cursor.execute("DELETE FROM gig_category_hourly;")
+            cursor.execute(REBUILD_SQL)
+            gig_ids = seed_gigs(cursor, gigs, days)
+            cursor.execute("SET LOCAL TIME ZONE 'UTC';")  # As the app's sessions (utils.db_utils.SESSION_OPTIONS)
+
+            results.append(("rollup rows", check_rollup_rows(cursor)))
+            results.append(("average budgets", check_averages(cursor)))
+            for name, start, end in count_windows(cursor, gig_ids, days, windows, rng):
+                counts, raw = category_counts(cursor, start, end), raw_category_counts(cursor, start, end)
+                problems = [] if counts == raw else [f"[{start}, {end or 'now'}]: rollup {counts} != raw {raw}"]
+                results.append((f"counts {name}", problems))
+    finally:
+        conn.rollback()  # Never keep the seeded rows or the rebuilt rollup
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the hourly category rollup against raw gig aggregates.")
+    parser.add_argument("--gigs", type=int, default=20_000, help="Gigs to seed (default 20000).")
+    parser.add_argument("--days", type=int, default=10, help="Days the seeded gigs are spread over (default 10).")
+    parser.add_argument("--windows", type=int, default=300, help="Random count windows to compare (default 300).")
+    parser.add_argument("--seed", type=int, help="Random seed for the windows.")
+    args = parser.parse_args(argv)
+
+    conn = get_db_connection()
+    if not conn:
+        print("Failed to get database connection. Aborting rollup check.")
+        return 1
+    try:
+        results = run_rollup_checks(conn, args.gigs, args.days, args.windows, args.seed)
+    except Exception as e:
+        print(f"Rollup check failed: {e}")
+        return 1
+    finally:
+        close_db_connection(conn)
+        close_db_pool()
+
+    failed = [(name, problems) for name, problems in results if problems]
+    for name, problems in failed:
+        print(f"FAIL  {name}")
+        for problem in problems[:10]:
+            print(f"      {problem}")
+    print(f"{len(results) - len(failed)} of {len(results)} rollup checks match the raw aggregates.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Local SMTP stand-in on aiosmtpd for the email delivery tests and benchmark.
+Accepts any login, records logins and messages, can refuse recipients and
+can slow down EHLO to model the handshake cost of a remote provider.
+"""
+import asyncio
+import socket
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+
+
+class RecordingHandler:
+    """aiosmtpd handler and authenticator counting logins and accepted messages."""
+
+    def __init__(self, refused=(), ehlo_delay=0.0):
+        self.refused = set(refused)
+        self.ehlo_delay = ehlo_delay
+        self.logins = 0
+        self.recipients = []
+
+    def authenticate(self, server, session, envelope, mechanism, auth_data):
+        self.logins += 1
+        return AuthResult(success=True)
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        if self.ehlo_delay:
+            await asyncio.sleep(self.ehlo_delay)
+        session.host_name = hostname
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.refused:
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.recipients.extend(envelope.rcpt_tos)
+        return "250 Message accepted"
+
+
+def _free_port(host):
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+class SMTPStandIn:
+    """
+    Runs a RecordingHandler on a fixed local port; stop() and start() again
+    drop every open client session, like a server restart.
+    """
+
+    def __init__(self, handler=None, host="127.0.0.1"):
+        self.handler = handler or RecordingHandler()
+        self.host = host
+        self.port = _free_port(host)
+        self._controller = None
+
+    def start(self):
+        self._controller = Controller(self.handler, hostname=self.host, port=self.port,
+                                      authenticator=self.handler.authenticate, auth_require_tls=False)
+        self._controller.start()
+
+    def stop(self):
+        if self._controller is not None:
+            self._controller.stop()
+            self._controller = None
+
+    def restart(self):
+        self.stop()
+        self.start()
+
+    def settings(self):
+        """SMTP settings in the form returned by notification.email_sender.get_smtp_settings."""
+        return {
+            "sender_email": "notifier@example.invalid",
+            "server": self.host,
+            "port": self.port,
+            "username": "notifier",
+            "password": "secret",
+            "use_tls": False,
+        }
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
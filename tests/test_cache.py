@@ -0,0 +1,207 @@
+"""
+app.cache: the in-process LRU and Redis backends (the latter on
+tests/fake_redis.py), generation-based invalidation, and ETag /
+If-None-Match handling of ResponseCache, on a minimal Flask app whose cache
+generation comes from a fake instead of the database.
+"""
+import sys
+
+import pytest
+from flask import Flask, jsonify
+
+from app import cache as cache_module
+from app.cache import InProcessLRUCache, NullCache, RedisCache, ResponseCache, create_cache_backend
+from tests.fake_redis import FakeRedis
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+
+class _GenerationDB:
+    """Answers ResponseCache's cache_generations lookup like db.session would."""
+
+    def __init__(self):
+        self.generation = 1
+        self.reads = 0
+        self.rollbacks = 0
+        self.fail = False
+        self.session = self
+
+    def execute(self, statement, params):
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        self.reads += 1
+        return self
+
+    def scalar(self):
+        return self.generation
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def test_lru_get_set_and_ttl(clock):
+    lru = InProcessLRUCache(max_entries=10)
+    assert lru.get("a") is None
+    lru.set("a", {"x": 1}, ttl=30)
+    assert lru.get("a") == {"x": 1}
+    clock.now += 29.9
+    assert lru.get("a") == {"x": 1}
+    clock.now += 0.1
+    assert lru.get("a") is None
+
+
+def test_lru_evicts_least_recently_used(clock):
+    lru = InProcessLRUCache(max_entries=2)
+    lru.set("a", 1, ttl=60)
+    lru.set("b", 2, ttl=60)
+    lru.get("a")  # "b" is now the least recently used
+    lru.set("c", 3, ttl=60)
+    assert (lru.get("a"), lru.get("b"), lru.get("c")) == (1, None, 3)
+    lru.clear()
+    assert lru.get("a") is None
+
+
+def test_redis_cache_round_trip_and_expiry():
+    client = FakeRedis()
+    redis_cache = RedisCache(client, prefix="test:")
+    redis_cache.set("stats:1", {"body": "{}", "status": 200, "etag": "abc"}, ttl=300)
+    assert redis_cache.get("stats:1") == {"body": "{}", "status": 200, "etag": "abc"}
+    assert client.ttl("test:stats:1") == 300  # Expiry is left to Redis
+
+    client.now += 300
+    assert redis_cache.get("stats:1") is None
+
+
+def test_redis_cache_clear_only_touches_its_prefix():
+    client = FakeRedis()
+    client.set("other:key", "keep")
+    redis_cache = RedisCache(client, prefix="test:")
+    redis_cache.set("a", 1, ttl=60)
+    redis_cache.set("b", 2, ttl=60)
+    redis_cache.clear()
+    assert redis_cache.get("a") is None and redis_cache.get("b") is None
+    assert client.get("other:key") == b"keep"
+
+
+def test_create_cache_backend(monkeypatch):
+    assert isinstance(create_cache_backend("none"), NullCache)
+    assert isinstance(create_cache_backend("memory"), InProcessLRUCache)
+    assert isinstance(create_cache_backend("bogus"), InProcessLRUCache)
+    monkeypatch.setitem(sys.modules, "redis", None)  # The optional package is missing
+    assert isinstance(create_cache_backend("redis"), InProcessLRUCache)
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    return InProcessLRUCache() if request.param == "memory" else RedisCache(FakeRedis())
+
+
+@pytest.fixture
+def generation_db():
+    return _GenerationDB()
+
+
+def _app(response_cache, generation_db, calls):
+    app = Flask(__name__)
+
+    @app.route("/stats")
+    @response_cache.cached("stats", generation_db)
+    def stats():
+        calls.append(generation_db.generation)
+        return jsonify({"generation": generation_db.generation})
+
+    @app.route("/broken")
+    @response_cache.cached("broken", generation_db)
+    def broken():
+        calls.append("broken")
+        return jsonify({"message": "error"}), 500
+
+    return app.test_client()
+
+
+def test_responses_are_cached_per_generation(backend, generation_db, clock):
+    calls = []
+    client = _app(ResponseCache(backend, generation_check_seconds=0), generation_db, calls)
+
+    first = client.get("/stats")
+    second = client.get("/stats")
+    assert first.status_code == second.status_code == 200
+    assert first.data == second.data
+    assert calls == [1]
+
+    generation_db.generation = 2  # The ETL bumped the generation after a load
+    third = client.get("/stats")
+    assert third.json == {"generation": 2}
+    assert third.headers["ETag"] != first.headers["ETag"]
+    assert calls == [1, 2]
+
+
+def test_generation_is_rechecked_only_after_the_interval(generation_db, clock):
+    calls = []
+    client = _app(ResponseCache(InProcessLRUCache(), generation_check_seconds=10), generation_db, calls)
+    client.get("/stats")
+    generation_db.generation = 2
+    assert client.get("/stats").json["generation"] == 1  # Still within the check interval
+    assert generation_db.reads == 1
+
+    clock.now += 10
+    assert client.get("/stats").json["generation"] == 2
+    assert generation_db.reads == 2
+
+
+def test_generation_read_failure_keeps_last_generation(generation_db, clock):
+    calls = []
+    client = _app(ResponseCache(InProcessLRUCache(), generation_check_seconds=0), generation_db, calls)
+    client.get("/stats")
+    generation_db.fail = True
+    assert client.get("/stats").status_code == 200
+    assert calls == [1]
+    assert generation_db.rollbacks == 1
+
+
+def test_if_none_match_returns_304(backend, generation_db, clock):
+    calls = []
+    client = _app(ResponseCache(backend, max_age=60, generation_check_seconds=0), generation_db, calls)
+    first = client.get("/stats")
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] in ("public, max-age=60", "max-age=60, public")
+
+    conditional = client.get("/stats", headers={"If-None-Match": etag})
+    assert conditional.status_code == 304
+    assert conditional.data == b""
+    assert conditional.headers["ETag"] == etag
+
+    assert client.get("/stats", headers={"If-None-Match": '"stale"'}).status_code == 200
+    generation_db.generation = 2
+    assert client.get("/stats", headers={"If-None-Match": etag}).status_code == 200
+    assert calls == [1, 2]
+
+
+def test_error_responses_are_not_cached(backend, generation_db, clock):
+    calls = []
+    client = _app(ResponseCache(backend, generation_check_seconds=0), generation_db, calls)
+    assert client.get("/broken").status_code == 500
+    assert client.get("/broken").status_code == 500
+    assert calls == ["broken", "broken"]
+    assert "ETag" not in client.get("/broken").headers
+
+
+def test_null_cache_still_answers_conditional_requests(generation_db, clock):
+    calls = []
+    client = _app(ResponseCache(NullCache(), generation_check_seconds=0), generation_db, calls)
+    etag = client.get("/stats").headers["ETag"]
+    assert client.get("/stats", headers={"If-None-Match": etag}).status_code == 304
+    assert len(calls) == 2  # Nothing is stored, so the view runs every time
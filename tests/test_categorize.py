@@ -0,0 +1,119 @@
+"""
+Parity of the compiled single-pass category matcher in
+etl.transform.data_transformer with the per-keyword regex search it
+replaced, over randomized gig texts built from the category keywords.
+"""
+import random
+import re
+from collections import defaultdict
+
+import pytest
+
+from etl.transform.data_transformer import CATEGORIES_DATA, _find_keywords, _normalize_text, categorize_gig
+
+ALL_KEYWORDS = sorted({
+    kw
+    for category_data in CATEGORIES_DATA
+    for keyword_type in ("primary_keywords", "secondary_keywords", "skill_keywords", "exclude_keywords")
+    for kw in category_data.get(keyword_type, [])
+})
+FILLER_WORDS = ["need", "a", "the", "expert", "for", "my", "project", "urgent", "long term", "team", "budget"]
+NON_GIG_PHRASES = ["for sale", "selling account", "offer my", "transfer my"]
+# Glue that lands next to keywords: delimiters the normalizer turns into spaces, and
+# characters that do or do not form a word boundary
+SEPARATORS = [" ", " ", " ", "-", "_", "/", ", ", ". ", "(", ")", "s", "x", "1", ".", "+", "#"]
+SEED = 20240601
+CASES = 3000
+
+
+def _reference_categorize(title, skills, description):
+    """categorize_gig as it was before the matcher was compiled: one re.search per keyword and category."""
+    normalized_title = _normalize_text(title)
+    normalized_skills = [_normalize_text(s) for s in skills if s]
+    normalized_description = _normalize_text(description)
+    combined_text = f"{normalized_title} {' '.join(normalized_skills)} {normalized_description}"
+
+    if re.search(r"\b(for sale|selling account|account for sale|offer my|transfer my)\b", combined_text):
+        return "Other"
+
+    category_scores = defaultdict(int)
+    for category_data in CATEGORIES_DATA:
+        category_name = category_data["name"]
+        if any(re.search(r'\b' + re.escape(kw) + r'\b', combined_text)
+               for kw in category_data.get("exclude_keywords", [])):
+            continue
+        for keyword_type, weight in (("primary_keywords", 3), ("secondary_keywords", 2), ("skill_keywords", 4)):
+            for kw in category_data[keyword_type]:
+                if re.search(r'\b' + re.escape(kw) + r'\b', combined_text):
+                    category_scores[category_name] += weight
+
+    if category_scores:
+        best_category = max(category_scores.items(), key=lambda x: x[1])[0]
+        if category_scores[best_category] >= 5:
+            return best_category
+    return "Other"
+
+
+def _random_case(text, rng):
+    choice = rng.random()
+    if choice < 0.2:
+        return text.upper()
+    if choice < 0.4:
+        return text.title()
+    return text
+
+
+def _random_text(rng, max_words):
+    words = []
+    for _ in range(rng.randint(0, max_words)):
+        roll = rng.random()
+        if roll < 0.6:
+            word = rng.choice(ALL_KEYWORDS)
+        elif roll < 0.95:
+            word = rng.choice(FILLER_WORDS)
+        else:
+            word = rng.choice(NON_GIG_PHRASES)
+        words.append(_random_case(word, rng))
+        words.append(rng.choice(SEPARATORS))
+    return "".join(words)
+
+
+def _random_gig(rng):
+    title = _random_text(rng, 6)
+    skills = [_random_text(rng, 2) for _ in range(rng.randint(0, 4))]
+    if rng.random() < 0.1:
+        skills.append(None)
+    description = None if rng.random() < 0.05 else _random_text(rng, 30)
+    return title, skills, description
+
+
+def test_categorize_matches_per_keyword_search():
+    rng = random.Random(SEED)
+    categories = set()
+    for _ in range(CASES):
+        gig = _random_gig(rng)
+        category = categorize_gig(*gig)
+        assert category == _reference_categorize(*gig), gig
+        categories.add(category)
+    # The generated texts must exercise every category, not just "Other"
+    assert categories == {category_data["name"] for category_data in CATEGORIES_DATA} | {"Other"}
+
+
+def test_find_keywords_matches_per_keyword_search():
+    rng = random.Random(SEED + 1)
+    for _ in range(CASES):
+        text = _normalize_text(_random_text(rng, 40))
+        expected = {kw for kw in ALL_KEYWORDS if re.search(r'\b' + re.escape(kw) + r'\b', text)}
+        assert _find_keywords(text) == expected, text
+
+
+@pytest.mark.parametrize("title, skills, description, category", [
+    ("Build a React.js web application", ["react", "css"], "Frontend development for our portal", "Web Development"),
+    ("Flutter developer", ["flutter", "firebase"], "Android app and iOS app", "Mobile Development"),
+    ("LLM fine-tuning", ["pytorch", "huggingface"], "Machine learning for web design agency", "Other"),
+    ("Instagram account for sale", ["graphic design"], "Selling account with logo design", "Other"),
+    ("", [], None, "Other"),
+])
+def test_categorize_examples(title, skills, description, category):
+    assert categorize_gig(title, skills, description) == _reference_categorize(title, skills, description)
+    assert categorize_gig(title, skills, description) == category
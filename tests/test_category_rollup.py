@@ -0,0 +1,36 @@
+"""
+Runs tests/rollup_check.py against the configured database: the hourly
+category rollup, the endpoints' category counts (including the partial hours
+at the window edges) and the average budgets must equal GROUP BY aggregates
+over 'gigs'. Everything is rolled back, but the check seeds thousands of gigs
+and locks gig_category_hourly while it runs, so it only runs when
+RUN_DB_TESTS=1 is set for a development or CI database.
+"""
+import os
+
+import pytest
+
+from tests.rollup_check import run_rollup_checks
+from utils.db_utils import get_db_connection, close_db_connection
+
+pytestmark = pytest.mark.skipif(
+    os.getenv("RUN_DB_TESTS") != "1",
+    reason="Database checks are opt-in: set RUN_DB_TESTS=1 with DB_HOST, DB_PORT and POSTGRES_* "
+           "pointing at a development database."
+)
+
+
+@pytest.fixture
+def conn():
+    connection = get_db_connection()
+    if not connection:
+        pytest.fail("RUN_DB_TESTS=1 is set but the database is not reachable.")
+    yield connection
+    close_db_connection(connection)
+
+
+def test_rollup_matches_raw_aggregates(conn):
+    results = run_rollup_checks(conn, gigs=5_000, days=5, windows=200, seed=19)
+    problems = [problem for _, check_problems in results for problem in check_problems]
+    assert not problems, "\n".join(problems[:10])
+    assert len(results) > 200
@@ -0,0 +1,129 @@
+"""
+SMTPSessionPool and the delivery rate limiter against a local aiosmtpd
+server (tests/smtp_server.py): session reuse, reconnecting after the server
+drops its connections, refused recipients, and the overall send rate.
+"""
+import smtplib
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("aiosmtpd")
+
+from notification.email_delivery import EmailDeliveryService, SMTPSessionPool, _RateLimiter
+from tests.smtp_server import RecordingHandler, SMTPStandIn
+
+SENDER = "notifier@example.invalid"
+
+
+@pytest.fixture
+def smtp_server():
+    with SMTPStandIn(RecordingHandler(refused={"nobody@example.invalid"})) as server:
+        yield server
+
+
+def _recipients(count):
+    return [f"user{i}@example.invalid" for i in range(count)]
+
+
+def test_pool_reuses_sessions(smtp_server):
+    pool = SMTPSessionPool(smtp_server.settings(), size=2)
+    for recipient in _recipients(20):
+        pool.sendmail(SENDER, recipient, "Subject: hi\n\nhello")
+    pool.close()
+    assert smtp_server.handler.recipients == _recipients(20)
+    assert smtp_server.handler.logins == 1  # Sequential sends only ever need one session
+
+
+def test_pool_reconnects_after_max_messages(smtp_server):
+    pool = SMTPSessionPool(smtp_server.settings(), size=1, max_messages_per_session=5)
+    for recipient in _recipients(12):
+        pool.sendmail(SENDER, recipient, "Subject: hi\n\nhello")
+    pool.close()
+    assert len(smtp_server.handler.recipients) == 12
+    assert smtp_server.handler.logins == 3
+
+
+def test_pool_reconnects_after_server_restart(smtp_server):
+    pool = SMTPSessionPool(smtp_server.settings(), size=2)
+    pool.sendmail(SENDER, "before@example.invalid", "Subject: hi\n\nhello")
+    smtp_server.restart()  # The idle pooled session is now dead
+
+    pool.sendmail(SENDER, "after@example.invalid", "Subject: hi\n\nhello")
+    pool.close()
+    assert smtp_server.handler.recipients == ["before@example.invalid", "after@example.invalid"]
+    assert smtp_server.handler.logins == 2
+
+
+def test_pool_gives_up_when_server_is_gone(smtp_server):
+    pool = SMTPSessionPool(smtp_server.settings(), size=1)
+    pool.sendmail(SENDER, "before@example.invalid", "Subject: hi\n\nhello")
+    smtp_server.stop()
+    with pytest.raises(OSError):
+        pool.sendmail(SENDER, "after@example.invalid", "Subject: hi\n\nhello")
+
+    smtp_server.start()  # A failed send must not leak the pool's only slot
+    pool.sendmail(SENDER, "later@example.invalid", "Subject: hi\n\nhello")
+    pool.close()
+    assert smtp_server.handler.recipients == ["before@example.invalid", "later@example.invalid"]
+
+
+def test_refused_recipient_keeps_session(smtp_server):
+    pool = SMTPSessionPool(smtp_server.settings(), size=1)
+    with pytest.raises(smtplib.SMTPRecipientsRefused):
+        pool.sendmail(SENDER, "nobody@example.invalid", "Subject: hi\n\nhello")
+    pool.sendmail(SENDER, "user@example.invalid", "Subject: hi\n\nhello")
+    pool.close()
+    assert smtp_server.handler.recipients == ["user@example.invalid"]
+    assert smtp_server.handler.logins == 1
+
+
+def test_delivery_service_reports_each_recipient(smtp_server):
+    recipients = _recipients(30) + ["nobody@example.invalid"]
+    with EmailDeliveryService(workers=4, rate_per_second=0, settings=smtp_server.settings()) as delivery:
+        futures = [delivery.submit(recipient, "New gigs", "<p>hello</p>") for recipient in recipients]
+    assert [future.result() for future in futures] == [True] * 30 + [False]
+    assert sorted(smtp_server.handler.recipients) == sorted(_recipients(30))
+    assert smtp_server.handler.logins <= 4
+
+
+def test_rate_limiter_spaces_calls_across_threads():
+    started = time.monotonic()
+    limiter = _RateLimiter(50)
+    times = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(5):
+            limiter.wait()
+            with lock:
+                times.append(time.monotonic())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # The k-th call may not return before its slot, k intervals after the first;
+    # late wake-ups only ever push returns later, so this holds under any scheduling
+    times.sort()
+    assert all(moment - started >= k / 50 - 0.001 for k, moment in enumerate(times))
+
+
+def test_rate_limiter_disabled():
+    limiter = _RateLimiter(0)
+    started = time.monotonic()
+    for _ in range(1000):
+        limiter.wait()
+    assert time.monotonic() - started < 0.1
+
+
+def test_delivery_service_respects_rate_limit(smtp_server):
+    started = time.monotonic()
+    with EmailDeliveryService(workers=4, rate_per_second=40, settings=smtp_server.settings()) as delivery:
+        futures = [delivery.submit(recipient, "New gigs", "<p>hello</p>") for recipient in _recipients(20)]
+    elapsed = time.monotonic() - started
+    assert all(future.result() for future in futures)
+    assert elapsed >= 19 / 40 - 0.01
@@ -0,0 +1,132 @@
+"""
+Fixture tests for etl.extract.entry_parsing: every currency symbol and
+code, ranges, malformed and missing budgets, every published-date format
+and the date parser's move-to-front format memo.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from etl.extract.entry_parsing import (
+    CURRENCY_CODES,
+    CURRENCY_SYMBOLS,
+    PUBLISHED_DATE_FORMATS,
+    UNKNOWN_CURRENCY,
+    PublishedDateParser,
+    parse_amount_range,
+    parse_budget,
+)
+from etl.extract.freelancer_extractor import iter_freelancer_entries
+
+
+@pytest.mark.parametrize("symbol, currency", sorted(CURRENCY_SYMBOLS.items()))
+def test_budget_symbol(symbol, currency):
+    assert parse_budget(f"Budget: {symbol}1,500") == (1500.0, currency)
+    assert parse_budget(f"Budget: {symbol} 30 - {symbol}250") == (140.0, currency)
+
+
+@pytest.mark.parametrize("code", CURRENCY_CODES)
+def test_budget_code(code):
+    assert parse_budget(f"Budget: 2000 {code}") == (2000.0, code)
+    assert parse_budget(f"Budget: 10-20 {code.lower()}") == (15.0, code)
+
+
+def test_budget_code_wins_over_symbol():
+    assert parse_budget("Budget: $30 - $250 CAD") == (140.0, "CAD")
+    assert parse_budget("Budget: ₹ 600 - ₹1,000 INR") == (800.0, "INR")
+
+
+def test_budget_without_symbol_or_code():
+    assert parse_budget("Budget: 100") == (100.0, UNKNOWN_CURRENCY)
+    assert parse_budget("Budget: 75 xyz") == (75.0, UNKNOWN_CURRENCY)
+
+
+def test_budget_label_is_case_insensitive_and_first_match_wins():
+    assert parse_budget("BUDGET: $5") == (5.0, "USD")
+    assert parse_budget("Project text. Budget: $8 - 9 then Budget: €1") == (8.5, "USD")
+
+
+@pytest.mark.parametrize("summary", ["", "No budget given", "Budget: TBD", "Budget: $"])
+def test_budget_missing(summary):
+    assert parse_budget(summary) == (None, None)
+
+
+@pytest.mark.parametrize("summary", ["Budget: 1.2.3 USD", "Budget: ., USD", "Budget: $10 - 1..5"])
+def test_budget_malformed_number(summary, capsys):
+    assert parse_budget(summary) == (None, None)
+    assert "Could not parse budget numbers" in capsys.readouterr().out
+
+
+def test_parse_amount_range():
+    assert parse_amount_range("1,500") == 1500.0
+    assert parse_amount_range("1,000.50", "2,000.50") == 1500.5
+    assert parse_amount_range("30", None) == 30.0
+    with pytest.raises(ValueError):
+        parse_amount_range("1.2.3")
+
+
+PUBLISHED_SAMPLES = [
+    ("2026-10-16 12:00:05", datetime(2026, 10, 16, 12, 0, 5)),
+    ("Fri, 16 Oct 2026 12:00:05 +0200", datetime(2026, 10, 16, 12, 0, 5, tzinfo=timezone(timedelta(hours=2)))),
+    ("Fri, 16 Oct 2026 12:00:05 GMT", datetime(2026, 10, 16, 12, 0, 5)),
+]
+
+
+def test_published_samples_cover_every_format():
+    for (text, _), date_format in zip(PUBLISHED_SAMPLES, PUBLISHED_DATE_FORMATS):
+        datetime.strptime(text, date_format)  # Raises if a sample does not use its format
+    assert len(PUBLISHED_SAMPLES) == len(PUBLISHED_DATE_FORMATS)
+
+
+@pytest.mark.parametrize("text, expected", PUBLISHED_SAMPLES)
+def test_published_date_formats(text, expected):
+    assert PublishedDateParser().parse(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "yesterday", "2026-10-16T12:00:05Z", "16 Oct 2026"])
+def test_published_date_unparsable(text):
+    assert PublishedDateParser().parse(text) is None
+
+
+def test_published_date_parser_moves_matching_format_to_front():
+    parser = PublishedDateParser()
+    rfc822_text, rfc822_expected = PUBLISHED_SAMPLES[2]
+    assert parser.parse(rfc822_text) == rfc822_expected
+    assert parser._formats[0] == PUBLISHED_DATE_FORMATS[2]
+
+    # A miss leaves the order alone; another feed format is found and moved up in turn
+    assert parser.parse("yesterday") is None
+    assert parser._formats[0] == PUBLISHED_DATE_FORMATS[2]
+    iso_text, iso_expected = PUBLISHED_SAMPLES[0]
+    assert parser.parse(iso_text) == iso_expected
+    assert parser._formats[:2] == [PUBLISHED_DATE_FORMATS[0], PUBLISHED_DATE_FORMATS[2]]
+    assert sorted(parser._formats) == sorted(PUBLISHED_DATE_FORMATS)
+
+    # Each parser has its own memo
+    assert PublishedDateParser()._formats == list(PUBLISHED_DATE_FORMATS)
+
+
+class _Entry(dict):
+    """Minimal stand-in for a feedparser entry: dict access plus attribute access."""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+def test_freelancer_entries_use_entry_parsing():
+    entries = [
+        _Entry(title="A", link="https://example.invalid/a", summary="Logo. Budget: £20 - 40",
+               published=PUBLISHED_SAMPLES[2][0], tags=[{"term": "Logo Design"}]),
+        _Entry(title="B", link="https://example.invalid/b", summary="Budget: 300 AUD",
+               published=PUBLISHED_SAMPLES[2][0].replace("05", "06")),
+        _Entry(title="C", link="https://example.invalid/c", summary="No budget",
+               published_parsed=(2026, 10, 16, 9, 30, 0, 4, 289, 0)),
+    ]
+    gigs = list(iter_freelancer_entries(entries))
+    assert [(gig["budget_amount"], gig["budget_currency"]) for gig in gigs] == [(30.0, "GBP"), (300.0, "AUD"), (None, None)]
+    assert [gig["published_at"] for gig in gigs] == [
+        datetime(2026, 10, 16, 12, 0, 5), datetime(2026, 10, 16, 12, 0, 6), datetime(2026, 10, 16, 9, 30)]
+    assert gigs[0]["skills"] == ["Logo Design"]
@@ -1,27 +1,153 @@
 import os
+import time
+import logging
+import threading
 import psycopg2
+from psycopg2 import extensions, pool
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Pool settings shared by the psycopg2 ETL pool and the Flask-SQLAlchemy engine
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", 1))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 5))
+DB_POOL_MAX_OVERFLOW = int(os.getenv("DB_POOL_MAX_OVERFLOW", 0))  # SQLAlchemy only
+DB_POOL_TIMEOUT_SECONDS = int(os.getenv("DB_POOL_TIMEOUT_SECONDS", 30))  # SQLAlchemy only
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# Every session runs in UTC: the app and the ETL pass naive UTC datetimes and
+# bucket gigs by UTC hour, whatever the server's default TimeZone
+SESSION_OPTIONS = "-c TimeZone=UTC"
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class _PooledConnection(extensions.connection):
+    """psycopg2 connection that remembers when it was opened, for recycling."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.created_at = time.monotonic()
+
+
+def _connection_settings():
+    """psycopg2 connection parameters from the environment."""
+    return {
+        "host": os.getenv("DB_HOST"),
+        "database": os.getenv("POSTGRES_DB"),
+        "user": os.getenv("POSTGRES_USER"),
+        "password": os.getenv("POSTGRES_PASSWORD"),
+        "port": os.getenv("DB_PORT"),
+        "options": SESSION_OPTIONS,
+    }
+
+
+def _get_pool():
+    """Creates the process-wide connection pool on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = pool.ThreadedConnectionPool(
+                DB_POOL_MIN_SIZE,
+                DB_POOL_MAX_SIZE,
+                connection_factory=_PooledConnection,
+                **_connection_settings()
+            )
+            logger.info(f"Database connection pool created (min {DB_POOL_MIN_SIZE}, max {DB_POOL_MAX_SIZE}).")
+        return _pool
+
+
+def _is_usable(conn):
+    """
+    Returns False for connections that are closed, older than the recycle
+    age, or (with pre-ping enabled) no longer answer a trivial query.
+    """
+    if conn.closed:
+        return False
+    if DB_POOL_RECYCLE_SECONDS and time.monotonic() - conn.created_at > DB_POOL_RECYCLE_SECONDS:
+        return False
+    if DB_POOL_PRE_PING:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+        except psycopg2.Error:
+            return False
+    return True
+
+
 def get_db_connection():
-    """Establishes and returns a database connection using psycopg2."""
+    """
+    Returns a psycopg2 connection from the shared pool, replacing stale or
+    broken ones. Hand it back with close_db_connection.
+    """
     try:
-        conn = psycopg2.connect(
-            host=os.getenv("DB_HOST"),
-            database=os.getenv("POSTGRES_DB"),
-            user=os.getenv("POSTGRES_USER"),
-            password=os.getenv("POSTGRES_PASSWORD"),
-            port=os.getenv("DB_PORT")
-        )
-        print("Successfully connected to the database.")
-        return conn
+        connection_pool = _get_pool()
+        # Every pooled connection may turn out stale; after that a fresh one is opened
+        for _ in range(DB_POOL_MAX_SIZE + 1):
+            conn = connection_pool.getconn()
+            if _is_usable(conn):
+                logger.debug("Checked out a pooled database connection.")
+                return conn
+            connection_pool.putconn(conn, close=True)
+        raise psycopg2.OperationalError("No usable database connection in pool.")
     except Exception as e:
         print(f"Error connecting to database: {e}")
         return None
 
+
 def close_db_connection(conn):
-    """Closes the database connection."""
-    if conn:
-        conn.close()
-        print("Database connection closed.")
\ No newline at end of file
+    """
+    Returns a pooled connection to the pool (rolling back any open
+    transaction), or closes a connection that was opened elsewhere.
+    """
+    if not conn:
+        return
+    if isinstance(conn, _PooledConnection) and _pool is not None:
+        try:
+            if not conn.closed:
+                conn.rollback()
+            _pool.putconn(conn, close=bool(conn.closed))
+            logger.debug("Database connection returned to pool.")
+            return
+        except Exception as e:
+            logger.warning(f"Could not return connection to pool, closing it: {e}")
+    conn.close()
+
+
+def get_dedicated_db_connection(autocommit=False):
+    """
+    Opens a connection outside the pool, for long-lived sessions such as
+    LISTEN that should not hold a pooled slot. The caller closes it.
+    """
+    conn = psycopg2.connect(**_connection_settings())
+    conn.autocommit = autocommit
+    return conn
+
+
+def close_db_pool():
+    """Closes every pooled connection, e.g. on shutdown."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+            print("Database connection pool closed.")
+
+
+def get_sqlalchemy_engine_options():
+    """
+    SQLAlchemy engine settings matching the psycopg2 pool, for
+    Flask-SQLAlchemy's SQLALCHEMY_ENGINE_OPTIONS.
+    """
+    return {
+        "pool_size": DB_POOL_MAX_SIZE,
+        "max_overflow": DB_POOL_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "connect_args": {"options": SESSION_OPTIONS},
+    }